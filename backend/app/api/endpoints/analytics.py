@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 
+from app.core.config import settings
 from app.db.session import get_db
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.book import Book, Chapter, Page
+from app.services.batch_analysis import BATCH_ANALYSES, resolve_batch_analyses, stream_batch_analysis
 from app.services.emotion_analysis import emotion_analyzer
+from app.services.emotion_arc import get_book_emotional_arc, get_chapter_emotional_arc
+from app.services.emotion_heatmap import DEFAULT_BUCKET_TOKENS, get_emotion_heatmap
 from app.services.reading_analytics import reading_analytics
+from app.services.scoring_backend import get_scoring_backend
+from app.services.streaming_analysis import StreamingTextAnalyzer
 from app.services.soundscape import get_ambient_soundscape
 from pydantic import BaseModel
 
@@ -32,6 +40,16 @@ class ThemeAnalysisResponse(BaseModel):
     setting_elements: List[str]
     atmosphere: str
 
+class BatchAnalysisRequest(BaseModel):
+    texts: List[str]
+    analyses: List[str] = list(BATCH_ANALYSES)
+
+class StreamAnalysisResponse(BaseModel):
+    characters: int
+    tokens: int
+    emotion: EmotionAnalysisResponse
+    theme: ThemeAnalysisResponse
+
 class ReadingStatsResponse(BaseModel):
     total_books_read: int
     total_pages_read: int
@@ -67,7 +85,7 @@ def analyze_text_emotion(
 ):
     """Analyze the emotional content of text."""
     try:
-        emotion_result = emotion_analyzer.analyze_emotion(text)
+        emotion_result = get_scoring_backend().analyze_emotions([text])[0]
         
         return EmotionAnalysisResponse(
             primary_emotion=emotion_result.primary_emotion.value,
@@ -91,7 +109,7 @@ def analyze_text_theme(
 ):
     """Analyze the thematic content of text."""
     try:
-        theme_result = emotion_analyzer.analyze_theme(text)
+        theme_result = get_scoring_backend().analyze_themes([text])[0]
         
         return ThemeAnalysisResponse(
             primary_theme=theme_result.primary_theme.value,
@@ -106,6 +124,114 @@ def analyze_text_theme(
             detail=f"Error analyzing theme: {str(e)}"
         )
 
+@router.post("/analyze-batch")
+def analyze_text_batch(
+    request: BatchAnalysisRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Analyze many texts in one request.
+
+    Texts are spread over the analysis worker processes. Results are streamed
+    back as NDJSON, one line per text in input order; a text that fails gets
+    an "error" field instead of results.
+    """
+    if len(request.texts) > settings.BATCH_ANALYSIS_MAX_TEXTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_ANALYSIS_MAX_TEXTS} texts per batch"
+        )
+    try:
+        analyses = resolve_batch_analyses(request.analyses)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return StreamingResponse(
+        stream_batch_analysis(request.texts, analyses),
+        media_type="application/x-ndjson"
+    )
+
+@router.post("/analyze-stream", response_model=StreamAnalysisResponse)
+async def analyze_text_stream(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Analyze the emotion and theme of a text sent as the raw request body.
+
+    The body is read and analyzed chunk by chunk, so memory use stays flat
+    however large the text is (a whole book can be posted at once).
+    """
+    try:
+        stream = StreamingTextAnalyzer()
+        async for chunk in request.stream():
+            await run_in_threadpool(stream.feed, chunk)
+        emotion_result = await run_in_threadpool(stream.emotion)
+        theme_result = stream.theme()
+        
+        return StreamAnalysisResponse(
+            characters=stream.characters,
+            tokens=stream.token_count,
+            emotion=EmotionAnalysisResponse(
+                primary_emotion=emotion_result.primary_emotion.value,
+                emotion_scores=emotion_result.emotion_scores,
+                intensity=emotion_result.intensity,
+                confidence=emotion_result.confidence,
+                keywords=emotion_result.keywords,
+                context=emotion_result.context
+            ),
+            theme=ThemeAnalysisResponse(
+                primary_theme=theme_result.primary_theme.value,
+                theme_scores=theme_result.theme_scores,
+                sub_themes=theme_result.sub_themes,
+                setting_elements=theme_result.setting_elements,
+                atmosphere=theme_result.atmosphere
+            )
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error analyzing text stream: {str(e)}"
+        )
+
+@router.get("/books/{book_id}/emotion-heatmap")
+def get_book_emotion_heatmap(
+    book_id: int,
+    chapter_number: Optional[int] = None,
+    bucket_tokens: int = Query(DEFAULT_BUCKET_TOKENS, ge=1, le=10000),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Emotion intensities of a book, or of one chapter, in fixed-width token buckets.
+
+    "intensities" holds one row per entry of "emotions" and one column per
+    bucket of ``bucket_tokens`` tokens, with values from 0 to 1.
+    """
+    heatmap = get_emotion_heatmap(book_id, db, chapter_number=chapter_number, bucket_tokens=bucket_tokens)
+    if heatmap is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No pages found")
+    return heatmap
+
+@router.get("/books/{book_id}/emotional-arc")
+def get_book_arc(
+    book_id: int,
+    chapter_number: Optional[int] = None,
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Emotional arc of a book, or of one chapter, with one segment per page.
+
+    Arcs are rolled up from stored per-page results and cached, so after an
+    edit only the changed pages are analyzed again.
+    """
+    if chapter_number is not None:
+        arc = get_chapter_emotional_arc(book_id, chapter_number, db)
+    else:
+        arc = get_book_emotional_arc(book_id, db)
+    if arc is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book or chapter not found")
+    return arc
+
 @router.get("/me/stats", response_model=ReadingStatsResponse)
 def get_user_reading_stats(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -2,6 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
 from app.db.session import get_db
 from app.models.book import Book, Chapter, Page
+from app.models.analysis import PageAnalysisRecord, EmotionArcRecord
+from app.core.config import settings
+from app.services.precompute import schedule_book_precompute, get_book_precompute_status
+from app.services.soundscape import get_page_analysis
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -85,6 +89,20 @@ def get_page(book_id: int, chapter_number: int, page_number: int, db: Session =
         raise HTTPException(status_code=404, detail="Page not found")
     return page
 
+# GET word offsets of a page (for word-synchronised playback)
+@router.get("/books/{book_id}/chapters/{chapter_number}/pages/{page_number}/word-offsets")
+def get_page_word_offsets(book_id: int, chapter_number: int, page_number: int, db: Session = Depends(get_db)):
+    page = db.query(Page).join(Chapter).filter(
+        Page.book_id == book_id,
+        Chapter.chapter_number == chapter_number,
+        Page.page_number == page_number
+    ).first()
+    if not page:
+        raise HTTPException(status_code=404, detail="Page not found")
+    # Stored with the page analysis at ingest; word_position values of triggers index into this list
+    word_offsets = get_page_analysis(page, db, ("word_offsets",))["word_offsets"]
+    return {"page_id": page.id, "word_count": len(word_offsets), "word_offsets": word_offsets}
+
 # GET chapter with all pages
 @router.get("/books/{book_id}/chapters/{chapter_number}", response_model=ChapterOut)
 def get_chapter(book_id: int, chapter_number: int, db: Session = Depends(get_db)):
@@ -132,8 +150,19 @@ def create_book(book: BookCreate, db: Session = Depends(get_db)):
             db.add(db_page)
         db.commit()
 
+    # Warm soundscapes in the background before anyone opens the book
+    if settings.PRECOMPUTE_ON_INGEST:
+        schedule_book_precompute(db_book.id)
+
     return {"book_id": db_book.id}
 
+# GET background analysis progress for a book
+@router.get("/books/{book_id}/analysis-status")
+def get_analysis_status(book_id: int, db: Session = Depends(get_db)):
+    if not db.query(Book).filter(Book.id == book_id).first():
+        raise HTTPException(status_code=404, detail="Book not found")
+    return get_book_precompute_status(book_id, db)
+
 @router.delete("/books/{book_id}", status_code=204)
 def delete_book(book_id: int, db: Session = Depends(get_db)):
     book = db.query(Book).options(joinedload(Book.chapters).joinedload(Chapter.pages)).filter(Book.id == book_id).first()
@@ -141,8 +170,10 @@ def delete_book(book_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Book not found")
     for chapter in book.chapters:
         for page in chapter.pages:
+            db.query(PageAnalysisRecord).filter(PageAnalysisRecord.page_id == page.id).delete(synchronize_session=False)
             db.delete(page)
         db.delete(chapter)
+    db.query(EmotionArcRecord).filter(EmotionArcRecord.book_id == book_id).delete(synchronize_session=False)
     db.delete(book)
     db.commit()
     return None
\ No newline at end of file
@@ -1,15 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+import json
+from dataclasses import asdict
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app.services.soundscape import get_ambient_soundscape
+from typing import Optional
+from app.models.book import Chapter
+from app.services.scene_stream import stream_chapter_events
+from app.services.soundscape import (
+    SOUNDSCAPE_FORMATS, get_ambient_soundscape, get_ambient_soundscapes, resolve_soundscape_fields
+)
+from app.services.sound_catalog import get_sound_catalog, validate_sound_references
 from app.db.session import get_db
 from sqlalchemy import Column, Integer, ForeignKey
 
 router = APIRouter(prefix="/soundscape", tags=["Soundscape"])
 
+def _selected_fields(fields: Optional[str], profile: str):
+    try:
+        return resolve_soundscape_fields(
+            [field.strip() for field in fields.split(",") if field.strip()] if fields else None,
+            profile
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _is_compact(response_format: str) -> bool:
+    if response_format not in SOUNDSCAPE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown soundscape format: {response_format}")
+    return response_format == "compact"
+
+def _cacheable(request: Request, payload: dict) -> Response:
+    """
+    Return ``payload`` as JSON with an ETag of its exact bytes; answer 304 if
+    the client already holds them. Soundscape responses are deterministic,
+    so identical requests share an ETag until the analysis or sounds change.
+    """
+    response = JSONResponse(jsonable_encoder(payload))
+    etag = '"' + hashlib.sha256(response.body).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
+
 @router.get("/book/{book_id}/chapter{chapter_number}/page/{page_number}")
-def get_soundscape(book_id: int, chapter_number: int, page_number: int, db: Session = Depends(get_db)):
+def get_soundscape(
+    book_id: int,
+    chapter_number: int,
+    page_number: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to include"),
+    profile: str = Query("full", description="Field profile when fields is not given: lite or full"),
+    response_format: str = Query("standard", alias="format",
+                                 description="standard, or compact for a columnar trigger and scene timeline"),
+    db: Session = Depends(get_db)
+):
     """
     Endpoint for generating a context-aware soundscape for a specific book page.
+    Only the requested fields are computed; profile=lite returns carpet_tracks,
+    triggered_sounds, trigger_positions and mood. format=compact replaces
+    triggered_sounds, trigger_positions and scene_keyword_positions with a
+    "timeline" of parallel arrays plus "sounds", "patterns" and "scene_types"
+    tables the arrays' ids index into.
     Returns: {
         "book_id": ...,
         "book_page_id": ...,
@@ -21,9 +75,81 @@ def get_soundscape(book_id: int, chapter_number: int, page_number: int, db: Sess
         "triggered_sounds": ...
     }
     """
-    result = get_ambient_soundscape(book_id, chapter_number, page_number, db)
+    selected = _selected_fields(fields, profile)
+    compact = _is_compact(response_format)
+    result = get_ambient_soundscape(book_id, chapter_number, page_number, db, fields=selected, compact=compact)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return _cacheable(request, result)
+
+@router.get("/book/{book_id}/chapter{chapter_number}/pages")
+def get_soundscapes(
+    book_id: int,
+    chapter_number: int,
+    request: Request,
+    start: Optional[int] = Query(None, description="First page number; chapter start if omitted"),
+    end: Optional[int] = Query(None, description="Last page number; chapter end if omitted"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to include"),
+    profile: str = Query("full", description="Field profile when fields is not given: lite or full"),
+    response_format: str = Query("standard", alias="format",
+                                 description="standard, or compact for a columnar trigger and scene timeline"),
+    db: Session = Depends(get_db)
+):
+    """
+    Endpoint for soundscapes of a page range, or a whole chapter, in one call.
+    Lets the reader prefetch the next few pages instead of asking page by page.
+    With format=compact the id tables are shared by all pages and sent once.
+    Returns: {
+        "book_id": ...,
+        "chapter_id": ...,
+        "pages": [<soundscape of each page, as returned by the page endpoint>]
+    }
+    """
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be greater than end")
+    selected = _selected_fields(fields, profile)
+    compact = _is_compact(response_format)
+    result = get_ambient_soundscapes(book_id, chapter_number, db, start_page=start, end_page=end,
+                                     fields=selected, compact=compact)
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
-    return result
+    return _cacheable(request, result)
+
+@router.get("/book/{book_id}/chapter{chapter_number}/events")
+def get_chapter_events(book_id: int, chapter_number: int, db: Session = Depends(get_db)):
+    """
+    Endpoint streaming every scene and trigger match of a whole chapter as
+    NDJSON, one event per line in reading order. Pages are read and scanned
+    a few at a time, and phrases broken across a page boundary are found.
+    Each line: {
+        "kind": "scene" or "trigger",
+        "type": ...,
+        "text": ...,
+        "start": ...,
+        "end": ...,
+        "word_position": ...,
+        "chunk_index": <index of the page in the chapter>,
+        "data": ...
+    }
+    """
+    chapter = db.query(Chapter).filter(Chapter.book_id == book_id, Chapter.chapter_number == chapter_number).first()
+    if not chapter:
+        raise HTTPException(status_code=404, detail="Chapter not found")
+    return StreamingResponse(
+        (json.dumps(asdict(event)) + "\n" for event in stream_chapter_events(book_id, chapter_number, db)),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/sounds")
+def get_sounds(refresh: bool = Query(False, description="Rescan the sounds folder before answering")):
+    """
+    Endpoint for the sound catalog: every sound folder with its files' size
+    and duration, plus the trigger folders and carpet tracks referenced by
+    the rule tables that have no sound file on disk.
+    """
+    catalog = get_sound_catalog()
+    if refresh:
+        catalog.refresh()
+    return {**catalog.to_dict(), "validation": validate_sound_references(catalog)}
 
 chapter_id = Column(Integer, ForeignKey("chapter.id"))
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "SensaBook API"
@@ -22,10 +22,21 @@ class Settings(BaseSettings):
     # Audio Settings
     AUDIO_CACHE_TTL: int = 3600  # 1 hour
     MAX_AUDIO_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
+    SOUNDS_BASE_PATH: str = "mobile/app/sounds"
+    SOUND_CATALOG_REFRESH_SECONDS: float = 30.0
+    TRIGGER_SOUND_SELECTION: Literal["deterministic", "random"] = "deterministic"
     
     # Performance Settings
     CACHE_ENABLED: bool = True
     ANALYTICS_ENABLED: bool = True
+    PRECOMPUTE_ON_INGEST: bool = True
+    ANALYSIS_WORKERS: int = 0  # 0 = one worker process per CPU core
+    BATCH_ANALYSIS_MAX_TEXTS: int = 1000
+    
+    # Scoring backend for emotion and theme: "lexicon" or "linear"
+    SCORING_BACKEND: str = "lexicon"
+    EMOTION_MODEL_PATH: str = ""  # .npz weights for the linear backend
+    THEME_MODEL_PATH: str = ""
     
     # CORS Settings
     ALLOWED_ORIGINS: list = ["http://localhost:3000", "http://localhost:8081"]
@@ -1,9 +1,24 @@
-from sqlalchemy import create_engine
+import hashlib
+import sqlite3
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    """Give SQLite connections the SHA-256 function PostgreSQL has built in."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function(
+            "sha256_hex", 1, lambda text: hashlib.sha256((text or "").encode("utf-8")).hexdigest(),
+            deterministic=True
+        )
+
+
 engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -6,6 +6,9 @@ from app.api import router as api_router
 from app.db.session import engine, Base
 from app.models.book import Book  # Import your models
 from app.models.user import User  # Import User model
+from app.models.analysis import PageAnalysisRecord, EmotionArcRecord  # Import analysis store models
+from app.services.sound_catalog import load_sound_catalog, start_catalog_refresher, stop_catalog_refresher
+from app.services.worker_pool import shutdown_worker_pool, start_worker_pool
 
 
 app = FastAPI()
@@ -23,6 +26,21 @@ app.include_router(api_router)
 # Create all database tables
 Base.metadata.create_all(bind=engine)
 
+# Index the sound files once at startup instead of on every trigger match
+app.add_event_handler("startup", load_sound_catalog)
+
+# Compile the rule tables and lexicons and fork the analysis workers before
+# the first request
+app.add_event_handler("startup", start_worker_pool)
+
+# Keep the sound catalog current in the background; started after the
+# workers are forked
+app.add_event_handler("startup", start_catalog_refresher)
+
+# Stop the background analysis workers and catalog refresher with the server
+app.add_event_handler("shutdown", shutdown_worker_pool)
+app.add_event_handler("shutdown", stop_catalog_refresher)
+
 
 
 
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from app.db.session import Base
+from datetime import datetime
+
+class PageAnalysisRecord(Base):
+    """Persisted soundscape analysis of one page.
+
+    A record is valid only while both the page content hash and the ruleset
+    version still match what it was computed from.
+    """
+    __tablename__ = "page_analysis"
+
+    id = Column(Integer, primary_key=True)
+    page_id = Column(Integer, ForeignKey("page.id", ondelete="CASCADE"), unique=True, index=True, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    ruleset_version = Column(String(64), nullable=False)
+    analysis = Column(Text, nullable=False)  # JSON-encoded analysis sections
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class EmotionArcRecord(Base):
+    """Cached emotional arc of a chapter or a whole book.
+
+    ``scope`` is "chapter:<chapter id>" or "book:<book id>". A record is
+    valid only while ``source_hash`` still matches the content hashes of the
+    pages it was rolled up from and the ruleset version.
+    """
+    __tablename__ = "emotion_arc"
+
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(64), unique=True, index=True, nullable=False)
+    book_id = Column(Integer, ForeignKey("book.id", ondelete="CASCADE"), index=True, nullable=False)
+    chapter_id = Column(Integer, ForeignKey("chapter.id", ondelete="CASCADE"), nullable=True)
+    source_hash = Column(String(64), nullable=False)
+    arc = Column(Text, nullable=False)  # JSON-encoded arc
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,144 @@
+import json
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, Iterator, List, Sequence, Tuple
+
+from .emotion_analysis import EmotionResult, ThemeResult
+from .scoring_backend import get_scoring_backend
+from .worker_pool import get_worker_count, get_worker_pool, shutdown_worker_pool
+
+# Analyses a batch item can ask for
+BATCH_ANALYSES = ("emotion", "theme")
+
+# Texts sent to a worker in one task; the scoring backend scores each chunk
+# as a batch
+_CHUNK_SIZE = 32
+
+# Chunks submitted to the pool per worker before waiting for results, so a
+# large batch does not queue every text in the pool at once
+_IN_FLIGHT_PER_WORKER = 2
+
+
+def resolve_batch_analyses(analyses: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Validate the requested analyses, keeping ``BATCH_ANALYSES`` order.
+
+    Raises:
+        ValueError: If an analysis name is unknown or none is requested
+    """
+    unknown = sorted(set(analyses) - set(BATCH_ANALYSES))
+    if unknown:
+        raise ValueError(f"Unknown analyses: {', '.join(unknown)}")
+    selected = tuple(name for name in BATCH_ANALYSES if name in analyses)
+    if not selected:
+        raise ValueError("At least one analysis is required")
+    return selected
+
+
+def _emotion_payload(emotion: EmotionResult) -> Dict[str, Any]:
+    return {
+        "primary_emotion": emotion.primary_emotion.value,
+        "emotion_scores": emotion.emotion_scores,
+        "intensity": emotion.intensity,
+        "confidence": emotion.confidence,
+        "keywords": emotion.keywords,
+        "context": emotion.context
+    }
+
+
+def _theme_payload(theme: ThemeResult) -> Dict[str, Any]:
+    return {
+        "primary_theme": theme.primary_theme.value,
+        "theme_scores": theme.theme_scores,
+        "sub_themes": theme.sub_themes,
+        "setting_elements": theme.setting_elements,
+        "atmosphere": theme.atmosphere
+    }
+
+
+def analyze_text_items(texts: Sequence[str], analyses: Tuple[str, ...] = BATCH_ANALYSES) -> List[Dict[str, Any]]:
+    """
+    Run the requested analyses on a chunk of texts.
+
+    Runs in a worker process. The texts are scored together by the
+    configured scoring backend; if that fails, they are retried one by one
+    so a bad text only fails itself. Results use the same fields as the
+    single-text analyze-emotion and analyze-theme endpoints.
+    """
+    backend = get_scoring_backend()
+    try:
+        results: List[Dict[str, Any]] = [{} for _ in texts]
+        # Both analyses read the same lexicon features; extract them once
+        features = backend.extract_features(texts) if len(analyses) > 1 else None
+        if "emotion" in analyses:
+            for result, emotion in zip(results, backend.analyze_emotions(texts, features)):
+                result["emotion"] = _emotion_payload(emotion)
+        if "theme" in analyses:
+            for result, theme in zip(results, backend.analyze_themes(texts, features)):
+                result["theme"] = _theme_payload(theme)
+        return results
+    except Exception as e:
+        if len(texts) == 1:
+            return [{"error": str(e)}]
+        return [analyze_text_items([text], analyses)[0] for text in texts]
+
+
+def stream_batch_analysis(texts: Sequence[str], analyses: Tuple[str, ...] = BATCH_ANALYSES) -> Iterator[str]:
+    """
+    Analyze a batch of texts on the worker pool and stream the results as NDJSON.
+
+    One line is written per text, in input order, as soon as that text and
+    all texts before it are done. A text that fails gets an ``error`` field
+    instead of results; the rest of the batch carries on.
+
+    Args:
+        texts: Texts to analyze
+        analyses: Analyses to run on each text
+
+    Yields:
+        JSON lines of the form {"index": ..., "emotion": ..., "theme": ...}
+        or {"index": ..., "error": ...}
+    """
+    pool = get_worker_pool()
+    limit = get_worker_count() * _IN_FLIGHT_PER_WORKER
+    pending: Deque[Tuple[int, int, Future]] = deque()  # (first index, size, future) per chunk
+    broken = None
+
+    def line(index: int, payload: Dict[str, Any]) -> str:
+        return json.dumps({"index": index, **payload}) + "\n"
+
+    def collect(first: int, size: int, future: Future) -> Iterator[str]:
+        nonlocal broken
+        try:
+            payloads = future.result()
+        except BrokenProcessPool as e:
+            broken = e
+            payloads = [{"error": f"Worker pool stopped: {e}"}] * size
+        except Exception as e:
+            payloads = [{"error": str(e)}] * size
+        for offset, payload in enumerate(payloads):
+            yield line(first + offset, payload)
+
+    for first in range(0, len(texts), _CHUNK_SIZE):
+        chunk = list(texts[first:first + _CHUNK_SIZE])
+        if broken is None:
+            try:
+                pending.append((first, len(chunk), pool.submit(analyze_text_items, chunk, analyses)))
+            except BrokenProcessPool as e:
+                broken = e
+        if broken is not None:
+            # Drain what was already submitted, then fail the rest of the batch
+            while pending:
+                yield from collect(*pending.popleft())
+            for offset in range(len(chunk)):
+                yield line(first + offset, {"error": f"Worker pool stopped: {broken}"})
+            continue
+        if len(pending) >= limit:
+            yield from collect(*pending.popleft())
+
+    while pending:
+        yield from collect(*pending.popleft())
+
+    if broken is not None:
+        shutdown_worker_pool()
@@ -1,10 +1,15 @@
 import re
-from typing import Dict, List, Tuple, Optional
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple, Optional
 from collections import Counter, defaultdict
 from dataclasses import dataclass
 from enum import Enum
 import json
 
+from .lexicon import EmotionLexicon, FeatureIndex, LexiconScore, TextFeatures
+from .literal_prefilter import register_patterns
+from .pattern_engine import CompiledPatternSet, SpanIndex, fold_case
+
 class EmotionType(Enum):
     JOY = "joy"
     SADNESS = "sadness"
@@ -41,82 +46,280 @@ class ThemeResult:
     setting_elements: List[str]
     atmosphere: str
 
+# Emotion keywords and their weights
+EMOTION_KEYWORDS = {
+    EmotionType.JOY: {
+        "happy": 0.8, "joy": 0.9, "excited": 0.7, "delighted": 0.8,
+        "cheerful": 0.7, "elated": 0.9, "thrilled": 0.8, "ecstatic": 0.9,
+        "smile": 0.6, "laugh": 0.7, "celebrate": 0.8, "victory": 0.7,
+        "wonderful": 0.7, "amazing": 0.6, "fantastic": 0.7, "brilliant": 0.6
+    },
+    EmotionType.SADNESS: {
+        "sad": 0.8, "depressed": 0.9, "melancholy": 0.8, "grief": 0.9,
+        "sorrow": 0.8, "tears": 0.7, "mourning": 0.8, "despair": 0.9,
+        "lonely": 0.7, "heartbroken": 0.9, "weep": 0.7, "sorrowful": 0.8,
+        "miserable": 0.8, "hopeless": 0.9, "gloomy": 0.7, "dejected": 0.8
+    },
+    EmotionType.ANGER: {
+        "angry": 0.8, "furious": 0.9, "rage": 0.9, "irritated": 0.6,
+        "enraged": 0.9, "outraged": 0.8, "fuming": 0.8, "livid": 0.9,
+        "hostile": 0.8, "aggressive": 0.7, "violent": 0.8, "wrath": 0.9,
+        "furious": 0.9, "incensed": 0.8, "irate": 0.8, "mad": 0.7
+    },
+    EmotionType.FEAR: {
+        "afraid": 0.8, "terrified": 0.9, "scared": 0.7, "horrified": 0.9,
+        "panic": 0.9, "dread": 0.8, "anxious": 0.6, "nervous": 0.5,
+        "frightened": 0.7, "petrified": 0.9, "alarmed": 0.7, "distressed": 0.6,
+        "terrifying": 0.9, "fearful": 0.7, "apprehensive": 0.6, "worried": 0.5
+    },
+    EmotionType.SURPRISE: {
+        "surprised": 0.7, "shocked": 0.8, "amazed": 0.7, "astonished": 0.8,
+        "stunned": 0.8, "bewildered": 0.6, "startled": 0.7, "astounded": 0.8,
+        "incredible": 0.6, "unexpected": 0.7, "suddenly": 0.5, "abruptly": 0.5,
+        "unbelievable": 0.7, "remarkable": 0.6, "extraordinary": 0.6
+    },
+    EmotionType.DISGUST: {
+        "disgusted": 0.8, "revolted": 0.9, "repulsed": 0.8, "sickened": 0.8,
+        "nauseated": 0.8, "appalled": 0.7, "horrified": 0.8, "contempt": 0.7,
+        "loathing": 0.9, "abhorrent": 0.8, "vile": 0.8, "repugnant": 0.8,
+        "revolting": 0.8, "disgusting": 0.8, "nauseating": 0.8
+    }
+}
+
+# Theme keywords and patterns
+THEME_KEYWORDS = {
+    ThemeType.ADVENTURE: ["quest", "journey", "explore", "discover", "treasure", "map", "expedition", "adventure", "travel"],
+    ThemeType.ROMANCE: ["love", "heart", "kiss", "romance", "passion", "affection", "desire", "romantic", "beloved"],
+    ThemeType.MYSTERY: ["mystery", "clue", "investigate", "detective", "secret", "puzzle", "enigma", "suspense", "mysterious"],
+    ThemeType.HORROR: ["horror", "terrifying", "nightmare", "haunted", "ghost", "demonic", "evil", "scary", "frightening"],
+    ThemeType.FANTASY: ["magic", "wizard", "spell", "dragon", "fantasy", "enchanted", "mythical", "magical", "sorcery"],
+    ThemeType.DRAMA: ["conflict", "tension", "drama", "struggle", "betrayal", "tragedy", "dramatic", "emotional"],
+    ThemeType.COMEDY: ["funny", "humor", "joke", "laugh", "comedy", "amusing", "hilarious", "comical", "witty"],
+    ThemeType.ACTION: ["fight", "battle", "combat", "action", "thrilling", "intense", "explosive", "warrior", "hero"]
+}
+
+# Setting and atmosphere keywords
+SETTING_KEYWORDS = {
+    "indoor": ["room", "house", "building", "chamber", "hall", "kitchen", "library", "office", "bedroom"],
+    "outdoor": ["forest", "mountain", "beach", "field", "garden", "park", "street", "meadow", "valley"],
+    "urban": ["city", "town", "street", "building", "alley", "market", "square", "urban", "metropolitan"],
+    "rural": ["village", "farm", "countryside", "meadow", "pasture", "orchard", "rural", "rustic"],
+    "night": ["night", "dark", "moonlight", "stars", "midnight", "evening", "darkness", "shadow"],
+    "day": ["day", "sunlight", "morning", "afternoon", "bright", "sunny", "dawn", "noon"],
+    "weather": ["rain", "storm", "wind", "snow", "fog", "mist", "thunder", "lightning", "cloudy"]
+}
+
+# Enhanced context patterns for narrative flow detection
+CONTEXT_PATTERNS = {
+    "intensifiers": ["very", "extremely", "incredibly", "absolutely", "completely", "utterly"],
+    "diminishers": ["slightly", "somewhat", "a bit", "kind of", "sort of", "rather"],
+    "negation": ["not", "never", "no", "none", "neither", "nor", "doesn't", "isn't", "wasn't"],
+    "temporal": ["suddenly", "gradually", "slowly", "quickly", "immediately", "eventually"],
+    "spatial": ["near", "far", "above", "below", "inside", "outside", "around", "through"]
+}
+
+# Atmosphere indicators
+ATMOSPHERE_INDICATORS = {
+    "dark": ["dark", "shadow", "night", "black", "gloomy", "dim", "murky"],
+    "bright": ["bright", "light", "sunny", "clear", "illuminated", "radiant", "luminous"],
+    "tense": ["tense", "nervous", "anxious", "worried", "stressful", "strained", "strained"],
+    "peaceful": ["calm", "peaceful", "tranquil", "serene", "quiet", "gentle", "soothing"],
+    "energetic": ["energetic", "lively", "vibrant", "dynamic", "active", "spirited", "enthusiastic"],
+    "mysterious": ["mysterious", "enigmatic", "puzzling", "curious", "strange", "cryptic", "obscure"]
+}
+
+@dataclass(frozen=True)
+class CompiledLexicons:
+    """Lookup structures compiled from the lexicon tables, shared read-only."""
+    emotion: EmotionLexicon
+    features: FeatureIndex
+
+_compiled_lexicons = None
+
+def get_compiled_lexicons() -> CompiledLexicons:
+    """Return the compiled lexicons, building them on first use."""
+    global _compiled_lexicons
+    if _compiled_lexicons is None:
+        _compiled_lexicons = CompiledLexicons(
+            emotion=EmotionLexicon(EMOTION_KEYWORDS, CONTEXT_PATTERNS),
+            # One index over every lexicon, so a text is tokenized and scanned
+            # once for emotion, theme, setting, atmosphere and context analysis
+            features=FeatureIndex(
+                [keyword for keywords in EMOTION_KEYWORDS.values() for keyword in keywords]
+                + [keyword for keywords in THEME_KEYWORDS.values() for keyword in keywords]
+                + [keyword for keywords in SETTING_KEYWORDS.values() for keyword in keywords]
+                + [keyword for keywords in ATMOSPHERE_INDICATORS.values() for keyword in keywords]
+                + [word for words in CONTEXT_PATTERNS.values() for word in words]
+            )
+        )
+    return _compiled_lexicons
+
+# Narrative lexicon: analysis section -> category -> patterns. Each section's
+# categories and patterns are listed in the order its results are reported.
+NARRATIVE_PATTERNS = {
+    "story_elements": {
+        'exposition': [
+            r'\b(introduc|present|establish|begin|start)\w*\b',
+            r'\b(setting|background|context|situation)\b',
+            r'\b(once|long ago|in the beginning|at first)\b'
+        ],
+        'rising_action': [
+            r'\b(then|next|suddenly|however|but|meanwhile)\b',
+            r'\b(problem|challenge|difficulty|obstacle|conflict)\b',
+            r'\b(tension|suspense|build|increase|grow)\b'
+        ],
+        'climax': [
+            r'\b(finally|at last|the moment|peak|highest)\b',
+            r'\b(explosion|burst|breakthrough|realization)\b',
+            r'\b(critical|decisive|pivotal|turning point)\b'
+        ],
+        'falling_action': [
+            r'\b(after|following|consequently|as a result)\b',
+            r'\b(calm|settle|resolve|wind down)\b',
+            r'\b(conclusion|ending|final|last)\b'
+        ],
+        'resolution': [
+            r'\b(resolve|solve|fix|heal|reconcile)\b',
+            r'\b(peace|harmony|understanding|acceptance)\b',
+            r'\b(learn|grow|change|transform)\b'
+        ]
+    },
+    "character_development": {
+        'character_introduction': [
+            r'\b(character|person|man|woman|boy|girl|child)\b',
+            r'\b(name|called|known as|referred to as)\b',
+            r'\b(appearance|looked|appeared|seemed)\b'
+        ],
+        'character_growth': [
+            r'\b(learn|grow|change|develop|evolve|transform)\b',
+            r'\b(realize|understand|discover|find out)\b',
+            r'\b(overcome|face|deal with|handle)\b'
+        ],
+        'character_relationships': [
+            r'\b(friend|enemy|ally|rival|partner|companion)\b',
+            r'\b(love|hate|trust|betray|support|oppose)\b',
+            r'\b(together|apart|separate|unite|divide)\b'
+        ],
+        'character_conflict': [
+            r'\b(struggle|fight|argue|disagree|conflict)\b',
+            r'\b(anger|fear|sadness|joy|surprise)\b',
+            r'\b(decision|choice|dilemma|problem)\b'
+        ]
+    },
+    "plot_progression": {
+        'beginning': [r'\b(begin|start|commence|initiate)\b'],
+        'development': [r'\b(develop|progress|advance|move forward)\b'],
+        'complication': [r'\b(complicate|intensify|escalate|heighten)\b'],
+        'resolution': [r'\b(resolve|conclude|end|finish)\b']
+    },
+    "narrative_pacing": {
+        'fast': [
+            r'\b(suddenly|quickly|rapidly|swiftly|immediately)\b',
+            r'\b(urgent|hurry|rush|fast|quick)\b',
+            r'\b(explosion|burst|crash|bang|flash)\b'
+        ],
+        'slow': [
+            r'\b(gradually|slowly|gently|carefully|patiently)\b',
+            r'\b(calm|peaceful|tranquil|serene|quiet)\b',
+            r'\b(reflect|contemplate|consider|think|ponder)\b'
+        ]
+    },
+    "conflict_resolution": {
+        'conflicts': [
+            r'\b(problem|issue|trouble|difficulty|challenge)\b',
+            r'\b(conflict|dispute|argument|fight|battle)\b',
+            r'\b(obstacle|barrier|hurdle|impediment|block)\b',
+            r'\b(danger|threat|risk|peril|hazard)\b'
+        ],
+        'resolutions': [
+            r'\b(solve|resolve|fix|repair|heal)\b',
+            r'\b(overcome|defeat|conquer|triumph|succeed)\b',
+            r'\b(understand|realize|discover|learn|grow)\b',
+            r'\b(peace|harmony|agreement|compromise|reconciliation)\b'
+        ]
+    },
+    "setting_details": {
+        'locations': [
+            r'\b(house|building|room|chamber|hall)\b',
+            r'\b(forest|mountain|river|ocean|desert)\b',
+            r'\b(city|town|village|castle|palace)\b',
+            r'\b(inside|outside|within|beyond|near|far)\b'
+        ],
+        'time_periods': [
+            r'\b(morning|noon|afternoon|evening|night)\b',
+            r'\b(spring|summer|autumn|winter|season)\b',
+            r'\b(ancient|modern|future|past|present)\b',
+            r'\b(century|decade|year|month|week|day)\b'
+        ],
+        'atmospheric_elements': [
+            r'\b(dark|light|bright|dim|shadow)\b',
+            r'\b(warm|cold|hot|cool|temperature)\b',
+            r'\b(quiet|loud|silent|noisy|sound)\b',
+            r'\b(fresh|stale|clean|dirty|pure)\b'
+        ]
+    }
+}
+
+_narrative_matcher = None
+
+def _get_narrative_matcher() -> CompiledPatternSet:
+    """Return the matcher over every narrative pattern, compiling it on first use."""
+    global _narrative_matcher
+    if _narrative_matcher is None:
+        _narrative_matcher = CompiledPatternSet([
+            (category, pattern, section)
+            for section, categories in NARRATIVE_PATTERNS.items()
+            for category, patterns in categories.items()
+            for pattern in patterns
+        ])
+    return _narrative_matcher
+
+def scan_narrative(text_lower: str) -> Dict[str, Dict[str, List[re.Match]]]:
+    """
+    Match the whole narrative lexicon against lowercased text in one pass.
+    
+    Returns:
+        section -> category -> matches, in pattern order and then text order
+        within each category, exactly as running each pattern separately would
+    """
+    results = {
+        section: {category: [] for category in categories}
+        for section, categories in NARRATIVE_PATTERNS.items()
+    }
+    for rule, match in _get_narrative_matcher().iter_matches(text_lower):
+        results[rule.metadata][rule.key].append(match)
+    return results
+
 class AdvancedEmotionAnalyzer:
     def __init__(self):
-        # Emotion keywords and their weights
-        self.emotion_keywords = {
-            EmotionType.JOY: {
-                "happy": 0.8, "joy": 0.9, "excited": 0.7, "delighted": 0.8,
-                "cheerful": 0.7, "elated": 0.9, "thrilled": 0.8, "ecstatic": 0.9,
-                "smile": 0.6, "laugh": 0.7, "celebrate": 0.8, "victory": 0.7,
-                "wonderful": 0.7, "amazing": 0.6, "fantastic": 0.7, "brilliant": 0.6
-            },
-            EmotionType.SADNESS: {
-                "sad": 0.8, "depressed": 0.9, "melancholy": 0.8, "grief": 0.9,
-                "sorrow": 0.8, "tears": 0.7, "mourning": 0.8, "despair": 0.9,
-                "lonely": 0.7, "heartbroken": 0.9, "weep": 0.7, "sorrowful": 0.8,
-                "miserable": 0.8, "hopeless": 0.9, "gloomy": 0.7, "dejected": 0.8
-            },
-            EmotionType.ANGER: {
-                "angry": 0.8, "furious": 0.9, "rage": 0.9, "irritated": 0.6,
-                "enraged": 0.9, "outraged": 0.8, "fuming": 0.8, "livid": 0.9,
-                "hostile": 0.8, "aggressive": 0.7, "violent": 0.8, "wrath": 0.9,
-                "furious": 0.9, "incensed": 0.8, "irate": 0.8, "mad": 0.7
-            },
-            EmotionType.FEAR: {
-                "afraid": 0.8, "terrified": 0.9, "scared": 0.7, "horrified": 0.9,
-                "panic": 0.9, "dread": 0.8, "anxious": 0.6, "nervous": 0.5,
-                "frightened": 0.7, "petrified": 0.9, "alarmed": 0.7, "distressed": 0.6,
-                "terrifying": 0.9, "fearful": 0.7, "apprehensive": 0.6, "worried": 0.5
-            },
-            EmotionType.SURPRISE: {
-                "surprised": 0.7, "shocked": 0.8, "amazed": 0.7, "astonished": 0.8,
-                "stunned": 0.8, "bewildered": 0.6, "startled": 0.7, "astounded": 0.8,
-                "incredible": 0.6, "unexpected": 0.7, "suddenly": 0.5, "abruptly": 0.5,
-                "unbelievable": 0.7, "remarkable": 0.6, "extraordinary": 0.6
-            },
-            EmotionType.DISGUST: {
-                "disgusted": 0.8, "revolted": 0.9, "repulsed": 0.8, "sickened": 0.8,
-                "nauseated": 0.8, "appalled": 0.7, "horrified": 0.8, "contempt": 0.7,
-                "loathing": 0.9, "abhorrent": 0.8, "vile": 0.8, "repugnant": 0.8,
-                "revolting": 0.8, "disgusting": 0.8, "nauseating": 0.8
-            }
-        }
-        
-        # Theme keywords and patterns
-        self.theme_keywords = {
-            ThemeType.ADVENTURE: ["quest", "journey", "explore", "discover", "treasure", "map", "expedition", "adventure", "travel"],
-            ThemeType.ROMANCE: ["love", "heart", "kiss", "romance", "passion", "affection", "desire", "romantic", "beloved"],
-            ThemeType.MYSTERY: ["mystery", "clue", "investigate", "detective", "secret", "puzzle", "enigma", "suspense", "mysterious"],
-            ThemeType.HORROR: ["horror", "terrifying", "nightmare", "haunted", "ghost", "demonic", "evil", "scary", "frightening"],
-            ThemeType.FANTASY: ["magic", "wizard", "spell", "dragon", "fantasy", "enchanted", "mythical", "magical", "sorcery"],
-            ThemeType.DRAMA: ["conflict", "tension", "drama", "struggle", "betrayal", "tragedy", "dramatic", "emotional"],
-            ThemeType.COMEDY: ["funny", "humor", "joke", "laugh", "comedy", "amusing", "hilarious", "comical", "witty"],
-            ThemeType.ACTION: ["fight", "battle", "combat", "action", "thrilling", "intense", "explosive", "warrior", "hero"]
-        }
-        
-        # Setting and atmosphere keywords
-        self.setting_keywords = {
-            "indoor": ["room", "house", "building", "chamber", "hall", "kitchen", "library", "office", "bedroom"],
-            "outdoor": ["forest", "mountain", "beach", "field", "garden", "park", "street", "meadow", "valley"],
-            "urban": ["city", "town", "street", "building", "alley", "market", "square", "urban", "metropolitan"],
-            "rural": ["village", "farm", "countryside", "meadow", "pasture", "orchard", "rural", "rustic"],
-            "night": ["night", "dark", "moonlight", "stars", "midnight", "evening", "darkness", "shadow"],
-            "day": ["day", "sunlight", "morning", "afternoon", "bright", "sunny", "dawn", "noon"],
-            "weather": ["rain", "storm", "wind", "snow", "fog", "mist", "thunder", "lightning", "cloudy"]
-        }
+        # Lexicon tables and their compiled forms are built once and shared
+        # read-only by every analyzer instance
+        self.emotion_keywords = EMOTION_KEYWORDS
+        self.theme_keywords = THEME_KEYWORDS
+        self.setting_keywords = SETTING_KEYWORDS
+        self.context_patterns = CONTEXT_PATTERNS
+        self.atmosphere_indicators = ATMOSPHERE_INDICATORS
+        
+        lexicons = get_compiled_lexicons()
+        self.emotion_lexicon = lexicons.emotion
+        self.feature_index = lexicons.features
+
+    def extract_features(self, text: str) -> TextFeatures:
+        """
+        Tokenize ``text`` and find every lexicon term in it.
         
-        # Enhanced context patterns for narrative flow detection
-        self.context_patterns = {
-            "intensifiers": ["very", "extremely", "incredibly", "absolutely", "completely", "utterly"],
-            "diminishers": ["slightly", "somewhat", "a bit", "kind of", "sort of", "rather"],
-            "negation": ["not", "never", "no", "none", "neither", "nor", "doesn't", "isn't", "wasn't"],
-            "temporal": ["suddenly", "gradually", "slowly", "quickly", "immediately", "eventually"],
-            "spatial": ["near", "far", "above", "below", "inside", "outside", "around", "through"]
-        }
+        Pass the result to both ``analyze_emotion`` and ``analyze_theme`` to
+        analyze the emotion and the theme of a text with a single pass.
+        """
+        return self.feature_index.extract(text)
 
-    def analyze_emotion(self, text: str) -> EmotionResult:
-        """Analyze the emotional content of text with enhanced context analysis."""
+    def analyze_emotion(self, text: str, features: Optional[TextFeatures] = None) -> EmotionResult:
+        """
+        Analyze the emotional content of text with enhanced context analysis.
+        
+        ``features`` are the text's features from ``extract_features``, if
+        the caller already has them.
+        """
         if not text:
             return EmotionResult(
                 primary_emotion=EmotionType.NEUTRAL,
@@ -129,46 +332,47 @@ class AdvancedEmotionAnalyzer:
         
         # Normalize text
         text = text.lower()
-        words = re.findall(r'\b\w+\b', text)
-        
-        # Calculate emotion scores with context enhancement
-        emotion_scores = defaultdict(float)
-        found_keywords = []
-        
-        # Enhanced keyword analysis with context weighting
-        for emotion_type, keywords in self.emotion_keywords.items():
-            for keyword, weight in keywords.items():
-                if keyword in text:
-                    # Apply context-based weight adjustment
-                    adjusted_weight = self._adjust_weight_by_context(text, keyword, weight)
-                    emotion_scores[emotion_type.value] += adjusted_weight
-                    found_keywords.append(keyword)
-        
-        # Determine primary emotion
-        if emotion_scores:
-            primary_emotion = max(emotion_scores.items(), key=lambda x: x[1])
-            primary_emotion_type = EmotionType(primary_emotion[0])
-            intensity = min(primary_emotion[1] / 3.0, 1.0)  # Normalize to 0-1
-            confidence = min(len(found_keywords) / 10.0, 1.0)
-        else:
-            primary_emotion_type = EmotionType.NEUTRAL
-            intensity = 0.0
-            confidence = 0.0
+        if features is None:
+            features = self.extract_features(text)
+        
+        # Score every keyword occurrence with context-weighted lexicon lookups
+        lexicon_score = self.emotion_lexicon.score(features.tokens)
         
         # Enhanced context extraction with narrative flow
-        context = self._extract_enhanced_context(text)
+        context = self._extract_enhanced_context(text, features)
+        
+        return self.emotion_from_score(lexicon_score, context)
+
+    def emotion_from_score(self, lexicon_score: LexiconScore, context: str) -> EmotionResult:
+        """Build an EmotionResult from a lexicon score and its extracted context."""
+        primary_emotion_type, intensity, confidence = self._primary_emotion(lexicon_score)
         
         return EmotionResult(
             primary_emotion=primary_emotion_type,
-            emotion_scores=dict(emotion_scores),
+            emotion_scores=dict(lexicon_score.scores),
             intensity=intensity,
             confidence=confidence,
-            keywords=found_keywords,
+            keywords=list(lexicon_score.keywords),
             context=context
         )
 
-    def analyze_theme(self, text: str) -> ThemeResult:
-        """Analyze the thematic content of text."""
+    def _primary_emotion(self, lexicon_score: LexiconScore) -> Tuple[EmotionType, float, float]:
+        """Return (primary emotion, intensity, confidence) for a lexicon score."""
+        if not lexicon_score.scores:
+            return EmotionType.NEUTRAL, 0.0, 0.0
+        
+        primary_emotion = max(lexicon_score.scores.items(), key=lambda x: x[1])
+        intensity = min(primary_emotion[1] / 3.0, 1.0)  # Normalize to 0-1
+        confidence = min(lexicon_score.occurrences / 10.0, 1.0)
+        return EmotionType(primary_emotion[0]), intensity, confidence
+
+    def analyze_theme(self, text: str, features: Optional[TextFeatures] = None) -> ThemeResult:
+        """
+        Analyze the thematic content of text.
+        
+        ``features`` are the text's features from ``extract_features``, if
+        the caller already has them.
+        """
         if not text:
             return ThemeResult(
                 primary_theme=ThemeType.DRAMA,
@@ -178,15 +382,16 @@ class AdvancedEmotionAnalyzer:
                 atmosphere="neutral"
             )
         
-        text = text.lower()
+        return self.theme_from_features(features if features is not None else self.extract_features(text))
+
+    def theme_from_features(self, features: TextFeatures) -> ThemeResult:
+        """Build a ThemeResult from the lexicon terms found in a text."""
         theme_scores = defaultdict(float)
-        setting_elements = []
-        atmosphere_elements = []
         
         # Calculate theme scores
         for theme_type, keywords in self.theme_keywords.items():
             for keyword in keywords:
-                if keyword in text:
+                if features.has(keyword):
                     theme_scores[theme_type.value] += 1.0
         
         # Determine primary theme
@@ -197,13 +402,10 @@ class AdvancedEmotionAnalyzer:
             primary_theme_type = ThemeType.DRAMA
         
         # Detect setting elements
-        for setting_type, keywords in self.setting_keywords.items():
-            for keyword in keywords:
-                if keyword in text:
-                    setting_elements.append(f"{setting_type}:{keyword}")
+        setting_elements = self.setting_elements(features)
         
         # Determine atmosphere based on emotion and setting
-        atmosphere = self._determine_atmosphere(text)
+        atmosphere = self._determine_atmosphere("", features)
         
         return ThemeResult(
             primary_theme=primary_theme_type,
@@ -213,23 +415,24 @@ class AdvancedEmotionAnalyzer:
             atmosphere=atmosphere
         )
 
-    def _determine_atmosphere(self, text: str) -> str:
+    def setting_elements(self, features: TextFeatures) -> List[str]:
+        """Detect setting elements, as "setting_type:keyword"."""
+        setting_elements = []
+        for setting_type, keywords in self.setting_keywords.items():
+            for keyword in keywords:
+                if features.has(keyword):
+                    setting_elements.append(f"{setting_type}:{keyword}")
+        return setting_elements
+
+    def _determine_atmosphere(self, text: str, features: Optional[TextFeatures] = None) -> str:
         """Determine the overall atmosphere of the text."""
-        atmosphere_indicators = {
-            "dark": ["dark", "shadow", "night", "black", "gloomy", "dim", "murky"],
-            "bright": ["bright", "light", "sunny", "clear", "illuminated", "radiant", "luminous"],
-            "tense": ["tense", "nervous", "anxious", "worried", "stressful", "strained", "strained"],
-            "peaceful": ["calm", "peaceful", "tranquil", "serene", "quiet", "gentle", "soothing"],
-            "energetic": ["energetic", "lively", "vibrant", "dynamic", "active", "spirited", "enthusiastic"],
-            "mysterious": ["mysterious", "enigmatic", "puzzling", "curious", "strange", "cryptic", "obscure"]
-        }
-        
-        text = text.lower()
+        if features is None:
+            features = self.extract_features(text)
         atmosphere_scores = defaultdict(int)
         
-        for atmosphere, keywords in atmosphere_indicators.items():
+        for atmosphere, keywords in self.atmosphere_indicators.items():
             for keyword in keywords:
-                if keyword in text:
+                if features.has(keyword):
                     atmosphere_scores[atmosphere] += 1
         
         if atmosphere_scores:
@@ -302,50 +505,13 @@ class AdvancedEmotionAnalyzer:
         
         return effects
     
-    def _adjust_weight_by_context(self, text: str, keyword: str, base_weight: float) -> float:
-        """Adjust emotion keyword weight based on surrounding context."""
-        adjusted_weight = base_weight
-        
-        # Find the keyword position
-        keyword_pos = text.find(keyword)
-        if keyword_pos == -1:
-            return base_weight
-        
-        # Get surrounding context (50 characters before and after)
-        start = max(0, keyword_pos - 50)
-        end = min(len(text), keyword_pos + len(keyword) + 50)
-        context_window = text[start:end]
-        
-        # Check for intensifiers (increase weight)
-        for intensifier in self.context_patterns["intensifiers"]:
-            if intensifier in context_window:
-                adjusted_weight *= 1.3
-                break
-        
-        # Check for diminishers (decrease weight)
-        for diminisher in self.context_patterns["diminishers"]:
-            if diminisher in context_window:
-                adjusted_weight *= 0.7
-                break
-        
-        # Check for negation (invert emotion or reduce weight)
-        for negation in self.context_patterns["negation"]:
-            if negation in context_window:
-                adjusted_weight *= 0.5  # Reduce weight for negated emotions
-                break
-        
-        # Check for temporal context (sudden changes get higher weight)
-        for temporal in self.context_patterns["temporal"]:
-            if temporal in context_window:
-                if temporal in ["suddenly", "immediately"]:
-                    adjusted_weight *= 1.2
-                break
-        
-        return adjusted_weight
-    
-    def _extract_enhanced_context(self, text: str) -> str:
+    def _extract_enhanced_context(self, text: str, features: Optional[TextFeatures] = None) -> str:
         """Extract enhanced context with narrative flow detection."""
-        sentences = text.split('.')
+        if features is None:
+            features = self.extract_features(text)
+        
+        # Only the first two sentences are looked at
+        sentences = text.split('.', 2)
         if not sentences:
             return text[:100]
         
@@ -362,13 +528,13 @@ class AdvancedEmotionAnalyzer:
                 flow_indicators.append("emotional_shift")
         
         # Check for intensity changes
-        if any(word in text for word in self.context_patterns["intensifiers"]):
+        if any(features.has(word) for word in self.context_patterns["intensifiers"]):
             flow_indicators.append("intensifying")
         
         # Check for spatial context
         spatial_context = []
         for spatial_word in self.context_patterns["spatial"]:
-            if spatial_word in text:
+            if features.has(spatial_word):
                 spatial_context.append(spatial_word)
         
         # Build enhanced context
@@ -393,39 +559,65 @@ class AdvancedEmotionAnalyzer:
         Returns:
             EmotionalProgressionResult with progression analysis
         """
-        # Split text into segments
-        segments = self._segment_text(text, segment_length)
-        
-        # Analyze each segment
-        segment_emotions = []
-        for i, segment in enumerate(segments):
-            emotion_result = self.analyze_emotion(segment)
-            segment_emotions.append({
-                'segment_index': i,
-                'text': segment,
-                'emotion': emotion_result.primary_emotion,
-                'intensity': emotion_result.intensity,
-                'confidence': emotion_result.confidence,
-                'keywords': emotion_result.keywords
-            })
+        return self.analyze_emotional_progressions(text, (segment_length,))[segment_length]
+    
+    def analyze_emotional_progressions(self, text: str, segment_lengths: List[int]) -> Dict[int, 'EmotionalProgressionResult']:
+        """
+        Analyze emotional progression at several segment lengths at once.
         
-        # Analyze progression patterns
-        progression_patterns = self._identify_progression_patterns(segment_emotions)
+        The text is tokenized and scored once into prefix sums; each segment
+        is then scored from two cumulative sums instead of being re-analyzed.
         
-        # Calculate emotional arc metrics
-        arc_metrics = self._calculate_emotional_arc(segment_emotions)
+        Args:
+            text: The text to analyze
+            segment_lengths: Segment lengths in characters, one result per length
+            
+        Returns:
+            Dictionary mapping each segment length to its EmotionalProgressionResult
+        """
+        profile = self.emotion_lexicon.profile(text)
+        
+        results = {}
+        for segment_length in segment_lengths:
+            # Score each segment from the shared profile
+            segment_emotions = []
+            spans = self._segment_spans(text, segment_length)
+            for i, ((start, end), lexicon_score) in enumerate(zip(spans, profile.window_scores(spans))):
+                emotion, intensity, confidence = self._primary_emotion(lexicon_score)
+                segment_emotions.append({
+                    'segment_index': i,
+                    'text': text[start:end].strip(),
+                    'emotion': emotion,
+                    'intensity': intensity,
+                    'confidence': confidence,
+                    'keywords': lexicon_score.keywords
+                })
+            
+            # Analyze progression patterns
+            progression_patterns = self._identify_progression_patterns(segment_emotions)
+            
+            # Calculate emotional arc metrics
+            arc_metrics = self.calculate_emotional_arc(segment_emotions)
+            
+            results[segment_length] = EmotionalProgressionResult(
+                segments=segment_emotions,
+                progression_patterns=progression_patterns,
+                arc_metrics=arc_metrics,
+                overall_trend=self.determine_overall_trend(segment_emotions)
+            )
         
-        return EmotionalProgressionResult(
-            segments=segment_emotions,
-            progression_patterns=progression_patterns,
-            arc_metrics=arc_metrics,
-            overall_trend=self._determine_overall_trend(segment_emotions)
-        )
+        return results
     
     def _segment_text(self, text: str, segment_length: int) -> List[str]:
         """Split text into overlapping segments for analysis."""
-        segments = []
+        return [text[start:end].strip() for start, end in self._segment_spans(text, segment_length)]
+    
+    def _segment_spans(self, text: str, segment_length: int) -> List[Tuple[int, int]]:
+        """Return the (start, end) character spans of overlapping, non-empty segments."""
+        spans = []
         start = 0
+        # 20 character overlap for continuity, less for very short segments
+        overlap = min(20, segment_length // 5)
         
         while start < len(text):
             end = start + segment_length
@@ -438,17 +630,16 @@ class AdvancedEmotionAnalyzer:
                         end = i + 1
                         break
             
-            segment = text[start:end].strip()
-            if segment:
-                segments.append(segment)
+            if text[start:end].strip():
+                spans.append((start, min(end, len(text))))
             
             # Move start position (with some overlap for continuity)
-            start = end - 20  # 20 character overlap
+            start = end - overlap
             
             if start >= len(text):
                 break
         
-        return segments
+        return spans
     
     def _identify_progression_patterns(self, segment_emotions: List[Dict]) -> Dict[str, any]:
         """Identify patterns in emotional progression."""
@@ -539,8 +730,11 @@ class AdvancedEmotionAnalyzer:
         squared_diff_sum = sum((x - mean) ** 2 for x in values)
         return squared_diff_sum / (len(values) - 1)
     
-    def _calculate_emotional_arc(self, segment_emotions: List[Dict]) -> Dict[str, any]:
-        """Calculate metrics describing the emotional arc."""
+    def calculate_emotional_arc(self, segment_emotions: List[Dict]) -> Dict[str, any]:
+        """
+        Calculate metrics describing the emotional arc of a sequence of
+        segments, each a dict with at least 'emotion' and 'intensity'.
+        """
         if not segment_emotions:
             return {}
         
@@ -603,7 +797,7 @@ class AdvancedEmotionAnalyzer:
         
         return "unknown"
     
-    def _determine_overall_trend(self, segment_emotions: List[Dict]) -> str:
+    def determine_overall_trend(self, segment_emotions: List[Dict]) -> str:
         """Determine the overall emotional trend of the passage."""
         if len(segment_emotions) < 2:
             return "insufficient_data"
@@ -735,23 +929,26 @@ class AdvancedEmotionAnalyzer:
                 overall_structure="unknown"
             )
         
+        # Match the whole narrative lexicon once; every analysis reads from it
+        matches = scan_narrative(text.lower())
+        
         # Analyze story elements
-        story_elements = self._identify_story_elements(text)
+        story_elements = self._identify_story_elements(text, matches)
         
         # Analyze character development
-        character_development = self._analyze_character_development(text)
+        character_development = self._analyze_character_development(text, matches)
         
         # Analyze plot progression
-        plot_progression = self._analyze_plot_progression(text)
+        plot_progression = self._analyze_plot_progression(text, matches)
         
         # Analyze narrative pacing
-        narrative_pacing = self._analyze_narrative_pacing(text)
+        narrative_pacing = self._analyze_narrative_pacing(text, matches)
         
         # Analyze conflict and resolution
-        conflict_resolution = self._analyze_conflict_resolution(text)
+        conflict_resolution = self._analyze_conflict_resolution(text, matches)
         
         # Analyze setting details
-        setting_details = self._analyze_setting_details(text)
+        setting_details = self._analyze_setting_details(text, matches)
         
         # Determine overall structure
         overall_structure = self._classify_narrative_structure(
@@ -768,56 +965,26 @@ class AdvancedEmotionAnalyzer:
             overall_structure=overall_structure
         )
 
-    def _identify_story_elements(self, text: str) -> List[Dict]:
+    def _identify_story_elements(self, text: str, matches: Optional[Dict] = None) -> List[Dict]:
         """Identify key story elements in the text."""
         story_elements = []
-        text_lower = text.lower()
-        
-        # Define story element patterns
-        story_patterns = {
-            'exposition': [
-                r'\b(introduc|present|establish|begin|start)\w*\b',
-                r'\b(setting|background|context|situation)\b',
-                r'\b(once|long ago|in the beginning|at first)\b'
-            ],
-            'rising_action': [
-                r'\b(then|next|suddenly|however|but|meanwhile)\b',
-                r'\b(problem|challenge|difficulty|obstacle|conflict)\b',
-                r'\b(tension|suspense|build|increase|grow)\b'
-            ],
-            'climax': [
-                r'\b(finally|at last|the moment|peak|highest)\b',
-                r'\b(explosion|burst|breakthrough|realization)\b',
-                r'\b(critical|decisive|pivotal|turning point)\b'
-            ],
-            'falling_action': [
-                r'\b(after|following|consequently|as a result)\b',
-                r'\b(calm|settle|resolve|wind down)\b',
-                r'\b(conclusion|ending|final|last)\b'
-            ],
-            'resolution': [
-                r'\b(resolve|solve|fix|heal|reconcile)\b',
-                r'\b(peace|harmony|understanding|acceptance)\b',
-                r'\b(learn|grow|change|transform)\b'
-            ]
-        }
-        
-        for element_type, patterns in story_patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-                for match in matches:
-                    # Get context around the match
-                    start = max(0, match.start() - 50)
-                    end = min(len(text), match.end() + 50)
-                    context = text[start:end].strip()
-                    
-                    story_elements.append({
-                        'type': element_type,
-                        'keyword': match.group(),
-                        'position': match.start(),
-                        'context': context,
-                        'confidence': self._calculate_story_element_confidence(context, element_type)
-                    })
+        if matches is None:
+            matches = scan_narrative(text.lower())
+        
+        for element_type, element_matches in matches["story_elements"].items():
+            for match in element_matches:
+                # Get context around the match
+                start = max(0, match.start() - 50)
+                end = min(len(text), match.end() + 50)
+                context = text[start:end].strip()
+                
+                story_elements.append({
+                    'type': element_type,
+                    'keyword': match.group(),
+                    'position': match.start(),
+                    'context': context,
+                    'confidence': self._calculate_story_element_confidence(context, element_type)
+                })
         
         # Remove duplicates and sort by position
         unique_elements = []
@@ -829,55 +996,30 @@ class AdvancedEmotionAnalyzer:
         
         return unique_elements
 
-    def _analyze_character_development(self, text: str) -> List[Dict]:
+    def _analyze_character_development(self, text: str, matches: Optional[Dict] = None) -> List[Dict]:
         """Analyze character development and interactions."""
         character_development = []
-        text_lower = text.lower()
-        
-        # Character-related patterns
-        character_patterns = {
-            'character_introduction': [
-                r'\b(character|person|man|woman|boy|girl|child)\b',
-                r'\b(name|called|known as|referred to as)\b',
-                r'\b(appearance|looked|appeared|seemed)\b'
-            ],
-            'character_growth': [
-                r'\b(learn|grow|change|develop|evolve|transform)\b',
-                r'\b(realize|understand|discover|find out)\b',
-                r'\b(overcome|face|deal with|handle)\b'
-            ],
-            'character_relationships': [
-                r'\b(friend|enemy|ally|rival|partner|companion)\b',
-                r'\b(love|hate|trust|betray|support|oppose)\b',
-                r'\b(together|apart|separate|unite|divide)\b'
-            ],
-            'character_conflict': [
-                r'\b(struggle|fight|argue|disagree|conflict)\b',
-                r'\b(anger|fear|sadness|joy|surprise)\b',
-                r'\b(decision|choice|dilemma|problem)\b'
-            ]
-        }
-        
-        for development_type, patterns in character_patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-                for match in matches:
-                    # Get context around the match
-                    start = max(0, match.start() - 60)
-                    end = min(len(text), match.end() + 60)
-                    context = text[start:end].strip()
-                    
-                    character_development.append({
-                        'type': development_type,
-                        'keyword': match.group(),
-                        'position': match.start(),
-                        'context': context,
-                        'intensity': self._calculate_character_intensity(context)
-                    })
+        if matches is None:
+            matches = scan_narrative(text.lower())
+        
+        for development_type, development_matches in matches["character_development"].items():
+            for match in development_matches:
+                # Get context around the match
+                start = max(0, match.start() - 60)
+                end = min(len(text), match.end() + 60)
+                context = text[start:end].strip()
+                
+                character_development.append({
+                    'type': development_type,
+                    'keyword': match.group(),
+                    'position': match.start(),
+                    'context': context,
+                    'intensity': self._calculate_character_intensity(context)
+                })
         
         return character_development
 
-    def _analyze_plot_progression(self, text: str) -> Dict[str, any]:
+    def _analyze_plot_progression(self, text: str, matches: Optional[Dict] = None) -> Dict[str, any]:
         """Analyze the progression of the plot."""
         plot_progression = {
             'plot_points': [],
@@ -886,21 +1028,14 @@ class AdvancedEmotionAnalyzer:
             'tension_levels': []
         }
         
-        text_lower = text.lower()
-        
-        # Plot progression indicators
-        progression_indicators = [
-            r'\b(begin|start|commence|initiate)\b',
-            r'\b(develop|progress|advance|move forward)\b',
-            r'\b(complicate|intensify|escalate|heighten)\b',
-            r'\b(resolve|conclude|end|finish)\b'
-        ]
+        if matches is None:
+            matches = scan_narrative(text.lower())
         
-        for i, pattern in enumerate(progression_indicators):
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
+        # Plot progression indicators, stage by stage
+        for stage, stage_matches in matches["plot_progression"].items():
+            for match in stage_matches:
                 plot_progression['plot_points'].append({
-                    'stage': ['beginning', 'development', 'complication', 'resolution'][i],
+                    'stage': stage,
                     'position': match.start(),
                     'keyword': match.group()
                 })
@@ -915,7 +1050,7 @@ class AdvancedEmotionAnalyzer:
         
         return plot_progression
 
-    def _analyze_narrative_pacing(self, text: str) -> Dict[str, any]:
+    def _analyze_narrative_pacing(self, text: str, matches: Optional[Dict] = None) -> Dict[str, any]:
         """Analyze the pacing and rhythm of the narrative."""
         narrative_pacing = {
             'pace_indicators': [],
@@ -924,24 +1059,13 @@ class AdvancedEmotionAnalyzer:
             'overall_pace': 'moderate'
         }
         
-        text_lower = text.lower()
-        
-        # Pacing indicators
-        fast_pace = [
-            r'\b(suddenly|quickly|rapidly|swiftly|immediately)\b',
-            r'\b(urgent|hurry|rush|fast|quick)\b',
-            r'\b(explosion|burst|crash|bang|flash)\b'
-        ]
-        
-        slow_pace = [
-            r'\b(gradually|slowly|gently|carefully|patiently)\b',
-            r'\b(calm|peaceful|tranquil|serene|quiet)\b',
-            r'\b(reflect|contemplate|consider|think|ponder)\b'
-        ]
+        if matches is None:
+            matches = scan_narrative(text.lower())
+        pacing_matches = matches["narrative_pacing"]
         
         # Count pacing indicators
-        fast_count = sum(len(re.findall(pattern, text_lower, re.IGNORECASE)) for pattern in fast_pace)
-        slow_count = sum(len(re.findall(pattern, text_lower, re.IGNORECASE)) for pattern in slow_pace)
+        fast_count = len(pacing_matches['fast'])
+        slow_count = len(pacing_matches['slow'])
         
         # Determine overall pace
         if fast_count > slow_count * 2:
@@ -952,18 +1076,17 @@ class AdvancedEmotionAnalyzer:
             narrative_pacing['overall_pace'] = 'moderate'
         
         # Add pace indicators to the result
-        for pattern in fast_pace + slow_pace:
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
+        for pace, pace_matches in pacing_matches.items():
+            for match in pace_matches:
                 narrative_pacing['pace_indicators'].append({
-                    'type': 'fast' if pattern in fast_pace else 'slow',
+                    'type': pace,
                     'keyword': match.group(),
                     'position': match.start()
                 })
         
         return narrative_pacing
 
-    def _analyze_conflict_resolution(self, text: str) -> Dict[str, any]:
+    def _analyze_conflict_resolution(self, text: str, matches: Optional[Dict] = None) -> Dict[str, any]:
         """Analyze conflict and resolution patterns."""
         conflict_resolution = {
             'conflicts': [],
@@ -972,43 +1095,24 @@ class AdvancedEmotionAnalyzer:
             'resolution_type': 'unknown'
         }
         
-        text_lower = text.lower()
-        
-        # Conflict patterns
-        conflict_patterns = [
-            r'\b(problem|issue|trouble|difficulty|challenge)\b',
-            r'\b(conflict|dispute|argument|fight|battle)\b',
-            r'\b(obstacle|barrier|hurdle|impediment|block)\b',
-            r'\b(danger|threat|risk|peril|hazard)\b'
-        ]
-        
-        # Resolution patterns
-        resolution_patterns = [
-            r'\b(solve|resolve|fix|repair|heal)\b',
-            r'\b(overcome|defeat|conquer|triumph|succeed)\b',
-            r'\b(understand|realize|discover|learn|grow)\b',
-            r'\b(peace|harmony|agreement|compromise|reconciliation)\b'
-        ]
+        if matches is None:
+            matches = scan_narrative(text.lower())
         
         # Find conflicts
-        for pattern in conflict_patterns:
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                conflict_resolution['conflicts'].append({
-                    'keyword': match.group(),
-                    'position': match.start(),
-                    'type': self._classify_conflict_type(match.group())
-                })
+        for match in matches["conflict_resolution"]['conflicts']:
+            conflict_resolution['conflicts'].append({
+                'keyword': match.group(),
+                'position': match.start(),
+                'type': self._classify_conflict_type(match.group())
+            })
         
         # Find resolutions
-        for pattern in resolution_patterns:
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                conflict_resolution['resolutions'].append({
-                    'keyword': match.group(),
-                    'position': match.start(),
-                    'type': self._classify_resolution_type(match.group())
-                })
+        for match in matches["conflict_resolution"]['resolutions']:
+            conflict_resolution['resolutions'].append({
+                'keyword': match.group(),
+                'position': match.start(),
+                'type': self._classify_resolution_type(match.group())
+            })
         
         # Determine tension arc
         if conflict_resolution['conflicts'] and conflict_resolution['resolutions']:
@@ -1022,7 +1126,7 @@ class AdvancedEmotionAnalyzer:
         
         return conflict_resolution
 
-    def _analyze_setting_details(self, text: str) -> Dict[str, any]:
+    def _analyze_setting_details(self, text: str, matches: Optional[Dict] = None) -> Dict[str, any]:
         """Analyze setting and environmental details."""
         setting_details = {
             'locations': [],
@@ -1031,55 +1135,13 @@ class AdvancedEmotionAnalyzer:
             'environmental_features': []
         }
         
-        text_lower = text.lower()
-        
-        # Location patterns
-        location_patterns = [
-            r'\b(house|building|room|chamber|hall)\b',
-            r'\b(forest|mountain|river|ocean|desert)\b',
-            r'\b(city|town|village|castle|palace)\b',
-            r'\b(inside|outside|within|beyond|near|far)\b'
-        ]
+        if matches is None:
+            matches = scan_narrative(text.lower())
         
-        # Time period patterns
-        time_patterns = [
-            r'\b(morning|noon|afternoon|evening|night)\b',
-            r'\b(spring|summer|autumn|winter|season)\b',
-            r'\b(ancient|modern|future|past|present)\b',
-            r'\b(century|decade|year|month|week|day)\b'
-        ]
-        
-        # Atmospheric patterns
-        atmosphere_patterns = [
-            r'\b(dark|light|bright|dim|shadow)\b',
-            r'\b(warm|cold|hot|cool|temperature)\b',
-            r'\b(quiet|loud|silent|noisy|sound)\b',
-            r'\b(fresh|stale|clean|dirty|pure)\b'
-        ]
-        
-        # Find locations
-        for pattern in location_patterns:
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                setting_details['locations'].append({
-                    'keyword': match.group(),
-                    'position': match.start()
-                })
-        
-        # Find time periods
-        for pattern in time_patterns:
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                setting_details['time_periods'].append({
-                    'keyword': match.group(),
-                    'position': match.start()
-                })
-        
-        # Find atmospheric elements
-        for pattern in atmosphere_patterns:
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                setting_details['atmospheric_elements'].append({
+        # Find locations, time periods and atmospheric elements
+        for detail_type, detail_matches in matches["setting_details"].items():
+            for match in detail_matches:
+                setting_details[detail_type].append({
                     'keyword': match.group(),
                     'position': match.start()
                 })
@@ -1573,51 +1635,83 @@ TRIGGER_PATTERNS = {
     }
 }
 
-def get_random_sound_from_folder(folder_path: str) -> str:
+register_patterns(pattern for pattern_data in TRIGGER_PATTERNS.values() for pattern in pattern_data["patterns"])
+
+_trigger_matcher = None
+
+def _get_trigger_matcher() -> CompiledPatternSet:
+    """
+    Return every trigger pattern compiled into one matcher, highest priority
+    first, compiling it on first use.
+    
+    Patterns are matched against case-folded text, so they are compiled
+    without IGNORECASE.
+    """
+    global _trigger_matcher
+    if _trigger_matcher is None:
+        sorted_patterns = sorted(TRIGGER_PATTERNS.items(), key=lambda x: x[1]["priority"], reverse=True)
+        _trigger_matcher = CompiledPatternSet([
+            (pattern_name, pattern, pattern_data)
+            for pattern_name, pattern_data in sorted_patterns
+            for pattern in pattern_data["patterns"]
+        ], flags=0, prefilter=True)
+    return _trigger_matcher
+
+def get_random_sound_from_folder(folder_path: str, seed: Optional[str] = None) -> str:
     """
     Get a random sound file from a trigger folder.
     
     Args:
         folder_path: Path to the trigger folder (e.g., "triggers/footsteps")
+        seed: If given, the choice is derived from the seed and the sound
+            catalog version instead of being random, so the same seed picks
+            the same file until the sound files change
         
     Returns:
         Full path to a random sound file, or default if folder doesn't exist
     """
-    import os
     import random
+    from .sound_catalog import get_sound_catalog
     
-    # Base path for sound files (adjust as needed)
-    base_path = "mobile/app/sounds"  # or wherever your sounds are stored
-    
-    # Construct full folder path
-    full_folder_path = os.path.join(base_path, folder_path)
-    
-    # Check if folder exists
-    if not os.path.exists(full_folder_path):
-        # Return default sound if folder doesn't exist
-        return f"{folder_path}/default.mp3"
-    
-    # Get all sound files in the folder
-    sound_files = []
-    for file in os.listdir(full_folder_path):
-        if file.lower().endswith(('.mp3', '.wav', '.ogg')):
-            sound_files.append(file)
+    # Sound files come from the in-memory catalog, not the filesystem
+    catalog = get_sound_catalog()
+    sound_files = catalog.files(folder_path)
     
     # If no sound files found, return default
     if not sound_files:
         return f"{folder_path}/default.mp3"
     
+    if seed is not None:
+        return catalog.choose(folder_path, seed)
+    
     # Return random sound file
-    random_sound = random.choice(sound_files)
-    return f"{folder_path}/{random_sound}"
+    return random.choice(sound_files).path
+
+# Whitespace-delimited words, as str.split() sees them
+_WORD_SPAN_RE = re.compile(r"\S+")
+
+def compute_word_offsets(text: str) -> List[int]:
+    """
+    Return the character offset at which each word of ``text`` starts.
+    
+    Words are whitespace-delimited, as with ``text.split()``, so the offsets
+    line up with the word positions the reader highlights during playback.
+    """
+    return [match.start() for match in _WORD_SPAN_RE.finditer(text or "")]
 
-def find_trigger_words(text: str) -> List[Dict]:
+def find_trigger_words(text: str, text_lower: Optional[str] = None,
+                       word_offsets: Optional[Sequence[int]] = None, select_sounds: bool = True) -> List[Dict]:
     """
     Advanced regex-based trigger word detection with folder-based sound pools.
     Enhanced to provide both character and word positions for frontend synchronization.
     
     Args:
         text: The text to analyze
+        text_lower: The lowercased text, if the caller has already computed it
+        word_offsets: The text's word offsets (see compute_word_offsets), if
+            the caller has already computed them
+        select_sounds: Pick a random sound from each trigger's folder; if
+            False, "sound" is None and the caller picks from "folder_path"
         
     Returns:
         List of dictionaries with word/phrase, sound, timing, and position information
@@ -1625,74 +1719,70 @@ def find_trigger_words(text: str) -> List[Dict]:
     if not text:
         return []
     
-    text_lower = text.lower()
+    if text_lower is None:
+        text_lower = text.lower()
+    if word_offsets is None:
+        word_offsets = compute_word_offsets(text)
     trigger_words = []
     
     # Calculate estimated reading time (words per minute)
-    words = text.split()
-    estimated_reading_time_minutes = len(words) / 200.0  # 200 words per minute
+    word_count = len(word_offsets)
+    estimated_reading_time_minutes = word_count / 200.0  # 200 words per minute
     estimated_reading_time_seconds = estimated_reading_time_minutes * 60
     
     # Track used positions to avoid overlapping triggers
-    used_positions = set()
-    
-    # Sort patterns by priority (higher priority first)
-    sorted_patterns = sorted(TRIGGER_PATTERNS.items(), key=lambda x: x[1]["priority"], reverse=True)
+    used_positions = SpanIndex()
     
-    for pattern_name, pattern_data in sorted_patterns:
-        for pattern in pattern_data["patterns"]:
-            # Find all matches for this pattern
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE)
+    # One scan of the text finds the matches of every pattern; they come
+    # back in priority order (higher priority first), then text order. The
+    # text is already lowercase, so case folding only has to map the few
+    # characters IGNORECASE would equate with ASCII letters.
+    for rule, match in _get_trigger_matcher().iter_matches(fold_case(text_lower)):
+        pattern_name, pattern_data = rule.key, rule.metadata
+        start_pos = match.start()
+        end_pos = match.end()
+        
+        # Check if this position overlaps with already used positions
+        if not used_positions.overlaps(start_pos, end_pos):
+            # Calculate timing based on position in text
+            progress_ratio = start_pos / len(text)
+            timing = progress_ratio * estimated_reading_time_seconds
             
-            for match in matches:
-                start_pos = match.start()
-                end_pos = match.end()
-                
-                # Check if this position overlaps with already used positions
-                position_overlaps = any(
-                    start_pos < used_end and end_pos > used_start
-                    for used_start, used_end in used_positions
-                )
-                
-                if not position_overlaps:
-                    # Calculate timing based on position in text
-                    progress_ratio = start_pos / len(text)
-                    timing = progress_ratio * estimated_reading_time_seconds
-                    
-                    # Calculate word position for frontend synchronization
-                    word_position = _calculate_word_position(text, start_pos)
-                    
-                    # Get random sound from folder
-                    selected_sound = get_random_sound_from_folder(pattern_data["sound_folder"])
-                    
-                    trigger_words.append({
-                        "word": match.group(),
-                        "sound": selected_sound,
-                        "timing": timing,
-                        "position": start_pos,  # Character position in text
-                        "word_position": word_position,  # Word position (0-indexed)
-                        "word_count": len(words),  # Total words in text
-                        "type": "regex_pattern",
-                        "pattern_name": pattern_name,
-                        "folder_path": pattern_data["sound_folder"],
-                        "context": _get_word_context(text, start_pos, end_pos)  # Surrounding context
-                    })
-                    
-                    # Mark this position as used
-                    used_positions.add((start_pos, end_pos))
+            # Calculate word position for frontend synchronization
+            word_position = _calculate_word_position(text, start_pos, word_offsets)
+            
+            # Get random sound from folder
+            selected_sound = get_random_sound_from_folder(pattern_data["sound_folder"]) if select_sounds else None
+            
+            trigger_words.append({
+                "word": text_lower[start_pos:end_pos],
+                "sound": selected_sound,
+                "timing": timing,
+                "position": start_pos,  # Character position in text
+                "word_position": word_position,  # Word position (0-indexed)
+                "word_count": word_count,  # Total words in text
+                "type": "regex_pattern",
+                "pattern_name": pattern_name,
+                "folder_path": pattern_data["sound_folder"],
+                "context": _get_word_context(text, start_pos, end_pos)  # Surrounding context
+            })
+            
+            # Mark this position as used
+            used_positions.add(start_pos, end_pos)
     
     # Sort by timing
     trigger_words.sort(key=lambda x: x["timing"])
     
     return trigger_words
 
-def _calculate_word_position(text: str, char_position: int) -> int:
+def _calculate_word_position(text: str, char_position: int, word_offsets: Optional[Sequence[int]] = None) -> int:
     """
     Calculate the word position (0-indexed) for a given character position.
     
     Args:
         text: The full text
         char_position: Character position in the text
+        word_offsets: The text's word offsets; computed if not given
         
     Returns:
         Word position (0-indexed)
@@ -1700,10 +1790,11 @@ def _calculate_word_position(text: str, char_position: int) -> int:
     if char_position >= len(text):
         return 0
     
-    # Count words up to the character position
-    text_before = text[:char_position]
-    words_before = text_before.split()
-    return len(words_before)
+    if word_offsets is None:
+        word_offsets = compute_word_offsets(text)
+    
+    # Words starting before the character position
+    return bisect_left(word_offsets, char_position)
 
 def _get_word_context(text: str, start_pos: int, end_pos: int, context_chars: int = 50) -> str:
     """
@@ -0,0 +1,169 @@
+import hashlib
+import json
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, defer, undefer
+
+from app.models.analysis import EmotionArcRecord
+from app.models.book import Chapter, Page
+from .emotion_analysis import EmotionType, emotion_analyzer
+from .soundscape import ContentHashExpression, get_page_analyses, get_ruleset_version
+
+
+def _source_hash(parts: List[Any]) -> str:
+    """Fingerprint of everything an arc is rolled up from."""
+    return hashlib.sha256(json.dumps([get_ruleset_version(), parts]).encode("utf-8")).hexdigest()
+
+
+def build_emotional_arc(page_emotions: List[str], page_intensities: List[float]) -> Dict[str, Any]:
+    """
+    Roll per-page emotions up into an emotional arc, one segment per page.
+
+    Uses the same arc metrics and trend classification as emotional
+    progression within a single text.
+    """
+    segments = [
+        {"segment_index": index, "emotion": EmotionType(emotion), "intensity": intensity}
+        for index, (emotion, intensity) in enumerate(zip(page_emotions, page_intensities))
+    ]
+    return {
+        "pages": len(segments),
+        "page_emotions": page_emotions,
+        "page_intensities": page_intensities,
+        "emotion_distribution": dict(Counter(page_emotions).most_common()),
+        "arc_metrics": emotion_analyzer.calculate_emotional_arc(segments),
+        "overall_trend": emotion_analyzer.determine_overall_trend(segments)
+    }
+
+
+def _load_arc(scope: str, source_hash: str, db: Session) -> Optional[Dict[str, Any]]:
+    record = db.query(EmotionArcRecord).filter(EmotionArcRecord.scope == scope).first()
+    if record and record.source_hash == source_hash:
+        return json.loads(record.arc)
+    return None
+
+
+def _save_arc(scope: str, book_id: int, chapter_id: Optional[int], source_hash: str,
+              arc: Dict[str, Any], db: Session) -> None:
+    record = db.query(EmotionArcRecord).filter(EmotionArcRecord.scope == scope).first()
+    if record:
+        record.source_hash = source_hash
+        record.arc = json.dumps(arc)
+    else:
+        db.add(EmotionArcRecord(
+            scope=scope, book_id=book_id, chapter_id=chapter_id, source_hash=source_hash, arc=json.dumps(arc)
+        ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request stored this arc first; its result is equivalent
+        db.rollback()
+
+
+def _content_hashes(pages: List[Page], db: Session) -> Dict[int, str]:
+    """Content hash of each page, computed by the database from the live page content."""
+    return dict(
+        db.query(Page.id, ContentHashExpression(Page.content))
+        .filter(Page.id.in_([page.id for page in pages]))
+    )
+
+
+def _chapter_arc(chapter: Chapter, pages: List[Page], content_hashes: Dict[int, str],
+                 db: Session) -> Dict[str, Any]:
+    """
+    Emotional arc of one chapter from its pages' stored emotion summaries.
+
+    The cached arc is checked against the current content hashes of the
+    pages, so a cache hit never loads page content, and an edited page
+    invalidates its chapter arc however it was edited. On a miss the pages
+    are loaded and only those without a current stored summary are
+    analyzed.
+    """
+    scope = f"chapter:{chapter.id}"
+    source_hash = _source_hash([(page.id, content_hashes[page.id]) for page in pages])
+    arc = _load_arc(scope, source_hash, db)
+    if arc is None:
+        # Page content is deferred by _book_pages; load it for all pages at once
+        db.query(Page).options(undefer(Page.content)).filter(Page.id.in_([page.id for page in pages])).all()
+        analyses = get_page_analyses(pages, db, ("emotion_summary",))
+        summaries = [analyses[page.id]["emotion_summary"] for page in pages]
+        arc = build_emotional_arc(
+            [summary["primary_emotion"] for summary in summaries],
+            [summary["intensity"] for summary in summaries]
+        )
+        _save_arc(scope, chapter.book_id, chapter.id, source_hash, arc, db)
+    return {"chapter_number": chapter.chapter_number, "source_hash": source_hash, **arc}
+
+
+def _book_pages(book_id: int, db: Session, chapter_number: Optional[int] = None) -> Dict[Chapter, List[Page]]:
+    query = db.query(Chapter).filter(Chapter.book_id == book_id)
+    if chapter_number is not None:
+        query = query.filter(Chapter.chapter_number == chapter_number)
+    chapters = query.order_by(Chapter.chapter_number).all()
+    if not chapters:
+        return {}
+
+    pages: Dict[int, List[Page]] = {chapter.id: [] for chapter in chapters}
+    for page in (
+        db.query(Page)
+        .options(defer(Page.content))
+        .filter(Page.chapter_id.in_(list(pages)))
+        .order_by(Page.page_number)
+    ):
+        pages[page.chapter_id].append(page)
+    return {chapter: pages[chapter.id] for chapter in chapters}
+
+
+def get_chapter_emotional_arc(book_id: int, chapter_number: int, db: Session) -> Optional[Dict[str, Any]]:
+    """Emotional arc of one chapter, one segment per page; None if there is no such chapter."""
+    chapters = _book_pages(book_id, db, chapter_number)
+    if not chapters:
+        return None
+    chapter, pages = next(iter(chapters.items()))
+    arc = _chapter_arc(chapter, pages, _content_hashes(pages, db), db)
+    arc.pop("source_hash")
+    return {"book_id": book_id, **arc}
+
+
+def get_book_emotional_arc(book_id: int, db: Session) -> Optional[Dict[str, Any]]:
+    """
+    Emotional arc of a whole book, rolled up from its chapter arcs.
+
+    When a page changes, only that page is re-analyzed and only its chapter
+    arc and the book arc are rolled up again; every other chapter arc is
+    read back from the cache. Returns None if the book has no chapters.
+
+    Returns:
+        The book arc over all pages, with a short arc summary per chapter
+    """
+    chapters = _book_pages(book_id, db)
+    if not chapters:
+        return None
+
+    content_hashes = _content_hashes([page for pages in chapters.values() for page in pages], db)
+    chapter_arcs = [_chapter_arc(chapter, pages, content_hashes, db) for chapter, pages in chapters.items()]
+    source_hash = _source_hash([arc["source_hash"] for arc in chapter_arcs])
+    scope = f"book:{book_id}"
+    arc = _load_arc(scope, source_hash, db)
+    if arc is None:
+        arc = build_emotional_arc(
+            [emotion for chapter_arc in chapter_arcs for emotion in chapter_arc["page_emotions"]],
+            [intensity for chapter_arc in chapter_arcs for intensity in chapter_arc["page_intensities"]]
+        )
+        _save_arc(scope, book_id, None, source_hash, arc, db)
+
+    return {
+        "book_id": book_id,
+        **arc,
+        "chapters": [
+            {
+                "chapter_number": chapter_arc["chapter_number"],
+                "pages": chapter_arc["pages"],
+                "arc_metrics": chapter_arc["arc_metrics"],
+                "overall_trend": chapter_arc["overall_trend"]
+            }
+            for chapter_arc in chapter_arcs
+        ]
+    }
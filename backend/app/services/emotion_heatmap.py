@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .emotion_analysis import emotion_analyzer
+from .lexicon import tokenize
+
+DEFAULT_BUCKET_TOKENS = 100
+
+# Summed keyword weight at which a bucket reaches full intensity; the same
+# scale analyze_emotion uses for a single text
+FULL_INTENSITY_WEIGHT = 3.0
+
+
+@dataclass
+class EmotionHeatmap:
+    """Emotion intensity per fixed-width token bucket of a text."""
+    emotions: List[str]  # row labels
+    bucket_tokens: int
+    total_tokens: int
+    intensities: np.ndarray  # shape (len(emotions), buckets), values in [0, 1]
+    page_offsets: List[int]  # token index at which each page starts
+
+    def to_dict(self, decimals: int = 3) -> Dict[str, Any]:
+        return {
+            "emotions": self.emotions,
+            "bucket_tokens": self.bucket_tokens,
+            "buckets": int(self.intensities.shape[1]),
+            "total_tokens": self.total_tokens,
+            "page_offsets": self.page_offsets,
+            "intensities": np.round(self.intensities, decimals).tolist()
+        }
+
+
+def build_emotion_heatmap(pages: Iterable[str], bucket_tokens: int = DEFAULT_BUCKET_TOKENS) -> EmotionHeatmap:
+    """
+    Build the emotion heatmap of a sequence of pages read as one text.
+
+    Every page is tokenized once and the lexicon is applied to the token
+    stream as a whole, so modifiers reach across page breaks. The weights of
+    all keyword hits are then summed per (emotion, bucket) cell in a single
+    vectorized bincount.
+
+    Args:
+        pages: Page texts in reading order
+        bucket_tokens: Tokens per bucket (column)
+
+    Returns:
+        EmotionHeatmap with one row per emotion
+    """
+    if bucket_tokens < 1:
+        raise ValueError("bucket_tokens must be at least 1")
+
+    lexicon = emotion_analyzer.emotion_lexicon
+    tokens: List[str] = []
+    page_offsets = []
+    for text in pages:
+        page_offsets.append(len(tokens))
+        tokens.extend(tokenize(text or ""))
+
+    emotions = list(lexicon.emotions)
+    buckets = -(-len(tokens) // bucket_tokens)
+    hits = lexicon.keyword_hits(tokens)
+
+    if hits:
+        rows = {emotion: row for row, emotion in enumerate(emotions)}
+        indices = np.fromiter((hit[0] for hit in hits), dtype=np.int64, count=len(hits))
+        emotion_rows = np.fromiter((rows[hit[2]] for hit in hits), dtype=np.int64, count=len(hits))
+        weights = np.fromiter((hit[3] for hit in hits), dtype=np.float64, count=len(hits))
+        cells = emotion_rows * buckets + indices // bucket_tokens
+        totals = np.bincount(cells, weights=weights, minlength=len(emotions) * buckets)
+        intensities = np.minimum(totals.reshape(len(emotions), buckets) / FULL_INTENSITY_WEIGHT, 1.0)
+    else:
+        intensities = np.zeros((len(emotions), buckets))
+
+    return EmotionHeatmap(
+        emotions=emotions,
+        bucket_tokens=bucket_tokens,
+        total_tokens=len(tokens),
+        intensities=intensities,
+        page_offsets=page_offsets
+    )
+
+
+def get_emotion_heatmap(book_id: int, db: Session, chapter_number: Optional[int] = None,
+                        bucket_tokens: int = DEFAULT_BUCKET_TOKENS) -> Optional[Dict[str, Any]]:
+    """
+    Emotion heatmap of a whole book, or of one chapter of it.
+
+    Returns:
+        The heatmap as a dict, or None if the book or chapter has no pages
+    """
+    from app.models.book import Chapter, Page
+
+    query = (
+        db.query(Page.content)
+        .join(Chapter, Chapter.id == Page.chapter_id)
+        .filter(Chapter.book_id == book_id)
+    )
+    if chapter_number is not None:
+        query = query.filter(Chapter.chapter_number == chapter_number)
+    pages = [content for content, in query.order_by(Chapter.chapter_number, Page.page_number)]
+    if not pages:
+        return None
+
+    heatmap = build_emotion_heatmap(pages, bucket_tokens)
+    return {"book_id": book_id, "chapter_number": chapter_number, **heatmap.to_dict()}
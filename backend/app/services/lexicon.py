@@ -0,0 +1,299 @@
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; prefix sums fall back to lists
+    np = None
+
+from .literal_prefilter import AhoCorasick
+
+# Word tokens; contractions such as "doesn't" stay a single token
+_TOKEN_RE = re.compile(r"\w+(?:'\w+)*")
+
+# Modifier flags attached to token positions
+INTENSIFIER = 1
+DIMINISHER = 2
+NEGATION = 4
+
+# Temporal cues that mark a sudden change and boost nearby emotion words
+SUDDEN_TEMPORAL = frozenset(["suddenly", "immediately"])
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase ``text`` and split it into word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+@dataclass
+class LexiconScore:
+    """Emotion scores of a token sequence."""
+    scores: Dict[str, float]  # emotion value -> summed adjusted weight
+    keywords: List[str]  # distinct keywords found, in text order
+    occurrences: int  # keyword occurrences counted
+
+
+@dataclass
+class TextFeatures:
+    """Tokens of a text and the lexicon terms that occur in it."""
+    tokens: List[str]
+    terms: FrozenSet[str]  # lexicon terms found anywhere in the lowercased text
+
+    def has(self, term: str) -> bool:
+        return term in self.terms
+
+
+class FeatureIndex:
+    """
+    Finds every term of a set of lexicons in a single pass over a text.
+
+    A term is present when it occurs anywhere in the lowercased text, as the
+    lexicon analyses have always matched it: "hope" is found in "hopes" and
+    "hopeful", and phrases such as "kind of" are matched as written. All
+    terms are matched together by one Aho-Corasick automaton.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms: Tuple[str, ...] = tuple(dict.fromkeys(terms))
+        self._automaton = AhoCorasick(self.terms)
+        # Longest term, in characters
+        self.max_length = max((len(term) for term in self.terms), default=1)
+
+    def extract(self, text: str, tokens: Optional[List[str]] = None) -> TextFeatures:
+        """
+        Tokenize ``text`` and find the lexicon terms in it.
+
+        ``tokens`` are the text's tokens, if it has already been tokenized.
+        """
+        text = text.lower()
+        return TextFeatures(tokens=tokenize(text) if tokens is None else tokens, terms=self.find(text))
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """Return the lexicon terms that occur in already lowercased ``text``."""
+        return self._automaton.find(text)
+
+    def vector(self, features: TextFeatures) -> List[int]:
+        """Return term presence (0 or 1) as a dense vector in ``terms`` order."""
+        return [int(term in features.terms) for term in self.terms]
+
+
+class EmotionLexicon:
+    """
+    Token-level emotion scoring.
+
+    Instances are immutable once built and safe to share between analyzers
+    and threads.
+
+    Every emotion keyword is looked up in a single token -> (emotion, weight)
+    map, so a text is scored in one pass over its tokens and every occurrence
+    of a keyword counts. Each hit's weight is adjusted by the intensifiers,
+    diminishers, negations and temporal cues within ``window`` tokens on
+    either side of it, the keyword itself included: "suddenly" is both a
+    surprise keyword and a temporal cue, and boosts itself.
+    """
+
+    def __init__(self, emotion_keywords: Mapping[Any, Mapping[str, float]],
+                 context_patterns: Mapping[str, Sequence[str]], window: int = 8):
+        self.window = window
+
+        # Emotions in lexicon order, so ties resolve the same way every time
+        self.emotions: Tuple[str, ...] = tuple(getattr(emotion, "value", emotion) for emotion in emotion_keywords)
+
+        keyword_weights: Dict[str, List[Tuple[str, float]]] = {}
+        for emotion, keywords in emotion_keywords.items():
+            for keyword, weight in keywords.items():
+                keyword_weights.setdefault(keyword, []).append((getattr(emotion, "value", emotion), weight))
+        self.keyword_weights: Mapping[str, Tuple[Tuple[str, float], ...]] = MappingProxyType({
+            keyword: tuple(weights) for keyword, weights in keyword_weights.items()
+        })
+
+        # Modifier words and phrases, indexed by their first token
+        modifiers: Dict[str, List[Tuple[Tuple[str, ...], int]]] = {}
+        for flag, name in ((INTENSIFIER, "intensifiers"), (DIMINISHER, "diminishers"), (NEGATION, "negation")):
+            for phrase in context_patterns.get(name, ()):
+                words = tuple(tokenize(phrase))
+                if words:
+                    modifiers.setdefault(words[0], []).append((words, flag))
+        self.modifiers = MappingProxyType({first: tuple(entries) for first, entries in modifiers.items()})
+        self.max_modifier_words = max((len(words) for entries in modifiers.values() for words, _ in entries), default=1)
+
+        # The first temporal cue in list order decides whether a hit is boosted
+        self.temporal_ranks: Mapping[str, int] = MappingProxyType({
+            word: rank for rank, word in reversed(list(enumerate(context_patterns.get("temporal", ()))))
+        })
+
+    def modifier_flags(self, tokens: Sequence[str]) -> List[int]:
+        """Return the modifier flags that start at each token position."""
+        flags = [0] * len(tokens)
+        modifiers = self.modifiers
+        for index, token in enumerate(tokens):
+            entries = modifiers.get(token)
+            if not entries:
+                continue
+            for words, flag in entries:
+                if len(words) == 1 or tuple(tokens[index:index + len(words)]) == words:
+                    flags[index] |= flag
+        return flags
+
+    def adjust_weight(self, tokens: Sequence[str], flags: Sequence[int], index: int, weight: float) -> float:
+        """Apply the modifiers around and at ``tokens[index]`` to a keyword weight."""
+        start = max(0, index - self.window)
+        end = min(len(tokens), index + self.window + 1)
+
+        window_flags = 0
+        temporal = None
+        for position in range(start, end):
+            window_flags |= flags[position]
+            rank = self.temporal_ranks.get(tokens[position])
+            if rank is not None and (temporal is None or rank < temporal[0]):
+                temporal = (rank, tokens[position])
+
+        if window_flags & INTENSIFIER:
+            weight *= 1.3
+        if window_flags & DIMINISHER:
+            weight *= 0.7
+        if window_flags & NEGATION:
+            weight *= 0.5  # Reduce weight for negated emotions
+        if temporal and temporal[1] in SUDDEN_TEMPORAL:
+            weight *= 1.2
+        return weight
+
+    def keyword_hits(self, tokens: Sequence[str], start: int = 0, end: Optional[int] = None) -> List[Tuple[int, str, str, float]]:
+        """
+        Return (index, keyword, emotion, adjusted weight) for every keyword
+        occurrence in ``tokens[start:end]``, in token order; the tokens
+        around the range only serve as modifier context.
+
+        A keyword listed under several emotions gives one hit per emotion.
+        ``score`` sums these weights per emotion.
+        """
+        keyword_weights = self.keyword_weights
+        flags = None
+        hits = []
+        for index in range(start, len(tokens) if end is None else end):
+            token = tokens[index]
+            weights = keyword_weights.get(token)
+            if not weights:
+                continue
+            if flags is None:
+                flags = self.modifier_flags(tokens)
+            for emotion, weight in weights:
+                hits.append((index, token, emotion, self.adjust_weight(tokens, flags, index, weight)))
+        return hits
+
+    def keywords(self, tokens: Sequence[str]) -> List[str]:
+        """Distinct emotion keywords in ``tokens``, in text order; ``score(tokens).keywords`` without the weighting."""
+        keyword_weights = self.keyword_weights
+        return list(dict.fromkeys(token for token in tokens if token in keyword_weights))
+
+    def profile(self, text: str) -> "EmotionProfile":
+        """Tokenize ``text`` once and return its prefix-summed emotion profile."""
+        return EmotionProfile(self, text)
+
+    def score(self, tokens: Sequence[str]) -> LexiconScore:
+        """Score a token sequence against the emotion lexicon."""
+        totals: Dict[str, float] = {}
+        keywords: Dict[str, None] = {}
+        occurrences = set()
+        for index, keyword, emotion, weight in self.keyword_hits(tokens):
+            occurrences.add(index)
+            keywords[keyword] = None
+            totals[emotion] = totals.get(emotion, 0.0) + weight
+
+        return LexiconScore(
+            scores={emotion: totals[emotion] for emotion in self.emotions if emotion in totals},
+            keywords=list(keywords),
+            occurrences=len(occurrences)
+        )
+
+
+class EmotionProfile:
+    """
+    Emotion weights of every token of a text, stored as prefix sums.
+
+    The text is tokenized and scored once; the score of any character range
+    is then a difference of two cumulative sums per emotion, so progression
+    can be computed for any segment length, or several at once, without
+    rescanning the text. Modifier windows look across segment borders, as
+    they would when reading the text as a whole.
+    """
+
+    def __init__(self, lexicon: EmotionLexicon, text: str):
+        self.lexicon = lexicon
+        matches = list(_TOKEN_RE.finditer(text))
+        tokens = [match.group().lower() for match in matches]
+        self.token_starts = [match.start() for match in matches]
+        self.token_ends = [match.end() for match in matches]
+
+        hits = lexicon.keyword_hits(tokens)
+        emotion_rows = {emotion: row for row, emotion in enumerate(lexicon.emotions)}
+        size = len(tokens) + 1
+
+        if np is not None:
+            weights = np.zeros((len(lexicon.emotions), size))
+            counts = np.zeros(size, dtype=np.int64)
+            for index, _, emotion, weight in hits:
+                weights[emotion_rows[emotion], index + 1] += weight
+            counts[[index + 1 for index in dict.fromkeys(hit[0] for hit in hits)]] = 1
+            self._weights = np.cumsum(weights, axis=1)
+            self._counts = np.cumsum(counts)
+        else:
+            weights = [[0.0] * size for _ in lexicon.emotions]
+            counts = [0] * size
+            for index, _, emotion, weight in hits:
+                weights[emotion_rows[emotion]][index + 1] += weight
+                counts[index + 1] = 1
+            self._weights = [list(accumulate(row)) for row in weights]
+            self._counts = list(accumulate(counts))
+
+        # Distinct keyword occurrences, in token order
+        self._hit_indices = []
+        self._hit_keywords = []
+        for index, keyword, _, _ in hits:
+            if not self._hit_indices or self._hit_indices[-1] != index:
+                self._hit_indices.append(index)
+                self._hit_keywords.append(keyword)
+
+    def token_range(self, start: int, end: int) -> Tuple[int, int]:
+        """Return the token index range lying entirely within characters [start, end)."""
+        low = bisect_left(self.token_starts, start)
+        high = bisect_right(self.token_ends, end)
+        return low, max(low, high)
+
+    def window_score(self, start: int, end: int) -> LexiconScore:
+        """Score the tokens within characters [start, end)."""
+        return self.window_scores([(start, end)])[0]
+
+    def window_scores(self, spans: Sequence[Tuple[int, int]]) -> List[LexiconScore]:
+        """
+        Score the tokens within each (start, end) character span.
+
+        Every span costs two lookups per emotion in the prefix sums; with
+        NumPy all spans are differenced in one vectorized operation.
+        """
+        ranges = [self.token_range(start, end) for start, end in spans]
+        lows = [low for low, _ in ranges]
+        highs = [high for _, high in ranges]
+
+        if np is not None:
+            totals = (self._weights[:, highs] - self._weights[:, lows]).T.tolist()
+            counts = (self._counts[highs] - self._counts[lows]).tolist()
+        else:
+            totals = [[row[high] - row[low] for row in self._weights] for low, high in ranges]
+            counts = [self._counts[high] - self._counts[low] for low, high in ranges]
+
+        emotions = self.lexicon.emotions
+        scores = []
+        for (low, high), span_totals, count in zip(ranges, totals, counts):
+            first = bisect_left(self._hit_indices, low)
+            last = bisect_left(self._hit_indices, high)
+            scores.append(LexiconScore(
+                scores={emotion: total for emotion, total in zip(emotions, span_totals) if total},
+                keywords=list(dict.fromkeys(self._hit_keywords[first:last])),
+                occurrences=count
+            ))
+        return scores
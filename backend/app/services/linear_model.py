@@ -0,0 +1,166 @@
+import zlib
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .lexicon import tokenize
+
+DEFAULT_FEATURES = 2 ** 14
+
+# Rows vectorized at a time; bounds the dense feature matrix to
+# batch_size x n_features floats
+DEFAULT_BATCH_SIZE = 256
+
+
+class HashedNgramVectorizer:
+    """
+    Turns texts into hashed bag-of-n-gram vectors.
+
+    Word n-grams are hashed into ``n_features`` buckets with CRC-32, which
+    is stable across processes and Python versions, so no vocabulary has to
+    be stored with a model. Counts are log-scaled and rows L2-normalized.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_FEATURES, ngram_max: int = 2):
+        self.n_features = n_features
+        self.ngram_max = ngram_max
+
+    def feature_indices(self, text: str) -> List[int]:
+        return self.token_indices(tokenize(text or ""))
+
+    def token_indices(self, tokens: Sequence[str]) -> List[int]:
+        """Hash buckets of every word n-gram of already tokenized text."""
+        # CRC-32 can be continued, so each n-gram's hash extends the hash of
+        # the (n-1)-gram it starts with instead of hashing the joined string
+        encoded = [token.encode("utf-8") for token in tokens]
+        hashes = [zlib.crc32(token) for token in encoded]
+        indices = [value % self.n_features for value in hashes]
+        for n in range(2, self.ngram_max + 1):
+            hashes = [zlib.crc32(b" " + encoded[start + n - 1], hashes[start]) for start in range(len(hashes) - 1)]
+            indices.extend(value % self.n_features for value in hashes)
+        return indices
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a dense (len(texts), n_features) float32 matrix."""
+        return self.transform_tokens([tokenize(text or "") for text in texts])
+
+    def transform_tokens(self, token_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """``transform`` of texts that are already tokenized."""
+        matrix = np.zeros((len(token_lists), self.n_features), dtype=np.float32)
+        rows, columns = [], []
+        for row, tokens in enumerate(token_lists):
+            indices = self.token_indices(tokens)
+            rows.extend([row] * len(indices))
+            columns.extend(indices)
+        if rows:
+            np.add.at(matrix, (np.asarray(rows), np.asarray(columns)), 1.0)
+            np.log1p(matrix, out=matrix)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class LinearModel:
+    """
+    Multinomial logistic regression over hashed n-gram features.
+
+    The model is a (n_features, n_classes) weight matrix and a bias vector;
+    a batch of texts is scored with one matrix multiply per ``batch_size``
+    rows.
+    """
+
+    def __init__(self, classes: Sequence[str], weights: np.ndarray, bias: np.ndarray,
+                 vectorizer: Optional[HashedNgramVectorizer] = None):
+        self.classes = list(classes)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.vectorizer = vectorizer or HashedNgramVectorizer(self.weights.shape[0])
+        if self.weights.shape != (self.vectorizer.n_features, len(self.classes)):
+            raise ValueError("Weight matrix does not match the features and classes")
+
+    def predict_proba(self, texts: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        """Return the (len(texts), n_classes) class probabilities."""
+        return self._predict(texts, self.vectorizer.transform, batch_size)
+
+    def predict_proba_tokens(self, token_lists: Sequence[Sequence[str]],
+                             batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        """``predict_proba`` of texts that are already tokenized."""
+        return self._predict(token_lists, self.vectorizer.transform_tokens, batch_size)
+
+    def _predict(self, items: Sequence, transform, batch_size: int) -> np.ndarray:
+        probabilities = np.empty((len(items), len(self.classes)), dtype=np.float32)
+        for start in range(0, len(items), batch_size):
+            features = transform(items[start:start + batch_size])
+            probabilities[start:start + len(features)] = _softmax(features @ self.weights + self.bias)
+        return probabilities
+
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[str], classes: Optional[Sequence[str]] = None,
+              n_features: int = DEFAULT_FEATURES, ngram_max: int = 2, epochs: int = 20,
+              learning_rate: float = 0.5, l2: float = 1e-4, batch_size: int = DEFAULT_BATCH_SIZE,
+              seed: int = 0) -> "LinearModel":
+        """
+        Fit a model with mini-batch gradient descent on the cross-entropy loss.
+
+        Args:
+            texts: Training texts
+            labels: Class label of each text
+            classes: Class order of the model; sorted distinct labels if None
+            n_features: Hash buckets
+            ngram_max: Longest word n-gram used as a feature
+            epochs: Passes over the training data
+            learning_rate: Gradient step size
+            l2: Weight decay
+            batch_size: Texts per gradient step
+            seed: Seed for shuffling, so training is reproducible
+        """
+        if len(texts) != len(labels):
+            raise ValueError("texts and labels must have the same length")
+        classes = list(classes) if classes is not None else sorted(set(labels))
+        class_index = {label: index for index, label in enumerate(classes)}
+        targets = np.array([class_index[label] for label in labels], dtype=np.int64)
+
+        vectorizer = HashedNgramVectorizer(n_features, ngram_max)
+        weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        rng = np.random.default_rng(seed)
+
+        for _ in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                features = vectorizer.transform([texts[index] for index in batch])
+                gradient = _softmax(features @ weights + bias)
+                gradient[np.arange(len(batch)), targets[batch]] -= 1.0
+                gradient /= len(batch)
+                weights -= learning_rate * (features.T @ gradient + l2 * weights)
+                bias -= learning_rate * gradient.sum(axis=0)
+
+        return cls(classes, weights, bias, vectorizer)
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            classes=np.array(self.classes),
+            weights=self.weights,
+            bias=self.bias,
+            ngram_max=np.array(self.vectorizer.ngram_max)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LinearModel":
+        with np.load(path, allow_pickle=False) as data:
+            weights = data["weights"]
+            return cls(
+                [str(label) for label in data["classes"]],
+                weights,
+                data["bias"],
+                HashedNgramVectorizer(weights.shape[0], int(data["ngram_max"]))
+            )
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= logits.sum(axis=1, keepdims=True)
+    return logits
@@ -0,0 +1,134 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from .pattern_engine import extract_required_literals, fold_case
+
+
+class AhoCorasick:
+    """
+    Multi-keyword automaton reporting which keywords occur anywhere in a text.
+
+    The goto/failure structure is flattened into a complete transition table
+    when the automaton is built, so a scan is one dictionary lookup per
+    character regardless of how many keywords there are.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(keyword for keyword in keywords if keyword))
+
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[int]] = [set()]
+        for keyword_index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(keyword_index)
+
+        # Breadth-first construction of failure links, folding them into the
+        # transition table as we go
+        transitions: List[Dict[str, int]] = [dict(edges) for edges in goto]
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            outputs[state] |= outputs[fail[state]]
+            for char, fallback in transitions[fail[state]].items():
+                transitions[state].setdefault(char, fallback)
+            for char, next_state in goto[state].items():
+                fail[next_state] = transitions[fail[state]].get(char, 0) if state else 0
+                queue.append(next_state)
+
+        self._transitions = transitions
+        self._outputs = [frozenset(output) for output in outputs]
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """Return the keywords that occur in ``text``."""
+        transitions = self._transitions
+        root = transitions[0]
+        outputs = self._outputs
+        found: Set[int] = set()
+        state = 0
+        for char in text:
+            state = transitions[state].get(char) or root.get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return frozenset(self.keywords[index] for index in found)
+
+
+class LiteralPrefilter:
+    """
+    Decide which regexes can possibly match a text before running any of them.
+
+    The literal words each pattern requires are pulled out of the regex and
+    indexed in a single Aho-Corasick automaton. A pattern is a candidate only
+    if every one of its required literal groups has at least one member in
+    the text; patterns whose requirements can't be determined are always
+    candidates.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: Tuple[str, ...] = tuple(dict.fromkeys(patterns))
+        self._requirements: Dict[str, List[Tuple[str, ...]]] = {
+            pattern: extract_required_literals(pattern) for pattern in self.patterns
+        }
+        self._always = frozenset(
+            pattern for pattern, groups in self._requirements.items() if not groups
+        )
+        self._automaton = AhoCorasick(
+            literal
+            for groups in self._requirements.values()
+            for group in groups
+            for literal in group
+        )
+
+    def candidates(self, text: str) -> FrozenSet[str]:
+        """Return the registered patterns that may match ``text``."""
+        found = self._automaton.find(fold_case(text))
+        candidates = set(self._always)
+        for pattern, groups in self._requirements.items():
+            if groups and all(any(literal in found for literal in group) for group in groups):
+                candidates.add(pattern)
+        return frozenset(candidates)
+
+
+# Patterns from every rule table, scanned together so each page is read once
+_registered_patterns: Dict[str, None] = {}
+_prefilter = None
+
+
+def register_patterns(patterns: Iterable[str]) -> None:
+    """Add patterns to the shared prefilter; it is rebuilt on next use."""
+    global _prefilter
+    new_patterns = [pattern for pattern in patterns if pattern not in _registered_patterns]
+    if new_patterns:
+        _registered_patterns.update(dict.fromkeys(new_patterns))
+        _prefilter = None
+        _candidate_patterns.cache_clear()
+
+
+def get_prefilter() -> LiteralPrefilter:
+    """Return the shared prefilter over all registered patterns."""
+    global _prefilter
+    if _prefilter is None:
+        _prefilter = LiteralPrefilter(_registered_patterns)
+    return _prefilter
+
+
+@lru_cache(maxsize=16)
+def _candidate_patterns(folded_text: str) -> FrozenSet[str]:
+    return get_prefilter().candidates(folded_text)
+
+
+def candidate_patterns(text: str) -> FrozenSet[str]:
+    """
+    Return the registered patterns that may match ``text``.
+
+    Results are cached on the case-folded text, so the scene, context and
+    trigger passes over the same page share a single automaton scan.
+    """
+    return _candidate_patterns(fold_case(text))
@@ -0,0 +1,320 @@
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Every word-anchored match starts at the beginning of one of these runs
+_TOKEN_RE = re.compile(r"\w+")
+
+# Non-ASCII characters that re.IGNORECASE treats as ASCII letters
+_CASE_FOLDS = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+
+
+def fold_case(text: str) -> str:
+    """Lowercase ``text`` the way re.IGNORECASE compares it against ASCII literals."""
+    return text.translate(_CASE_FOLDS).lower()
+
+
+@dataclass(frozen=True)
+class PatternRule:
+    """A single compiled regex together with the rule it belongs to."""
+    key: str
+    pattern: str
+    regex: re.Pattern
+    metadata: Any = None
+
+
+class SpanIndex:
+    """
+    A set of non-overlapping, non-empty (start, end) character spans, kept
+    sorted by start so an overlap test is a binary search.
+
+    Because the spans are disjoint, their ends are sorted too: the only span
+    that can overlap [start, end) is the last one starting before ``end``.
+    """
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """Whether [start, end) overlaps any span in the index."""
+        index = bisect_left(self._starts, end)
+        return index > 0 and self._ends[index - 1] > start
+
+    def add(self, start: int, end: int) -> None:
+        """Add a span; it must not overlap any span already in the index."""
+        index = bisect_left(self._starts, start)
+        self._starts.insert(index, start)
+        self._ends.insert(index, end)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _split_pattern(pattern: str) -> Optional[List[Tuple[str, Any, str]]]:
+    """
+    Split a regex into top-level (kind, value, quantifier) items.
+
+    Only the small regex dialect used by the rule tables is understood:
+    ``\\b``, ``\\s``, ``\\w``, literal characters and non-nested groups;
+    a character class is kept whole as a single ``"other"`` item.
+    Anything else is reported as ``"other"`` so callers stay conservative.
+    """
+    items = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            escape = pattern[i:i + 2]
+            kind = {"\\b": "boundary", "\\s": "space", "\\w": "word"}.get(escape, "other")
+            value = escape
+            i += 2
+        elif char == "(":
+            end = pattern.find(")", i)
+            if end == -1 or "(" in pattern[i + 1:end]:
+                return None
+            body = pattern[i + 1:end]
+            if body.startswith("?:"):
+                body = body[2:]
+            elif body.startswith("?"):
+                return None
+            kind, value = "group", body.split("|")
+            i = end + 1
+        elif char == "[":
+            # A character class is one opaque item; "]" right after "[" or
+            # "[^" is a literal member, not the end of the class
+            end = i + 1
+            if end < len(pattern) and pattern[end] == "^":
+                end += 1
+            if end < len(pattern) and pattern[end] == "]":
+                end += 1
+            while end < len(pattern) and pattern[end] != "]":
+                end += 2 if pattern[end] == "\\" else 1
+            kind, value = "other", pattern[i:end + 1]
+            i = end + 1
+        elif char in ".^$|)":
+            kind, value = "other", char
+            i += 1
+        else:
+            kind, value = "literal", char
+            i += 1
+
+        quantifier = ""
+        if i < len(pattern) and pattern[i] in "?*+{":
+            if pattern[i] == "{":
+                close = pattern.find("}", i)
+                quantifier = pattern[i:close + 1] if close != -1 else pattern[i:]
+                i = close + 1 if close != -1 else len(pattern)
+            else:
+                quantifier = pattern[i]
+                i += 1
+            if i < len(pattern) and pattern[i] == "?":
+                i += 1
+        items.append((kind, value, quantifier))
+    return items
+
+
+def _literal_prefix(alternative: str) -> Tuple[str, bool]:
+    """
+    Return the literal text every match of ``alternative`` starts with, and
+    whether the alternative consists of nothing but that literal.
+    """
+    prefix = []
+    for i, char in enumerate(alternative):
+        if char in "\\[](){}.^$|*+?":
+            return "".join(prefix), False
+        if i + 1 < len(alternative) and alternative[i + 1] in "?*{":
+            return "".join(prefix), False
+        prefix.append(char)
+        if i + 1 < len(alternative) and alternative[i + 1] == "+":
+            return "".join(prefix), False
+    return "".join(prefix), True
+
+
+def extract_lead_words(pattern: str) -> Optional[List[Tuple[str, bool]]]:
+    """
+    Return the words a match of ``pattern`` can start with.
+
+    Each entry is ``(word, exact)``: ``exact`` means the matched token is the
+    word itself, otherwise the token only has to start with it (``leaves?``,
+    ``introduc\\w*``). Returns None when the pattern is not anchored on a
+    ``\\b`` followed by literal words, in which case it must be scanned in full.
+    """
+    items = _split_pattern(pattern)
+    if not items or len(items) < 2 or items[0] != ("boundary", "\\b", ""):
+        return None
+
+    kind, value, quantifier = items[1]
+    if quantifier:
+        return None
+    if kind == "group":
+        alternatives = value
+        following = items[2] if len(items) > 2 else None
+    elif kind == "literal":
+        literal = []
+        index = 1
+        while index < len(items) and items[index][0] == "literal" and not items[index][2]:
+            literal.append(items[index][1])
+            index += 1
+        alternatives = ["".join(literal)]
+        following = items[index] if index < len(items) else None
+    else:
+        return None
+
+    # The token ends right after the alternative only if a boundary or
+    # mandatory whitespace follows it
+    ends_token = following is None or following in (
+        ("boundary", "\\b", ""), ("space", "\\s", "+"), ("space", "\\s", ""), ("literal", " ", "")
+    )
+
+    leads = []
+    for alternative in alternatives:
+        prefix, complete = _literal_prefix(alternative)
+        word = ""
+        for char in prefix:
+            if not _is_word_char(char):
+                break
+            word += char
+        if not word:
+            return None
+        exact = word != prefix or (complete and ends_token)
+        leads.append((fold_case(word), exact))
+    return leads
+
+
+def extract_required_literals(pattern: str) -> List[Tuple[str, ...]]:
+    """
+    Return the literal groups every match of ``pattern`` has to contain.
+
+    Each entry is a tuple of alternatives, at least one of which appears
+    (case-insensitively) in any text the pattern matches. An empty list
+    means nothing is known and the pattern always has to be evaluated.
+    """
+    items = _split_pattern(pattern)
+    if not items or any(item == ("other", "|", "") for item in items):
+        return []
+
+    groups = []
+    run = ""
+    for kind, value, quantifier in items:
+        if kind == "literal" and not quantifier:
+            run += value
+            continue
+        if kind == "literal" and quantifier == "+":
+            run += value
+        if run:
+            groups.append((fold_case(run),))
+            run = ""
+        if kind == "group" and not quantifier:
+            alternatives = tuple(fold_case(_literal_prefix(alternative)[0]) for alternative in value)
+            if all(alternatives):
+                groups.append(tuple(dict.fromkeys(alternatives)))
+    if run:
+        groups.append((fold_case(run),))
+    return groups
+
+
+class CompiledPatternSet:
+    """
+    A fixed, ordered set of regex rules compiled once and matched together.
+
+    Instead of running ``re.finditer`` once per pattern, the text is walked
+    once token by token. Each token is looked up in an index of the literal
+    words the patterns can start with, and only those patterns are tried,
+    anchored at the token. Per-pattern results are exactly what
+    ``re.finditer(pattern, text, flags)`` would produce.
+
+    With ``prefilter`` set, the patterns are also registered with the shared
+    literal prefilter and rules whose required words are absent from the
+    text are skipped without being tried.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, str, Any]], flags: int = re.IGNORECASE,
+                 prefilter: bool = False):
+        self.rules: Tuple[PatternRule, ...] = tuple(
+            PatternRule(key=key, pattern=pattern, regex=re.compile(pattern, flags), metadata=metadata)
+            for key, pattern, metadata in rules
+        )
+
+        exact_index: Dict[str, List[int]] = {}
+        prefix_index: Dict[str, List[int]] = {}
+        unanchored = []
+        for rule_index, rule in enumerate(self.rules):
+            leads = extract_lead_words(rule.pattern)
+            if leads is None:
+                unanchored.append(rule_index)
+                continue
+            for word, exact in leads:
+                index = exact_index if exact else prefix_index
+                bucket = index.setdefault(word, [])
+                if rule_index not in bucket:
+                    bucket.append(rule_index)
+
+        self._exact_index = {word: tuple(bucket) for word, bucket in exact_index.items()}
+        self._prefix_index = {word: tuple(bucket) for word, bucket in prefix_index.items()}
+        self._prefix_lengths = tuple(sorted({len(word) for word in prefix_index}))
+        self._unanchored = tuple(unanchored)
+
+        self.prefilter = prefilter
+        if prefilter:
+            from .literal_prefilter import register_patterns
+            register_patterns(rule.pattern for rule in self.rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _candidates(self, token: str) -> Iterator[int]:
+        word = fold_case(token)
+        yield from self._exact_index.get(word, ())
+        for length in self._prefix_lengths:
+            if length > len(word):
+                break
+            yield from self._prefix_index.get(word[:length], ())
+
+    def scan(self, text: str) -> List[List[re.Match]]:
+        """
+        Match every rule against ``text`` in a single pass.
+
+        Returns one list of matches per rule, in rule order; each list holds
+        the non-overlapping matches of that rule from left to right.
+        """
+        matches: List[List[re.Match]] = [[] for _ in self.rules]
+        if not text:
+            return matches
+
+        if self.prefilter:
+            from .literal_prefilter import candidate_patterns
+            candidates = candidate_patterns(text)
+            active = [rule.pattern in candidates for rule in self.rules]
+            if not any(active):
+                return matches
+        else:
+            active = [True] * len(self.rules)
+
+        last_end = [0] * len(self.rules)
+        for token in _TOKEN_RE.finditer(text):
+            start = token.start()
+            for rule_index in self._candidates(token.group()):
+                if not active[rule_index] or start < last_end[rule_index]:
+                    continue
+                match = self.rules[rule_index].regex.match(text, start)
+                if match:
+                    matches[rule_index].append(match)
+                    last_end[rule_index] = match.end()
+
+        for rule_index in self._unanchored:
+            if active[rule_index]:
+                matches[rule_index] = list(self.rules[rule_index].regex.finditer(text))
+
+        return matches
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[PatternRule, re.Match]]:
+        """Yield ``(rule, match)`` pairs in rule order, then text order."""
+        for rule, rule_matches in zip(self.rules, self.scan(text)):
+            for match in rule_matches:
+                yield rule, match
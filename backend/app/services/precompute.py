@@ -0,0 +1,163 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.analysis import PageAnalysisRecord
+from app.models.book import Page
+from .soundscape import (
+    ANALYSIS_SECTIONS, ContentHashExpression, analyze_page_text, compute_content_hash, get_ruleset_version,
+    save_page_analysis
+)
+from .worker_pool import get_worker_pool, shutdown_worker_pool
+
+
+@dataclass
+class PrecomputeJob:
+    """Progress of the background analysis of one book."""
+    book_id: int
+    status: str = "queued"  # queued, running, completed, failed
+    total_pages: int = 0
+    analyzed_pages: int = 0
+    failed_pages: int = 0
+    error: Optional[str] = None
+    queued_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+# Books are dispatched one at a time; the pages of each book are spread over
+# the worker processes
+_dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precompute")
+_jobs: Dict[int, PrecomputeJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def schedule_book_precompute(book_id: int) -> PrecomputeJob:
+    """
+    Queue every page of a book for background soundscape analysis.
+
+    Results are written to the page analysis store, where the soundscape
+    endpoint picks them up. Pages that already have a current analysis are
+    skipped when the job runs.
+    """
+    with _jobs_lock:
+        job = _jobs.get(book_id)
+        if job and job.status in ("queued", "running"):
+            return job
+        job = PrecomputeJob(book_id=book_id)
+        _jobs[book_id] = job
+    _dispatcher.submit(_run_book_precompute, job)
+    return job
+
+
+def _run_book_precompute(job: PrecomputeJob) -> None:
+    db = SessionLocal()
+    try:
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+
+        pages = db.query(Page).filter(Page.book_id == job.book_id).order_by(Page.chapter_id, Page.page_number).all()
+        job.total_pages = len(pages)
+
+        # Skip pages whose stored analysis is current and complete; pages a
+        # reader already requested only some sections of get the rest merged in
+        ruleset_version = get_ruleset_version()
+        stored = {
+            page_id: (content_hash, analysis)
+            for page_id, content_hash, analysis in db.query(
+                PageAnalysisRecord.page_id, PageAnalysisRecord.content_hash, PageAnalysisRecord.analysis
+            ).filter(
+                PageAnalysisRecord.page_id.in_([page.id for page in pages]),
+                PageAnalysisRecord.ruleset_version == ruleset_version
+            )
+        } if pages else {}
+        pending = []
+        for page in pages:
+            content_hash, analysis = stored.get(page.id, (None, None))
+            if content_hash != compute_content_hash(page.content):
+                pending.append((page, None, False))
+                continue
+            missing = tuple(section for section in ANALYSIS_SECTIONS if section not in json.loads(analysis))
+            if missing:
+                pending.append((page, missing, True))
+            else:
+                job.analyzed_pages += 1
+
+        if pending:
+            pool = get_worker_pool()
+            futures = {
+                pool.submit(analyze_page_text, page.content or "", sections): (page, merge)
+                for page, sections, merge in pending
+            }
+            for future in as_completed(futures):
+                page, merge = futures[future]
+                try:
+                    save_page_analysis(page, future.result(), db, merge=merge)
+                    job.analyzed_pages += 1
+                except BrokenProcessPool:
+                    raise
+                except Exception:
+                    db.rollback()
+                    job.failed_pages += 1
+
+        job.status = "completed" if not job.failed_pages else "failed"
+    except BrokenProcessPool as e:
+        shutdown_worker_pool()
+        job.status = "failed"
+        job.error = f"Worker pool stopped: {e}"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        job.finished_at = datetime.utcnow()
+        db.close()
+
+
+def get_book_precompute_status(book_id: int, db: Session) -> Dict[str, Any]:
+    """
+    Report how much of a book has been analyzed.
+
+    Page counts come from the database, so they stay correct across restarts
+    and other server processes; the job fields describe the most recent
+    background run in this process, if any.
+    """
+    total_pages = db.query(Page).filter(Page.book_id == book_id).count()
+    analyzed_pages = (
+        db.query(PageAnalysisRecord)
+        .join(Page, Page.id == PageAnalysisRecord.page_id)
+        .filter(
+            Page.book_id == book_id,
+            PageAnalysisRecord.ruleset_version == get_ruleset_version(),
+            # A page edited since its analysis counts as not analyzed
+            PageAnalysisRecord.content_hash == ContentHashExpression(Page.content)
+        )
+        .count()
+    )
+
+    job = _jobs.get(book_id)
+    if job:
+        status = job.status
+    elif total_pages and analyzed_pages >= total_pages:
+        status = "completed"
+    else:
+        status = "not_started"
+
+    return {
+        "book_id": book_id,
+        "status": status,
+        "total_pages": total_pages,
+        "analyzed_pages": analyzed_pages,
+        "failed_pages": job.failed_pages if job else 0,
+        "progress": round(analyzed_pages / total_pages, 4) if total_pages else 1.0,
+        "error": job.error if job else None,
+        "queued_at": job.queued_at.isoformat() if job else None,
+        "started_at": job.started_at.isoformat() if job and job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job and job.finished_at else None
+    }
@@ -0,0 +1,187 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .emotion_analysis import compute_word_offsets, find_trigger_words
+from .soundscape import _get_scene_matcher, select_trigger_sound
+
+# Characters of context kept from one chunk to the next; a match has to fit
+# inside this window to be found across a chunk boundary
+DEFAULT_OVERLAP = 256
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """A scene or trigger match found while streaming a chapter."""
+    kind: str  # "scene" or "trigger"
+    type: str  # scene type or trigger pattern name
+    text: str
+    start: int  # character offset in the whole stream
+    end: int
+    word_position: int  # index of the first word in the whole stream
+    chunk_index: int  # chunk (page) the match starts in
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+def _word_count(text: str) -> int:
+    return len(text.split())
+
+
+def _buffer_events(buffer: str) -> List[tuple]:
+    """Return (start, end, kind, type, text, word_offset, data) for every match in ``buffer``."""
+    events = []
+    for rule, match in _get_scene_matcher().iter_matches(buffer):
+        events.append((match.start(), match.end(), "scene", rule.key, match.group(), None, {
+            "mood": rule.metadata["mood"],
+            "weight": rule.metadata["weight"],
+            "source": rule.metadata["source"]
+        }))
+    # Sounds are chosen once the event's page and position in it are known
+    for trigger in find_trigger_words(buffer, select_sounds=False):
+        start = trigger["position"]
+        events.append((start, start + len(trigger["word"]), "trigger", trigger["pattern_name"], trigger["word"],
+                       trigger["word_position"], {
+            "sound": trigger["sound"],
+            "folder_path": trigger["folder_path"],
+            "trigger_type": trigger["type"]
+        }))
+    events.sort(key=lambda event: (event[0], event[2]))
+    return events
+
+
+def stream_scene_events(chunks: Iterable[str], overlap: int = DEFAULT_OVERLAP,
+                        separator: str = "\n", chunk_ids: Optional[Iterable[int]] = None) -> Iterator[StreamEvent]:
+    """
+    Detect scenes and trigger words over a sequence of text chunks.
+
+    Chunks (typically the pages of a chapter) are consumed one at a time and
+    joined with ``separator``. Events are yielded in order of their global
+    character offset as soon as they can no longer be affected by text still
+    to come. The tail of each chunk is carried into the next one, so a phrase
+    broken across a page boundary is still found, while memory stays bounded
+    by the chunk size plus about twice ``overlap`` however long the stream is.
+    The carried tail is cut at whitespace; text with no whitespace for
+    ``overlap`` characters is cut mid-word, where a word-boundary rule may
+    then see a boundary that is not in the text.
+
+    A trigger's sound is picked as the page soundscape picks it, from the
+    id of the chunk it starts in and its character position there, so
+    deterministic selection gives the same sound in both.
+
+    Scene events are the raw scene-table matches; context rules, which need
+    the whole text, are not applied.
+
+    Args:
+        chunks: Text chunks in reading order
+        overlap: Characters of lookahead held back at the end of each chunk
+        separator: Text inserted between consecutive chunks
+        chunk_ids: Page id of each chunk; the chunk index if None
+
+    Yields:
+        StreamEvent for each match
+    """
+    carry = ""
+    carry_offset = 0  # global offset of carry[0]
+    carry_words = 0  # words in the stream before carry[0]
+    chunk_starts: List[int] = []
+    chunk_id_list: List[int] = []  # id of each chunk in chunk_starts
+    chunk_base = 0  # chunk index of chunk_starts[0]
+    total = 0
+    ids = iter(chunk_ids) if chunk_ids is not None else None
+
+    def emit(buffer: str, events: List[tuple], limit: int) -> Iterator[StreamEvent]:
+        word_offsets = None
+        for start, end, kind, event_type, text, word_offset, data in events:
+            if start >= limit:
+                break
+            if word_offset is None:
+                if word_offsets is None:
+                    word_offsets = compute_word_offsets(buffer)
+                word_offset = bisect_left(word_offsets, start)
+            global_start = carry_offset + start
+            position = bisect_right(chunk_starts, global_start) - 1
+            if kind == "trigger":
+                data = {**data, "sound": select_trigger_sound(
+                    data["folder_path"], chunk_id_list[position], global_start - chunk_starts[position]
+                )}
+            yield StreamEvent(
+                kind=kind,
+                type=event_type,
+                text=text,
+                start=global_start,
+                end=carry_offset + end,
+                word_position=carry_words + word_offset,
+                chunk_index=chunk_base + position,
+                data=data
+            )
+
+    for chunk in chunks:
+        if chunk_starts:
+            carry += separator
+            total += len(separator)
+        chunk_id_list.append(next(ids) if ids is not None else chunk_base + len(chunk_starts))
+        chunk_starts.append(total)
+        total += len(chunk)
+        buffer = carry + chunk
+
+        safe_limit = len(buffer) - overlap
+        if safe_limit <= 0:
+            carry = buffer
+            continue
+
+        # Matches ending in the held-back tail may still grow with the next
+        # chunk; cut before the earliest of them, at a whitespace boundary so
+        # word boundaries and word counts are the same on both sides
+        events = _buffer_events(buffer)
+        cutoff = safe_limit
+        for start, end, *_ in events:
+            if end > safe_limit:
+                cutoff = min(cutoff, start)
+        floor = max(safe_limit - overlap, 0)
+        cutoff = max(cutoff, floor)
+        space = cutoff
+        while space > floor and not buffer[space - 1].isspace():
+            space -= 1
+        # With no whitespace within reach, cut the word at the cutoff rather
+        # than carry more of it, which would rescan it with the next chunk;
+        # the split word is counted once, on the carried side
+        if space > 0 and buffer[space - 1].isspace():
+            cutoff = space
+        split_word = 0 < cutoff < len(buffer) and not buffer[cutoff - 1].isspace() and not buffer[cutoff].isspace()
+
+        yield from emit(buffer, events, cutoff)
+
+        carry_words += _word_count(buffer[:cutoff]) - split_word
+        carry_offset += cutoff
+        carry = buffer[cutoff:]
+
+        # Forget chunks that lie entirely before the carried text
+        drop = bisect_right(chunk_starts, carry_offset) - 1
+        if drop > 0:
+            del chunk_starts[:drop]
+            del chunk_id_list[:drop]
+            chunk_base += drop
+
+    if carry:
+        yield from emit(carry, _buffer_events(carry), len(carry))
+
+
+def stream_chapter_events(book_id: int, chapter_number: int, db: Session,
+                          overlap: int = DEFAULT_OVERLAP) -> Iterator[StreamEvent]:
+    """
+    Stream scene and trigger events for a whole chapter straight from the
+    database, fetching pages in small batches rather than all at once.
+    """
+    from app.models.book import Chapter, Page
+
+    pages = (
+        db.query(Page)
+        .join(Chapter, Chapter.id == Page.chapter_id)
+        .filter(Chapter.book_id == book_id, Chapter.chapter_number == chapter_number)
+        .order_by(Page.page_number)
+    )
+    page_ids = [page_id for page_id, in pages.with_entities(Page.id)]
+    contents = (content or "" for content, in pages.with_entities(Page.content).yield_per(16))
+    yield from stream_scene_events(contents, overlap=overlap, chunk_ids=page_ids)
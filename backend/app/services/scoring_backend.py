@@ -0,0 +1,145 @@
+import threading
+from typing import List, Optional, Sequence
+
+from app.core.config import settings
+from .emotion_analysis import (
+    AdvancedEmotionAnalyzer, EmotionResult, EmotionType, ThemeResult, ThemeType, emotion_analyzer
+)
+from .lexicon import TextFeatures
+
+# Probability above which a theme is listed among the sub-themes
+SUB_THEME_THRESHOLD = 0.15
+
+
+class LexiconBackend:
+    """The keyword lexicon scoring of AdvancedEmotionAnalyzer; the default backend."""
+    name = "lexicon"
+
+    def __init__(self, analyzer: AdvancedEmotionAnalyzer = emotion_analyzer):
+        self.analyzer = analyzer
+
+    def extract_features(self, texts: Sequence[str]) -> List[TextFeatures]:
+        """Lexicon features of each text, to share between analyze_emotions and analyze_themes."""
+        return [self.analyzer.extract_features(text) for text in texts]
+
+    def analyze_emotions(self, texts: Sequence[str],
+                         features: Optional[Sequence[TextFeatures]] = None) -> List[EmotionResult]:
+        if features is None:
+            return [self.analyzer.analyze_emotion(text) for text in texts]
+        return [self.analyzer.analyze_emotion(text, text_features) for text, text_features in zip(texts, features)]
+
+    def analyze_themes(self, texts: Sequence[str],
+                       features: Optional[Sequence[TextFeatures]] = None) -> List[ThemeResult]:
+        if features is None:
+            return [self.analyzer.analyze_theme(text) for text in texts]
+        return [self.analyzer.analyze_theme(text, text_features) for text, text_features in zip(texts, features)]
+
+
+class LinearModelBackend(LexiconBackend):
+    """
+    Scores emotion and theme with locally trained linear models.
+
+    A whole batch of texts is classified with one matrix multiply per model.
+    ``emotion_scores`` and ``theme_scores`` hold the class probabilities;
+    intensity is the probability of the primary emotion and confidence its
+    margin over the runner-up. Keywords, context, setting elements and
+    atmosphere still come from the lexicon terms, but the weighted
+    lexicon scoring the model replaces is skipped. An analysis without a
+    model falls back to the lexicon entirely.
+    """
+    name = "linear"
+
+    def __init__(self, emotion_model=None, theme_model=None,
+                 analyzer: AdvancedEmotionAnalyzer = emotion_analyzer):
+        super().__init__(analyzer)
+        # Model classes must be known labels; EmotionType/ThemeType raise ValueError otherwise
+        for label in emotion_model.classes if emotion_model is not None else ():
+            EmotionType(label)
+        for label in theme_model.classes if theme_model is not None else ():
+            ThemeType(label)
+        self.emotion_model = emotion_model
+        self.theme_model = theme_model
+
+    def _features(self, texts: Sequence[str], features: Optional[Sequence[TextFeatures]]) -> List[TextFeatures]:
+        if features is not None:
+            return list(features)
+        return [self.analyzer.extract_features(text) for text in texts]
+
+    def analyze_emotions(self, texts: Sequence[str],
+                         features: Optional[Sequence[TextFeatures]] = None) -> List[EmotionResult]:
+        if self.emotion_model is None or not texts:
+            return super().analyze_emotions(texts, features)
+
+        classes = self.emotion_model.classes
+        features = self._features(texts, features)
+        probabilities = self.emotion_model.predict_proba_tokens([text_features.tokens for text_features in features])
+        ranked = probabilities.argsort(axis=1)
+        results = []
+        for text, text_features, row, order in zip(texts, features, probabilities, ranked):
+            if not text:
+                results.append(self.analyzer.analyze_emotion(text))
+                continue
+            top, runner_up = order[-1], (order[-2] if len(order) > 1 else None)
+            results.append(EmotionResult(
+                primary_emotion=EmotionType(classes[top]),
+                emotion_scores={label: float(score) for label, score in zip(classes, row)},
+                intensity=float(row[top]),
+                confidence=float(row[top] - (row[runner_up] if runner_up is not None else 0.0)),
+                keywords=self.analyzer.emotion_lexicon.keywords(text_features.tokens),
+                context=self.analyzer._extract_enhanced_context(text.lower(), text_features)
+            ))
+        return results
+
+    def analyze_themes(self, texts: Sequence[str],
+                       features: Optional[Sequence[TextFeatures]] = None) -> List[ThemeResult]:
+        if self.theme_model is None or not texts:
+            return super().analyze_themes(texts, features)
+
+        classes = self.theme_model.classes
+        features = self._features(texts, features)
+        probabilities = self.theme_model.predict_proba_tokens([text_features.tokens for text_features in features])
+        results = []
+        for text, text_features, row in zip(texts, features, probabilities):
+            if not text:
+                results.append(self.analyzer.analyze_theme(text))
+                continue
+            results.append(ThemeResult(
+                primary_theme=ThemeType(classes[int(row.argmax())]),
+                theme_scores={label: float(score) for label, score in zip(classes, row)},
+                sub_themes=[label for label, score in zip(classes, row) if score >= SUB_THEME_THRESHOLD],
+                setting_elements=self.analyzer.setting_elements(text_features),
+                atmosphere=self.analyzer._determine_atmosphere("", text_features)
+            ))
+        return results
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_scoring_backend():
+    """
+    Return the scoring backend selected by SCORING_BACKEND, loading model
+    weights on first use.
+
+    Raises:
+        ValueError: If SCORING_BACKEND is unknown
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _create_backend(settings.SCORING_BACKEND)
+        return _backend
+
+
+def _create_backend(name: str):
+    if name == LexiconBackend.name:
+        return LexiconBackend()
+    if name == LinearModelBackend.name:
+        from .linear_model import LinearModel
+
+        return LinearModelBackend(
+            emotion_model=LinearModel.load(settings.EMOTION_MODEL_PATH) if settings.EMOTION_MODEL_PATH else None,
+            theme_model=LinearModel.load(settings.THEME_MODEL_PATH) if settings.THEME_MODEL_PATH else None
+        )
+    raise ValueError(f"Unknown scoring backend: {name}")
@@ -0,0 +1,274 @@
+import hashlib
+import logging
+import os
+import struct
+import threading
+import wave
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SOUND_EXTENSIONS = (".mp3", ".wav", ".ogg")
+
+# MPEG-1 Layer III bitrates in kbit/s, by the 4-bit bitrate index
+_MP3_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0)
+
+
+@dataclass(frozen=True)
+class SoundFile:
+    """A sound file in the catalog."""
+    path: str  # relative to the sounds base path, e.g. "triggers/wind/wind.mp3"
+    size: int  # bytes
+    mtime: float
+    duration: Optional[float]  # seconds; None if the format could not be read
+
+
+def _mp3_duration(path: str, size: int) -> Optional[float]:
+    """Estimate an MP3's duration from its first frame header, assuming constant bitrate."""
+    with open(path, "rb") as f:
+        header = f.read(10)
+        offset = 0
+        if header[:3] == b"ID3" and len(header) == 10:
+            # Skip the ID3v2 tag; its size is a 28-bit syncsafe integer
+            offset = 10 + ((header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9])
+        f.seek(offset)
+        data = f.read(4096)
+    for index in range(len(data) - 3):
+        if data[index] == 0xFF and data[index + 1] & 0xE0 == 0xE0:
+            bitrate = _MP3_BITRATES[data[index + 2] >> 4]
+            if bitrate:
+                return round((size - offset - index) * 8 / (bitrate * 1000), 2)
+    return None
+
+
+def _ogg_duration(path: str, size: int) -> Optional[float]:
+    """Read an Ogg Vorbis duration from the last page's granule position."""
+    with open(path, "rb") as f:
+        head = f.read(64)
+        f.seek(max(0, size - 65536))
+        tail = f.read()
+    marker = head.find(b"\x01vorbis")
+    last_page = tail.rfind(b"OggS")
+    if marker < 0 or last_page < 0 or len(tail) < last_page + 14:
+        return None
+    sample_rate = struct.unpack_from("<I", head, marker + 12)[0]
+    granule = struct.unpack_from("<q", tail, last_page + 6)[0]
+    return round(granule / sample_rate, 2) if sample_rate and granule > 0 else None
+
+
+def _wav_duration(path: str) -> Optional[float]:
+    with wave.open(path, "rb") as audio:
+        rate = audio.getframerate()
+        return round(audio.getnframes() / rate, 2) if rate else None
+
+
+def read_duration(path: str, size: int) -> Optional[float]:
+    """Best-effort duration of a sound file in seconds, without decoding it."""
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension == ".mp3":
+            return _mp3_duration(path, size)
+        if extension == ".ogg":
+            return _ogg_duration(path, size)
+        if extension == ".wav":
+            return _wav_duration(path)
+    except (OSError, EOFError, wave.Error, struct.error):
+        pass
+    return None
+
+
+class SoundCatalog:
+    """
+    In-memory index of the sound files on disk: folder -> sound files.
+
+    Folders are relative to ``base_path`` ("triggers/wind", "ambience").
+    ``refresh`` walks the directory tree and stats every sound file, so a
+    file replaced in place is noticed even though its folder's mtime stays
+    the same; only new or changed files are read for their duration.
+    ``version`` changes whenever the set of files or any file's size or
+    mtime does.
+    """
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        self.folders: Dict[str, Tuple[SoundFile, ...]] = {}
+        self.version = ""
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Bring the catalog up to date with the disk; returns True if anything changed."""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        # Called with self._lock held
+        folders: Dict[str, Tuple[SoundFile, ...]] = {}
+
+        for directory, subdirectories, filenames in os.walk(self.base_path):
+            subdirectories.sort()
+            folder = os.path.relpath(directory, self.base_path).replace(os.sep, "/")
+            folder = "" if folder == "." else folder
+            previous = {sound.path: sound for sound in self.folders.get(folder, ())}
+            sounds = []
+            for filename in sorted(filenames):
+                if not filename.lower().endswith(SOUND_EXTENSIONS):
+                    continue
+                full_path = os.path.join(directory, filename)
+                stat = os.stat(full_path)
+                path = f"{folder}/{filename}" if folder else filename
+                known = previous.get(path)
+                if known and known.size == stat.st_size and known.mtime == stat.st_mtime:
+                    sounds.append(known)
+                else:
+                    sounds.append(SoundFile(path, stat.st_size, stat.st_mtime,
+                                            read_duration(full_path, stat.st_size)))
+            folders[folder] = tuple(sounds)
+
+        changed = folders != self.folders
+        self.folders = folders
+        if changed or not self.version:
+            listing = sorted((sound.path, sound.size, sound.mtime) for sounds in folders.values() for sound in sounds)
+            self.version = hashlib.sha256(repr(listing).encode("utf-8")).hexdigest()[:16]
+        return changed
+
+    def files(self, folder: str) -> Tuple[SoundFile, ...]:
+        """Sound files directly inside ``folder``, sorted by name."""
+        return self.folders.get(folder.strip("/"), ())
+
+    def choose(self, folder: str, seed: str) -> Optional[str]:
+        """
+        Pick a sound file from ``folder`` deterministically.
+
+        The same seed always gets the same file until the catalog changes;
+        different seeds spread evenly over the folder. Returns None if the
+        folder has no sound files.
+        """
+        sounds = self.files(folder)
+        if not sounds:
+            return None
+        digest = hashlib.sha256(f"{self.version}:{folder}:{seed}".encode("utf-8")).digest()
+        return sounds[int.from_bytes(digest[:8], "big") % len(sounds)].path
+
+    def has_sound(self, path: str) -> bool:
+        """
+        Whether ``path`` names a sound file in the catalog; a path without an
+        extension ("ambience/cabin") matches any supported extension.
+        """
+        folder, _, name = path.strip("/").rpartition("/")
+        names = {os.path.basename(sound.path) for sound in self.files(folder)}
+        if os.path.splitext(name)[1]:
+            return name in names
+        return any(name + extension in names for extension in SOUND_EXTENSIONS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "base_path": self.base_path,
+            "version": self.version,
+            "folders": {
+                folder: [
+                    {"path": sound.path, "size": sound.size, "duration": sound.duration}
+                    for sound in sounds
+                ]
+                for folder, sounds in sorted(self.folders.items())
+            }
+        }
+
+
+_catalog: Optional[SoundCatalog] = None
+_catalog_lock = threading.Lock()
+
+_refresher: Optional[threading.Thread] = None
+_stop_refresher = threading.Event()
+
+
+def get_sound_catalog() -> SoundCatalog:
+    """
+    Return the shared sound catalog, building it on first use.
+
+    It is kept up to date by the refresher thread (see start_catalog_refresher),
+    never on the caller's thread.
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = SoundCatalog(settings.SOUNDS_BASE_PATH)
+            _catalog.refresh()
+        return _catalog
+
+
+def _refresh_periodically(interval: float) -> None:
+    while not _stop_refresher.wait(interval):
+        try:
+            get_sound_catalog().refresh()
+        except OSError:
+            logger.exception("Refreshing the sound catalog failed")
+
+
+def start_catalog_refresher() -> None:
+    """
+    Refresh the shared catalog every SOUND_CATALOG_REFRESH_SECONDS on a
+    background thread, so requests never walk the sounds folder.
+
+    Started after the analysis workers are forked; workers never pick
+    sounds, so their copy of the catalog doesn't need refreshing.
+    """
+    global _refresher
+    if _refresher is not None and _refresher.is_alive():
+        return
+    _stop_refresher.clear()
+    _refresher = threading.Thread(
+        target=_refresh_periodically,
+        args=(settings.SOUND_CATALOG_REFRESH_SECONDS,),
+        name="sound-catalog-refresh",
+        daemon=True
+    )
+    _refresher.start()
+
+
+def stop_catalog_refresher() -> None:
+    """Stop the refresher thread, waiting for a refresh in progress to finish."""
+    global _refresher
+    _stop_refresher.set()
+    if _refresher is not None:
+        _refresher.join()
+        _refresher = None
+
+
+def validate_sound_references(catalog: Optional[SoundCatalog] = None) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Check every sound the rule tables point at against the catalog.
+
+    Returns:
+        Dictionary with "missing_trigger_folders" (trigger patterns whose
+        sound_folder has no sound files) and "missing_carpets" (scene table
+        carpet tracks with no matching file)
+    """
+    from .emotion_analysis import TRIGGER_PATTERNS
+    from .soundscape import ENHANCED_SCENE_SOUND_MAPPINGS, SIMPLE_SCENE_MAPPINGS
+
+    catalog = catalog or get_sound_catalog()
+    missing_folders = [
+        {"pattern": name, "sound_folder": data["sound_folder"]}
+        for name, data in TRIGGER_PATTERNS.items()
+        if not catalog.files(data["sound_folder"])
+    ]
+    missing_carpets = [
+        {"table": table_name, "scene": scene, "carpet": data["carpet"]}
+        for table_name, table in (("enhanced", ENHANCED_SCENE_SOUND_MAPPINGS), ("simple", SIMPLE_SCENE_MAPPINGS))
+        for scene, data in table.items()
+        if "carpet" in data and not catalog.has_sound(data["carpet"])
+    ]
+    return {"missing_trigger_folders": missing_folders, "missing_carpets": missing_carpets}
+
+
+def load_sound_catalog() -> None:
+    """Build the catalog at startup and report sounds the rule tables reference but lack."""
+    catalog = get_sound_catalog()
+    problems = validate_sound_references(catalog)
+    for problem in problems["missing_trigger_folders"]:
+        logger.warning("Trigger pattern %s: no sound files in %s", problem["pattern"], problem["sound_folder"])
+    for problem in problems["missing_carpets"]:
+        logger.warning("Scene %s (%s table): carpet %s not found", problem["scene"], problem["table"], problem["carpet"])
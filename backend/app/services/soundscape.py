@@ -1,9 +1,22 @@
+import hashlib
+import json
 import re
 from collections import Counter, defaultdict
-from typing import List, Dict, Tuple
+from dataclasses import dataclass
+from types import MappingProxyType
+from enum import Enum
+from functools import cached_property
+from typing import Any, List, Dict, Mapping, Optional, Tuple
+from sqlalchemy import String
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import FunctionElement
 from .book import get_page
-from .emotion_analysis import find_trigger_words, AdvancedEmotionAnalyzer
+from app.core.config import settings
+from .emotion_analysis import compute_word_offsets, find_trigger_words, get_random_sound_from_folder, emotion_analyzer
+from .lexicon import tokenize
+from .pattern_engine import CompiledPatternSet
 
 # Enhanced scene sound mappings with sophisticated regex patterns and psychoacoustic metadata
 ENHANCED_SCENE_SOUND_MAPPINGS = {
@@ -1056,34 +1069,14 @@ def optimize_soundscape_frequency_balance(detected_scenes: List[Dict]) -> Dict:
         "scene_frequencies": scene_frequencies
     }
 
-def enhanced_scene_detection(text: str) -> Tuple[List[str], Dict[str, int], Dict[str, List[int]], Dict[str, any]]:
+def _collect_scene_rules() -> List[Tuple[str, str, Dict]]:
     """
-    Enhanced scene detection with psychoacoustic analysis and advanced pattern recognition.
+    Flatten the scene tables into (scene_type, pattern, metadata) rules.
     
-    Args:
-        text: Text content to analyze
-        
-    Returns:
-        Tuple of (detected_scenes, scene_counts, scene_positions, mood_analysis)
+    Rules are listed in the order scenes have always been reported in:
+    enhanced scenes, advanced psychoacoustic patterns, spatial context and
+    finally temporal patterns.
     """
-    if not text:
-        return [], {}, {}, {}
-    
-    detected_scenes = []
-    scene_counts = {}
-    scene_positions = {}
-    mood_analysis = {
-        "primary_mood": "neutral",
-        "secondary_moods": [],
-        "emotional_intensity": 0.0,
-        "psychoacoustic_profile": {},
-        "frequency_balance": {},
-        "spatial_recommendations": {},
-        "temporal_dynamics": {},
-        "scene_complexity": 0
-    }
-    
-    # Combine all pattern sources for comprehensive detection
     all_patterns = {}
     
     # Add enhanced scene patterns
@@ -1129,48 +1122,48 @@ def enhanced_scene_detection(text: str) -> Tuple[List[str], Dict[str, int], Dict
                 "source": "temporal_patterns"
             }
     
-    # Scene detection with enhanced analysis
+    rules = []
     for scene_type, scene_data in all_patterns.items():
-        patterns = scene_data["patterns"]
+        metadata = {key: value for key, value in scene_data.items() if key != "patterns"}
+        for pattern in scene_data["patterns"]:
+            rules.append((scene_type, pattern, metadata))
+    return rules
+
+_scene_matcher = None
+
+def _get_scene_matcher() -> CompiledPatternSet:
+    """Return the scene matcher, compiling the scene tables on first use."""
+    global _scene_matcher
+    if _scene_matcher is None:
+        _scene_matcher = CompiledPatternSet(_collect_scene_rules(), prefilter=True)
+    return _scene_matcher
+
+def _detect_scenes(text: str) -> List[Dict]:
+    """Match the scene tables against ``text`` and apply the context rules."""
+    detected_scenes = []
+    
+    # Scene detection with the compiled scene matcher
+    for rule, match in _get_scene_matcher().iter_matches(text):
+        scene_data = rule.metadata
         weight = scene_data["weight"]
-        mood = scene_data["mood"]
-        psychoacoustic = scene_data["psychoacoustic"]
-        source = scene_data["source"]
         
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                start_pos = match.start()
-                end_pos = match.end()
-                matched_text = match.group()
-                
-                # Add to detected scenes
-                detected_scenes.append({
-                    "type": scene_type,
-                    "text": matched_text,
-                    "position": start_pos,
-                    "weight": weight,
-                    "mood": mood,
-                    "psychoacoustic": psychoacoustic,
-                    "source": source,
-                    "confidence": 0.8 + (weight * 0.1)  # Base confidence + weight bonus
-                })
-                
-                # Update counts
-                scene_counts[scene_type] = scene_counts.get(scene_type, 0) + 1
-                
-                # Update positions
-                if scene_type not in scene_positions:
-                    scene_positions[scene_type] = []
-                scene_positions[scene_type].append(start_pos)
+        # Add to detected scenes
+        detected_scenes.append({
+            "type": rule.key,
+            "text": match.group(),
+            "position": match.start(),
+            "weight": weight,
+            "mood": scene_data["mood"],
+            "psychoacoustic": scene_data["psychoacoustic"],
+            "source": scene_data["source"],
+            "confidence": 0.8 + (weight * 0.1)  # Base confidence + weight bonus
+        })
     
     # Apply context rules for overrides and enhancements
-    context_enhanced_scenes = apply_context_rules(detected_scenes, text)
-    
-    # Analyze emotional progression and mood complexity
-    emotion_analyzer = AdvancedEmotionAnalyzer()
-    emotional_progression = emotion_analyzer.analyze_emotional_progression(text)
-    
+    return apply_context_rules(detected_scenes, text)
+
+def _build_mood_analysis(detected_scenes: List[Dict], text: str, emotional_progression) -> Dict[str, Any]:
+    """Combine detected scenes and emotional progression into the mood analysis."""
     # Convert dataclass to dictionary for further processing
     mood_analysis = {
         "emotional_progression": {
@@ -1203,12 +1196,87 @@ def enhanced_scene_detection(text: str) -> Tuple[List[str], Dict[str, int], Dict
     # Calculate scene complexity
     mood_analysis["scene_complexity"] = len(detected_scenes) + len(set(scene["mood"] for scene in detected_scenes))
     
-    return detected_scenes, scene_counts, scene_positions, mood_analysis
+    return mood_analysis
+
+def enhanced_scene_detection(text: str) -> Tuple[List[str], Dict[str, int], Dict[str, List[int]], Dict[str, any]]:
+    """
+    Enhanced scene detection with psychoacoustic analysis and advanced pattern recognition.
+    
+    Args:
+        text: Text content to analyze
+        
+    Returns:
+        Tuple of (detected_scenes, scene_counts, scene_positions, mood_analysis)
+    """
+    analysis = PageAnalysis(text)
+    return analysis.scenes, analysis.scene_counts, analysis.scene_positions, analysis.mood_analysis
+
+@dataclass(frozen=True)
+class ContextRule:
+    """Immutable, compiled form of one CONTEXT_RULES entry."""
+    category: str
+    name: str
+    mood: str
+    psychoacoustic: Mapping[str, Any]
+    weight: int = 0
+    boost_confidence: float = 0.0
+    override_sound: Optional[str] = None
+
+def _collect_context_rules() -> List[Tuple[str, str, ContextRule]]:
+    """Flatten CONTEXT_RULES into (rule_name, pattern, ContextRule) rules in application order."""
+    rules = []
+    
+    for geo_type, geo_data in CONTEXT_RULES["geographic_override"].items():
+        rule = ContextRule(
+            category="geographic_override",
+            name=geo_type,
+            mood=geo_data["override_mood"],
+            weight=geo_data["weight"],
+            override_sound=geo_data["override_sound"],
+            psychoacoustic=MappingProxyType(dict(geo_data.get("psychoacoustic", {})))
+        )
+        rules.extend((geo_type, pattern, rule) for pattern in geo_data["patterns"])
+    
+    for intensity_type, intensity_data in CONTEXT_RULES["intensity_modifiers"].items():
+        rule = ContextRule(
+            category="intensity_modifiers",
+            name=intensity_type,
+            mood=intensity_data["boost_mood"],
+            boost_confidence=intensity_data["boost_confidence"],
+            psychoacoustic=MappingProxyType(dict(intensity_data.get("psychoacoustic", {})))
+        )
+        rules.extend((intensity_type, pattern, rule) for pattern in intensity_data["patterns"])
+    
+    for emotion_type, emotion_data in CONTEXT_RULES["emotional_context"]["character_emotion"].items():
+        rule = ContextRule(
+            category="emotional_context",
+            name=emotion_type,
+            mood=emotion_type,
+            weight=3,
+            psychoacoustic=MappingProxyType(dict(emotion_data["psychoacoustic"]))
+        )
+        rules.extend((emotion_type, pattern, rule) for pattern in emotion_data["patterns"])
+    
+    return rules
+
+_context_matcher = None
+
+def _get_context_matcher() -> CompiledPatternSet:
+    """Return the context rule matcher, compiling CONTEXT_RULES on first use."""
+    global _context_matcher
+    if _context_matcher is None:
+        _context_matcher = CompiledPatternSet(_collect_context_rules(), prefilter=True)
+    return _context_matcher
 
 def apply_context_rules(detected_scenes: List[Dict], text: str) -> List[Dict]:
     """
     Apply context rules to enhance scene detection with geographic and emotional overrides.
     
+    Scenes are indexed by type and mood so each override or boost is a
+    lookup rather than a scan of every scene found so far. Neither the input
+    scenes nor the rule tables are modified: a scene that gets boosted is
+    copied first, along with its psychoacoustic metadata.
+    
     Args:
         detected_scenes: List of detected scenes
         text: Original text content
@@ -1216,73 +1284,75 @@ def apply_context_rules(detected_scenes: List[Dict], text: str) -> List[Dict]:
     Returns:
         Enhanced list of scenes with context rules applied
     """
-    enhanced_scenes = detected_scenes.copy()
-    
-    # Apply geographic overrides
-    for geo_type, geo_data in CONTEXT_RULES["geographic_override"].items():
-        patterns = geo_data["patterns"]
-        override_mood = geo_data["override_mood"]
-        override_sound = geo_data["override_sound"]
-        weight = geo_data["weight"]
-        psychoacoustic = geo_data.get("psychoacoustic", {})
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Check if this geographic context is already detected
-                existing_geo = any(
-                    scene["type"] == f"spatial_{geo_type}" 
-                    for scene in enhanced_scenes
-                )
-                
-                if not existing_geo:
-                    enhanced_scenes.append({
-                        "type": f"spatial_{geo_type}",
-                        "text": match.group(),
-                        "position": match.start(),
-                        "weight": weight,
-                        "mood": override_mood,
-                        "psychoacoustic": psychoacoustic,
-                        "source": "geographic_override",
-                        "confidence": 0.9,
-                        "override_sound": override_sound
-                    })
-    
-    # Apply intensity modifiers
-    for intensity_type, intensity_data in CONTEXT_RULES["intensity_modifiers"].items():
-        patterns = intensity_data["patterns"]
-        boost_mood = intensity_data["boost_mood"]
-        boost_confidence = intensity_data["boost_confidence"]
-        psychoacoustic = intensity_data.get("psychoacoustic", {})
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Find existing scenes to boost
-                for scene in enhanced_scenes:
-                    if scene["mood"] == boost_mood:
-                        scene["confidence"] = min(1.0, scene["confidence"] + boost_confidence)
-                        if psychoacoustic:
-                            scene["psychoacoustic"].update(psychoacoustic)
+    enhanced_scenes = list(detected_scenes)
+    scene_types = {scene["type"] for scene in enhanced_scenes}
+    scenes_by_mood = defaultdict(list)
+    for index, scene in enumerate(enhanced_scenes):
+        scenes_by_mood[scene["mood"]].append(index)
+    owned = set()
+    
+    def add_scene(scene: Dict) -> None:
+        owned.add(len(enhanced_scenes))
+        scenes_by_mood[scene["mood"]].append(len(enhanced_scenes))
+        scene_types.add(scene["type"])
+        enhanced_scenes.append(scene)
+    
+    matcher = _get_context_matcher()
+    rule_matches = matcher.scan(text)
+    
+    # Apply geographic overrides: the first match of each region adds a scene
+    for rule, matches in zip(matcher.rules, rule_matches):
+        context = rule.metadata
+        if context.category != "geographic_override" or not matches:
+            continue
+        scene_type = f"spatial_{context.name}"
+        if scene_type in scene_types:
+            continue
+        match = matches[0]
+        add_scene({
+            "type": scene_type,
+            "text": match.group(),
+            "position": match.start(),
+            "weight": context.weight,
+            "mood": context.mood,
+            "psychoacoustic": dict(context.psychoacoustic),
+            "source": "geographic_override",
+            "confidence": 0.9,
+            "override_sound": context.override_sound
+        })
+    
+    # Apply intensity modifiers: every match boosts the scenes sharing its mood
+    for rule, matches in zip(matcher.rules, rule_matches):
+        context = rule.metadata
+        if context.category != "intensity_modifiers" or not matches:
+            continue
+        boost = context.boost_confidence * len(matches)
+        for index in scenes_by_mood.get(context.mood, ()):
+            if index not in owned:
+                scene = dict(enhanced_scenes[index])
+                scene["psychoacoustic"] = dict(scene.get("psychoacoustic", {}))
+                enhanced_scenes[index] = scene
+                owned.add(index)
+            scene = enhanced_scenes[index]
+            scene["confidence"] = min(1.0, scene["confidence"] + boost)
+            scene["psychoacoustic"].update(context.psychoacoustic)
     
     # Apply emotional context
-    for emotion_type, emotion_data in CONTEXT_RULES["emotional_context"]["character_emotion"].items():
-        patterns = emotion_data["patterns"]
-        psychoacoustic = emotion_data["psychoacoustic"]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                enhanced_scenes.append({
-                    "type": f"emotion_{emotion_type}",
-                    "text": match.group(),
-                    "position": match.start(),
-                    "weight": 3,
-                    "mood": emotion_type,
-                    "psychoacoustic": psychoacoustic,
-                    "source": "emotional_context",
-                    "confidence": 0.85
-                })
+    for rule, matches in zip(matcher.rules, rule_matches):
+        context = rule.metadata
+        if context.category != "emotional_context":
+            continue
+        for match in matches:
+            add_scene({
+                "type": f"emotion_{context.name}",
+                "text": match.group(),
+                "position": match.start(),
+                "weight": context.weight,
+                "mood": context.mood,
+                "psychoacoustic": dict(context.psychoacoustic),
+                "source": "emotional_context",
+                "confidence": 0.85
+            })
     
     return enhanced_scenes
 
@@ -1415,6 +1485,98 @@ def analyze_temporal_dynamics(detected_scenes: List[Dict], text: str) -> Dict:
     
     return temporal_analysis
 
+class PageAnalysis:
+    """
+    Lazily computed analysis of one page of text.
+    
+    Every stage is computed on first access and memoized on the instance, so
+    consumers that share a PageAnalysis (summary, trigger positions, mood
+    analysis, the response itself) never repeat the scene or trigger pass.
+    """
+    
+    def __init__(self, text: Optional[str]):
+        self.text = text or ""
+    
+    @cached_property
+    def text_lower(self) -> str:
+        return self.text.lower()
+    
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Lexicon word tokens of the page, as emotion analysis splits it."""
+        return tokenize(self.text_lower)
+    
+    @cached_property
+    def scenes(self) -> List[Dict]:
+        return _detect_scenes(self.text) if self.text else []
+    
+    @cached_property
+    def scene_counts(self) -> Dict[str, int]:
+        return dict(Counter(scene["type"] for scene in self.scenes))
+    
+    @cached_property
+    def scene_positions(self) -> Dict[str, List[int]]:
+        scene_positions = {}
+        for scene in self.scenes:
+            scene_positions.setdefault(scene["type"], []).append(scene["position"])
+        return scene_positions
+    
+    @cached_property
+    def word_offsets(self) -> List[int]:
+        return compute_word_offsets(self.text)
+    
+    @cached_property
+    def triggers(self) -> List[Dict]:
+        # Sounds are picked per response from each trigger's folder, not stored
+        return find_trigger_words(self.text, self.text_lower, self.word_offsets, select_sounds=False)
+    
+    @cached_property
+    def trigger_positions(self) -> Dict[str, List[Dict]]:
+        return _extract_trigger_positions(self.triggers, self.text)
+    
+    @cached_property
+    def emotional_progression(self):
+        return emotion_analyzer.analyze_emotional_progression(self.text)
+    
+    @cached_property
+    def emotion_summary(self) -> Dict[str, Any]:
+        """Page-level emotion, the unit chapter and book emotional arcs are built from."""
+        features = emotion_analyzer.feature_index.extract(self.text_lower, self.tokens)
+        result = emotion_analyzer.analyze_emotion(self.text, features)
+        return {
+            "primary_emotion": result.primary_emotion.value,
+            "intensity": result.intensity,
+            "confidence": result.confidence,
+            "emotion_scores": result.emotion_scores
+        }
+    
+    @cached_property
+    def mood_analysis(self) -> Dict[str, Any]:
+        if not self.text:
+            return {}
+        return _build_mood_analysis(self.scenes, self.text, self.emotional_progression)
+    
+    @cached_property
+    def summary(self) -> str:
+        """Contextual summary of the page for debugging."""
+        if not self.text:
+            return "Empty text"
+        
+        summary_parts = []
+        
+        if self.scenes:
+            # Extract scene types from the scene dictionaries
+            scene_types = [scene["type"] for scene in self.scenes[:3]]
+            scene_info = [f"{scene_type}({self.scene_counts.get(scene_type, 0)})" for scene_type in scene_types]
+            summary_parts.append(f"Scenes: {', '.join(scene_info)}")
+        
+        # Add trigger word info
+        if self.triggers:
+            trigger_words_list = [tw["word"] for tw in self.triggers]
+            summary_parts.append(f"Triggers: {', '.join(trigger_words_list)}")
+        
+        return "; ".join(summary_parts) if summary_parts else "No scenes or triggers detected"
+
 def detect_triggered_sounds(text: str) -> List[Dict]:
     """
     Detect specific words that should trigger sound effects.
@@ -1424,35 +1586,320 @@ def detect_triggered_sounds(text: str) -> List[Dict]:
 
 def get_contextual_summary(text: str) -> str:
     """Generate a contextual summary of the text for debugging."""
-    if not text:
-        return "Empty text"
+    return PageAnalysis(text).summary
+
+# Bump whenever the analysis code changes in a way the rule tables don't show,
+# so every stored page analysis is recomputed
+ANALYSIS_FORMAT_VERSION = 4
+
+_ruleset_version = None
+
+def _json_default(value: Any) -> Any:
+    """Encode the non-JSON values that appear in analysis results."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def get_ruleset_version() -> str:
+    """
+    Fingerprint of every rule table and lexicon a page analysis depends on.
     
-    # Get enhanced scene detection
-    sorted_scenes, scene_counts, scene_positions, mood_analysis = enhanced_scene_detection(text)
+    Stored analyses carry this value; when any table changes, the fingerprint
+    changes with it and the stored results are treated as stale.
+    """
+    global _ruleset_version
+    if _ruleset_version is None:
+        from .emotion_analysis import TRIGGER_PATTERNS
+        
+        lexicons = {
+            name: {getattr(key, "value", key): value for key, value in getattr(emotion_analyzer, name).items()}
+            for name in ("emotion_keywords", "theme_keywords", "setting_keywords", "atmosphere_indicators", "context_patterns")
+        }
+        tables = {
+            "format": ANALYSIS_FORMAT_VERSION,
+            "scenes": ENHANCED_SCENE_SOUND_MAPPINGS,
+            "psychoacoustic": ADVANCED_PSYCHOACOUSTIC_PATTERNS,
+            "context": CONTEXT_RULES,
+            "triggers": TRIGGER_PATTERNS,
+            "lexicons": lexicons
+        }
+        encoded = json.dumps(tables, sort_keys=True, default=_json_default)
+        _ruleset_version = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    return _ruleset_version
+
+def compute_content_hash(text: Optional[str]) -> str:
+    """Return the SHA-256 hex digest of a page's content."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+class ContentHashExpression(FunctionElement):
+    """
+    SQL expression equal to compute_content_hash of a text column, so pages
+    can be fingerprinted by the database without loading their content.
+    SQLite connections get ``sha256_hex`` from app.db.session.
+    """
+    type = String()
+    inherit_cache = True
+
+@compiles(ContentHashExpression)
+def _compile_content_hash(element, compiler, **kw):
+    return "sha256_hex(coalesce(%s, ''))" % compiler.process(element.clauses, **kw)
+
+@compiles(ContentHashExpression, "postgresql")
+def _compile_content_hash_postgresql(element, compiler, **kw):
+    return "encode(sha256(convert_to(coalesce(%s, ''), 'UTF8')), 'hex')" % compiler.process(element.clauses, **kw)
+
+# Analysis sections stored per page, and the PageAnalysis stage behind each
+ANALYSIS_SECTIONS = {
+    "summary": "summary",
+    "detected_scenes": "scenes",
+    "scene_keyword_counts": "scene_counts",
+    "scene_keyword_positions": "scene_positions",
+    "triggered_sounds": "triggers",
+    "trigger_positions": "trigger_positions",
+    "mood_analysis": "mood_analysis",
+    "emotion_summary": "emotion_summary",
+    "word_offsets": "word_offsets"
+}
+
+# Soundscape response fields in response order; fields that aren't analysis
+# sections are derived from the detected scenes
+SOUNDSCAPE_FIELDS = (
+    "summary",
+    "detected_scenes",
+    "scene_keyword_counts",
+    "scene_keyword_positions",
+    "carpet_tracks",
+    "triggered_sounds",
+    "trigger_positions",
+    "mood",
+    "intensity",
+    "atmosphere",
+    "confidence",
+    "reasoning",
+    "mood_analysis"
+)
+
+SOUNDSCAPE_PROFILES = {
+    # What the reading screen needs on every page turn
+    "lite": ("carpet_tracks", "triggered_sounds", "trigger_positions", "mood"),
+    "full": SOUNDSCAPE_FIELDS
+}
+
+# Response layouts: "standard" returns trigger and scene events as objects;
+# "compact" folds them into a columnar timeline (see compact_soundscape)
+SOUNDSCAPE_FORMATS = ("standard", "compact")
+
+def resolve_soundscape_fields(fields: Optional[List[str]] = None, profile: str = "full") -> Tuple[str, ...]:
+    """
+    Turn a ``fields`` list or a named profile into the response fields to produce.
     
-    summary_parts = []
+    Raises:
+        ValueError: If the profile or any field is unknown
+    """
+    if fields:
+        unknown = [field for field in fields if field not in SOUNDSCAPE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown soundscape fields: {', '.join(unknown)}")
+        return tuple(field for field in SOUNDSCAPE_FIELDS if field in fields)
+    if profile not in SOUNDSCAPE_PROFILES:
+        raise ValueError(f"Unknown soundscape profile: {profile}")
+    return SOUNDSCAPE_PROFILES[profile]
+
+def _sections_for_fields(fields: Tuple[str, ...], compact: bool = False) -> Tuple[str, ...]:
+    """
+    Return the analysis sections needed to produce the given response fields;
+    a compact response also needs the word offsets for its word count.
+    """
+    sections = [field for field in fields if field in ANALYSIS_SECTIONS]
+    if len(sections) < len(fields) and "detected_scenes" not in sections:
+        sections.append("detected_scenes")
+    if compact:
+        sections.append("word_offsets")
+    return tuple(sections)
+
+def analyze_page_text(text: str, sections: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+    """
+    Run the soundscape analysis of a page's text.
+    
+    Args:
+        text: The page content
+        sections: Analysis sections to compute; all of them if None
+        
+    Returns:
+        Dictionary of analysis sections, as stored in the page analysis table
+    """
+    analysis = PageAnalysis(text)
+    if sections is None:
+        sections = tuple(ANALYSIS_SECTIONS)
+    
+    # Only the stages behind the requested sections are ever computed
+    return {section: getattr(analysis, ANALYSIS_SECTIONS[section]) for section in sections}
+
+def _decode_record(record, page) -> Optional[Dict[str, Any]]:
+    """Return the sections of a stored record if it is current for ``page``."""
+    if not record:
+        return None
+    if record.content_hash != compute_content_hash(page.content) or record.ruleset_version != get_ruleset_version():
+        return None
+    return json.loads(record.analysis)
+
+def load_page_analysis(page, db: Session) -> Optional[Dict[str, Any]]:
+    """
+    Return the stored analysis sections of a page, or None if there are none
+    or they were computed from different content or a different ruleset.
+    """
+    from app.models.analysis import PageAnalysisRecord
+    
+    record = db.query(PageAnalysisRecord).filter(PageAnalysisRecord.page_id == page.id).first()
+    return _decode_record(record, page)
+
+def save_page_analysis(page, analysis: Dict[str, Any], db: Session, merge: bool = False) -> Dict[str, Any]:
+    """
+    Store analysis sections of a page.
+    
+    Args:
+        page: The page the analysis belongs to
+        analysis: Dictionary of analysis sections
+        db: Database session
+        merge: Keep stored sections not present in ``analysis`` instead of
+            replacing the whole record (only valid if the record is current)
+    
+    Returns:
+        The analysis as it will be read back from the store
+    """
+    from app.models.analysis import PageAnalysisRecord
+    
+    content_hash = compute_content_hash(page.content)
+    ruleset_version = get_ruleset_version()
+    
+    record = db.query(PageAnalysisRecord).filter(PageAnalysisRecord.page_id == page.id).first()
+    if record and merge:
+        analysis = {**json.loads(record.analysis), **analysis}
+    encoded = json.dumps(analysis, default=_json_default)
     
-    if sorted_scenes:
-        # Extract scene types from the scene dictionaries
-        scene_types = [scene["type"] for scene in sorted_scenes[:3]]
-        scene_info = [f"{scene_type}({scene_counts.get(scene_type, 0)})" for scene_type in scene_types]
-        summary_parts.append(f"Scenes: {', '.join(scene_info)}")
+    if record:
+        record.content_hash = content_hash
+        record.ruleset_version = ruleset_version
+        record.analysis = encoded
+    else:
+        db.add(PageAnalysisRecord(
+            page_id=page.id,
+            content_hash=content_hash,
+            ruleset_version=ruleset_version,
+            analysis=encoded
+        ))
+    
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request stored this page first; its result is equivalent
+        db.rollback()
+    
+    return json.loads(encoded)
+
+def get_page_analyses(pages: List, db: Session, sections: Optional[Tuple[str, ...]] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Return analysis sections for several pages, keyed by page id.
+    
+    Stored records for all pages are read with one query; only the sections
+    missing from a current record are computed, and every new result is
+    written back in a single commit; a page stored concurrently by another
+    request keeps that request's record.
+    
+    Args:
+        pages: The pages to analyze
+        db: Database session
+        sections: Sections required; all of them if None
+    """
+    from app.models.analysis import PageAnalysisRecord
+    
+    if sections is None:
+        sections = tuple(ANALYSIS_SECTIONS)
+    if not pages:
+        return {}
     
-    # Add trigger word info
-    trigger_words = detect_triggered_sounds(text)
-    if trigger_words:
-        trigger_words_list = [tw["word"] for tw in trigger_words]
-        summary_parts.append(f"Triggers: {', '.join(trigger_words_list)}")
+    records = {
+        record.page_id: record
+        for record in db.query(PageAnalysisRecord).filter(PageAnalysisRecord.page_id.in_([page.id for page in pages]))
+    }
     
-    return "; ".join(summary_parts) if summary_parts else "No scenes or triggers detected"
+    analyses = {}
+    changed = False
+    for page in pages:
+        record = records.get(page.id)
+        analysis = _decode_record(record, page)
+        missing = tuple(section for section in sections if analysis is None or section not in analysis)
+        if missing:
+            analysis = {**(analysis or {}), **analyze_page_text(page.content, missing)}
+            encoded = json.dumps(analysis, default=_json_default)
+            if record:
+                record.content_hash = compute_content_hash(page.content)
+                record.ruleset_version = get_ruleset_version()
+                record.analysis = encoded
+            else:
+                # Each insert gets its own savepoint, so a page another request
+                # stored first doesn't roll back the rest of the batch
+                try:
+                    with db.begin_nested():
+                        db.add(PageAnalysisRecord(
+                            page_id=page.id,
+                            content_hash=compute_content_hash(page.content),
+                            ruleset_version=get_ruleset_version(),
+                            analysis=encoded
+                        ))
+                except IntegrityError:
+                    # Its stored result is equivalent to this one
+                    pass
+            analysis = json.loads(encoded)
+            changed = True
+        analyses[page.id] = analysis
+    
+    if changed:
+        db.commit()
+    
+    return analyses
 
-def get_ambient_soundscape(book_id: int, chapter_number: int, page_number: int, db: Session) -> Dict:
+def get_page_analysis(page, db: Session, sections: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+    """
+    Return analysis sections of a page, serving them from the store when it
+    is current and computing (and storing) only the sections it lacks.
+    
+    Args:
+        page: The page to analyze
+        db: Database session
+        sections: Sections required; all of them if None
+    """
+    return get_page_analyses([page], db, sections)[page.id]
+
+def _ambience_for_mood(mood: str) -> str:
+    return f"ambience/{mood}_ambience" if mood != "neutral" else "ambience/default_ambience"
+
+def get_ambient_soundscape(book_id: int, chapter_number: int, page_number: int, db: Session,
+                           fields: Optional[Tuple[str, ...]] = None, compact: bool = False) -> Dict:
     """
     Returns a structured soundscape dict for a specific book page.
     Uses enhanced scene detection with sophisticated regex patterns and context rules.
+    The page analysis itself is served from the page analysis store.
+    
+    Args:
+        book_id: Book ID
+        chapter_number: Chapter number
+        page_number: Page number
+        db: Database session
+        fields: Response fields to produce (see SOUNDSCAPE_FIELDS); all if None.
+            Analysis stages only needed by other fields are not computed.
+        compact: Return trigger and scene events as a columnar timeline
+            (see compact_soundscape)
     """
     from app.models.book import Book
     
+    if fields is None:
+        fields = SOUNDSCAPE_FIELDS
+    
     # Get the book and page
     book = db.query(Book).filter(Book.id == book_id).first()
     if not book:
@@ -1462,59 +1909,251 @@ def get_ambient_soundscape(book_id: int, chapter_number: int, page_number: int,
     if not book_page:
         return {"error": "Book page not found"}
 
-    # Use enhanced scene detection
-    sorted_scenes, scene_counts, scene_positions, mood_analysis = enhanced_scene_detection(book_page.content)
-    
-    # Get trigger words
-    trigger_words = detect_triggered_sounds(book_page.content)
-    
-    # Generate context summary
-    context_summary = get_contextual_summary(book_page.content)
-    
-    # Determine primary mood and sound
-    primary_mood = "neutral"
-    primary_sound = "ambience/default_ambience"
-    confidence = 0.5
-    
-    if sorted_scenes:
-        # Get the highest confidence scene
-        best_scene = sorted_scenes[0]
-        primary_mood = best_scene.get("mood", "neutral")
-        # Map mood to sound (you can enhance this mapping)
-        primary_sound = f"ambience/{primary_mood}_ambience" if primary_mood != "neutral" else "ambience/default_ambience"
-        confidence = best_scene.get("confidence", 0.5)
-    
-    # Get carpet tracks (primary and secondary)
-    carpet_tracks = []
-    if primary_sound:
-        carpet_tracks.append(primary_sound)
-    
-    # Add secondary sound if available
-    if len(sorted_scenes) > 1:
-        secondary_scene = sorted_scenes[1]
-        secondary_mood = secondary_scene.get("mood", "neutral")
-        secondary_sound = f"ambience/{secondary_mood}_ambience" if secondary_mood != "neutral" else "ambience/default_ambience"
-        if secondary_sound != primary_sound:
-            carpet_tracks.append(secondary_sound)
+    # Serve the page analysis from the store, recomputing it if stale
+    analysis = get_page_analysis(book_page, db, _sections_for_fields(fields, compact))
+    soundscape = _build_soundscape(book_id, chapter_number, page_number, analysis, fields, book_page.id)
+    if compact:
+        tables = TimelineTables()
+        soundscape = compact_soundscape(soundscape, tables, len(analysis["word_offsets"]))
+        soundscape.update(tables.to_dict())
+    return soundscape
 
-    return {
+def get_ambient_soundscapes(book_id: int, chapter_number: int, db: Session,
+                            start_page: Optional[int] = None, end_page: Optional[int] = None,
+                            fields: Optional[Tuple[str, ...]] = None, compact: bool = False) -> Dict:
+    """
+    Returns soundscapes for a range of pages of one chapter, or the whole chapter.
+    
+    All pages are loaded with a single query and analyzed together, so they
+    share the compiled rule tables and one round trip to the analysis store.
+    
+    Args:
+        book_id: Book ID
+        chapter_number: Chapter number
+        db: Database session
+        start_page: First page number to include; the chapter start if None
+        end_page: Last page number to include; the chapter end if None
+        fields: Response fields to produce for every page; all if None
+        compact: Return trigger and scene events as columnar timelines; the
+            pages share one set of id tables, sent once with the range
+        
+    Returns:
+        Dictionary with the book and chapter ids and a ``pages`` list of
+        soundscapes in page order
+    """
+    from app.models.book import Book, Chapter, Page
+    
+    if fields is None:
+        fields = SOUNDSCAPE_FIELDS
+    
+    query = db.query(Page).join(Chapter, Chapter.id == Page.chapter_id).filter(
+        Chapter.book_id == book_id,
+        Chapter.chapter_number == chapter_number
+    )
+    if start_page is not None:
+        query = query.filter(Page.page_number >= start_page)
+    if end_page is not None:
+        query = query.filter(Page.page_number <= end_page)
+    pages = query.order_by(Page.page_number).all()
+    
+    if not pages:
+        # Tell a missing book apart from an empty range
+        if not db.query(Book).filter(Book.id == book_id).first():
+            return {"error": "Book not found"}
+        return {"error": "No pages found"}
+    
+    analyses = get_page_analyses(pages, db, _sections_for_fields(fields, compact))
+    soundscapes = [
+        _build_soundscape(book_id, chapter_number, page.page_number, analyses[page.id], fields, page.id)
+        for page in pages
+    ]
+    
+    result = {"book_id": book_id, "chapter_id": chapter_number}
+    if compact:
+        tables = TimelineTables()
+        soundscapes = [
+            compact_soundscape(soundscape, tables, len(analyses[page.id]["word_offsets"]))
+            for page, soundscape in zip(pages, soundscapes)
+        ]
+        result.update(tables.to_dict())
+    result["pages"] = soundscapes
+    return result
+
+def select_trigger_sound(folder_path: str, page_id: int, position: int) -> str:
+    """
+    Pick the sound of a trigger at character ``position`` of a page.
+    
+    With TRIGGER_SOUND_SELECTION "deterministic" the choice follows from the
+    page id, the trigger's position and the sound catalog version, so
+    identical requests get byte-identical responses; with "random" each
+    response draws anew.
+    """
+    deterministic = settings.TRIGGER_SOUND_SELECTION == "deterministic"
+    return get_random_sound_from_folder(folder_path, f"{page_id}:{position}" if deterministic else None)
+
+def _select_trigger_sounds(values: Dict[str, Any], page_id: int) -> None:
+    """Pick every trigger's sound from its folder (see select_trigger_sound)."""
+    def pick(folder_path: str, position: int) -> str:
+        return select_trigger_sound(folder_path, page_id, position)
+    
+    if "triggered_sounds" in values:
+        values["triggered_sounds"] = [
+            {**trigger, "sound": pick(trigger["folder_path"], trigger["position"])}
+            for trigger in values["triggered_sounds"]
+        ]
+    if "trigger_positions" in values:
+        values["trigger_positions"] = {
+            trigger_type: [
+                {**trigger, "sound": pick(trigger["folder_path"], trigger["character_position"])}
+                for trigger in triggers
+            ]
+            for trigger_type, triggers in values["trigger_positions"].items()
+        }
+
+def _build_soundscape(book_id: int, chapter_number: int, page_number: int,
+                      analysis: Dict[str, Any], fields: Tuple[str, ...], page_id: int) -> Dict:
+    """
+    Assemble the soundscape response of one page from its analysis sections.
+    
+    ``page_id`` seeds the trigger sound selection (see _select_trigger_sounds).
+    """
+    values = dict(analysis)
+    _select_trigger_sounds(values, page_id)
+    
+    if "detected_scenes" in values:
+        sorted_scenes = values["detected_scenes"]
+        
+        # Determine primary mood and sound
+        primary_mood = "neutral"
+        primary_sound = "ambience/default_ambience"
+        confidence = 0.5
+        
+        if sorted_scenes:
+            # Get the highest confidence scene
+            best_scene = sorted_scenes[0]
+            primary_mood = best_scene.get("mood", "neutral")
+            # Map mood to sound (you can enhance this mapping)
+            primary_sound = _ambience_for_mood(primary_mood)
+            confidence = best_scene.get("confidence", 0.5)
+        
+        # Get carpet tracks (primary and secondary)
+        carpet_tracks = []
+        if primary_sound:
+            carpet_tracks.append(primary_sound)
+        
+        # Add secondary sound if available
+        if len(sorted_scenes) > 1:
+            secondary_scene = sorted_scenes[1]
+            secondary_sound = _ambience_for_mood(secondary_scene.get("mood", "neutral"))
+            if secondary_sound != primary_sound:
+                carpet_tracks.append(secondary_sound)
+        
+        values.update({
+            "carpet_tracks": carpet_tracks,
+            "mood": primary_mood,
+            "intensity": confidence,
+            "atmosphere": primary_mood,
+            "confidence": confidence,
+            "reasoning": f"Primary mood: {primary_mood} (confidence: {confidence:.2f})"
+        })
+
+    soundscape = {
         "book_id": book_id,
         "chapter_id": chapter_number,
-        "page_id": page_number,
-        "summary": context_summary,
-        "detected_scenes": sorted_scenes,
-        "scene_keyword_counts": scene_counts,
-        "scene_keyword_positions": scene_positions,
-        "carpet_tracks": carpet_tracks,
-        "triggered_sounds": trigger_words,
-        "trigger_positions": _extract_trigger_positions(trigger_words, book_page.content),
-        "mood": primary_mood,
-        "intensity": confidence,
-        "atmosphere": primary_mood,
-        "confidence": confidence,
-        "reasoning": f"Primary mood: {primary_mood} (confidence: {confidence:.2f})",
-        "mood_analysis": mood_analysis
+        "page_id": page_number
     }
+    soundscape.update((field, values[field]) for field in SOUNDSCAPE_FIELDS if field in fields)
+    return soundscape
+
+# Soundscape fields a compact timeline replaces
+_TIMELINE_FIELDS = ("triggered_sounds", "trigger_positions", "scene_keyword_positions")
+
+class TimelineTables:
+    """
+    Id tables of compact timelines: each distinct sound path, trigger
+    pattern and scene type gets the next integer id, in order of first use.
+    """
+    
+    def __init__(self):
+        self.sounds: Dict[str, int] = {}
+        self.patterns: Dict[str, int] = {}
+        self.scene_types: Dict[str, int] = {}
+    
+    @staticmethod
+    def _id(table: Dict[str, int], value: str) -> int:
+        return table.setdefault(value, len(table))
+    
+    def sound_id(self, sound: str) -> int:
+        return self._id(self.sounds, sound)
+    
+    def pattern_id(self, pattern_name: str) -> int:
+        return self._id(self.patterns, pattern_name)
+    
+    def scene_type_id(self, scene_type: str) -> int:
+        return self._id(self.scene_types, scene_type)
+    
+    def to_dict(self) -> Dict[str, List[str]]:
+        """The tables as lists indexed by id."""
+        return {
+            "sounds": list(self.sounds),
+            "patterns": list(self.patterns),
+            "scene_types": list(self.scene_types)
+        }
+
+def compact_soundscape(soundscape: Dict[str, Any], tables: TimelineTables, word_count: int) -> Dict[str, Any]:
+    """
+    Replace the trigger and scene event fields of a soundscape with a
+    columnar ``timeline``.
+    
+    ``triggered_sounds`` and ``trigger_positions`` become parallel arrays
+    in reading order, and ``scene_keyword_positions`` becomes a second set
+    of them. Sounds, patterns and scene types are given as ids into
+    ``tables``, which the caller sends once alongside the soundscapes.
+    A trigger's matched word is ``char_lengths`` characters of the page text
+    from its char position, and its timing can be derived from its
+    position; per-trigger context, timing and folder are not repeated.
+    
+    Args:
+        soundscape: A soundscape as returned by _build_soundscape
+        tables: Id tables to add new sounds, patterns and scene types to
+        word_count: Words on the page
+        
+    Returns:
+        The soundscape with the event fields replaced by ``timeline``
+    """
+    compact = {field: value for field, value in soundscape.items() if field not in _TIMELINE_FIELDS}
+    
+    # Total words on the page, sent once rather than with every trigger
+    timeline: Dict[str, Any] = {"word_count": word_count}
+    if "triggered_sounds" in soundscape or "trigger_positions" in soundscape:
+        if "triggered_sounds" in soundscape:
+            triggers = [(trigger["position"], trigger) for trigger in soundscape["triggered_sounds"]]
+        else:
+            triggers = sorted(
+                ((trigger["character_position"], trigger)
+                 for triggers_of_type in soundscape["trigger_positions"].values()
+                 for trigger in triggers_of_type),
+                key=lambda item: item[0]
+            )
+        timeline.update({
+            "word_positions": [trigger["word_position"] for _, trigger in triggers],
+            "char_positions": [position for position, _ in triggers],
+            "char_lengths": [len(trigger["word"]) for _, trigger in triggers],
+            "sound_ids": [tables.sound_id(trigger["sound"]) for _, trigger in triggers],
+            "pattern_ids": [tables.pattern_id(trigger["pattern_name"]) for _, trigger in triggers]
+        })
+    if "scene_keyword_positions" in soundscape:
+        scenes = sorted(
+            (position, scene_type)
+            for scene_type, positions in soundscape["scene_keyword_positions"].items()
+            for position in positions
+        )
+        timeline.update({
+            "scene_char_positions": [position for position, _ in scenes],
+            "scene_type_ids": [tables.scene_type_id(scene_type) for _, scene_type in scenes]
+        })
+    compact["timeline"] = timeline
+    return compact
 
 def _extract_trigger_positions(trigger_words: List[Dict], text: str) -> Dict[str, List[Dict]]:
     """
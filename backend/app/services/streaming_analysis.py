@@ -0,0 +1,174 @@
+import codecs
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from .emotion_analysis import EmotionResult, ThemeResult, emotion_analyzer
+from .lexicon import LexiconScore, TextFeatures, tokenize
+
+# Characters of the opening text kept for the emotion context, which only
+# looks at the first two sentences
+HEAD_LIMIT = 4096
+
+# Longest run of characters without whitespace held back waiting for the
+# rest of a word; anything longer is tokenized as it stands
+MAX_PARTIAL_WORD = 65536
+
+
+class StreamingTextAnalyzer:
+    """
+    Emotion and theme analysis of a text fed in chunks.
+
+    Chunks are tokenized as they arrive and only running aggregates are kept:
+    emotion totals, the lexicon terms found so far, the opening sentences, a
+    window of recent tokens wide enough for modifier lookups and the last
+    characters of the text, so a term split across chunks is still found. Memory use
+    is bounded by the chunk size, however long the text is, and the results
+    equal those of ``analyze_emotion`` and ``analyze_theme`` on the whole
+    text (except that a first sentence longer than ``HEAD_LIMIT`` characters
+    is cut short in the context).
+
+    Chunks may be ``str`` or UTF-8 ``bytes``; a multi-byte character or a
+    word may be split across chunks.
+    """
+
+    def __init__(self, analyzer=emotion_analyzer):
+        self.analyzer = analyzer
+        self.lexicon = analyzer.emotion_lexicon
+        self.features = analyzer.feature_index
+
+        # Tokens needed after a position before it can be scored: the
+        # modifier window plus the longest modifier phrase
+        self._lookahead = self.lexicon.window + self.lexicon.max_modifier_words - 1
+        # Characters kept from the end of the text to find a term split by a chunk border
+        self._term_overlap = self.features.max_length - 1
+
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""  # text after the last whitespace, possibly a cut word
+        self._head: List[str] = []
+        self._head_length = 0
+        self._head_done = False
+
+        self._tokens: List[str] = []  # recent tokens, self._tokens[0] is token number self._base
+        self._base = 0
+        self._scored = 0  # tokens before this index are fully counted
+
+        self._totals: Dict[str, float] = {}
+        self._keywords: Dict[str, None] = {}
+        self._occurrences = 0
+        self._terms: Set[str] = set()
+        self._tail = ""  # last characters of the text fed so far
+        self.characters = 0
+        self._finished = False
+
+    @property
+    def token_count(self) -> int:
+        return self._base + len(self._tokens)
+
+    def feed(self, chunk: Union[str, bytes]) -> None:
+        """Add the next chunk of text."""
+        if self._finished:
+            raise ValueError("Analysis already finished")
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        if not chunk:
+            return
+        chunk = chunk.lower()
+        self.characters += len(chunk)
+        self._keep_head(chunk)
+        self._find_terms(chunk)
+
+        # Tokens never span whitespace, so text up to the last whitespace
+        # tokenizes the same as it would within the whole text
+        text = self._partial + chunk
+        cut = len(text)
+        while cut > 0 and not text[cut - 1].isspace():
+            cut -= 1
+        if cut == 0 and len(text) <= MAX_PARTIAL_WORD:
+            self._partial = text
+            return
+        if cut == 0:
+            cut = len(text)
+        self._partial = text[cut:]
+        self._tokens.extend(tokenize(text[:cut]))
+        self._score(final=False)
+
+    def finish(self) -> None:
+        """Flush the held-back text; no more chunks can be fed afterwards."""
+        if self._finished:
+            return
+        tail = self._decoder.decode(b"", final=True).lower()
+        if tail:
+            self.characters += len(tail)
+            self._keep_head(tail)
+            self._find_terms(tail)
+        self._tokens.extend(tokenize(self._partial + tail))
+        self._partial = ""
+        self._score(final=True)
+        self._finished = True
+
+    def _keep_head(self, chunk: str) -> None:
+        if self._head_done:
+            return
+        self._head.append(chunk[:HEAD_LIMIT - self._head_length])
+        self._head_length += len(self._head[-1])
+        head = "".join(self._head)
+        self._head = [head]
+        if head.count(".") >= 2 or self._head_length >= HEAD_LIMIT:
+            self._head_done = True
+
+    def _find_terms(self, chunk: str) -> None:
+        text = self._tail + chunk
+        self._terms |= self.features.find(text)
+        self._tail = text[max(0, len(text) - self._term_overlap):]
+
+    def _score(self, final: bool) -> None:
+        tokens = self._tokens
+        start = self._scored - self._base
+        end = len(tokens) if final else len(tokens) - self._lookahead
+        if end <= start:
+            return
+
+        occurrences = set()
+        for index, keyword, emotion, weight in self.lexicon.keyword_hits(tokens, start, end):
+            occurrences.add(index)
+            self._keywords[keyword] = None
+            self._totals[emotion] = self._totals.get(emotion, 0.0) + weight
+        self._occurrences += len(occurrences)
+        self._scored = self._base + end
+
+        # Keep one modifier window of tokens before the next unscored one
+        drop = max(0, end - self.lexicon.window)
+        if drop:
+            del tokens[:drop]
+            self._base += drop
+
+    def _features(self) -> TextFeatures:
+        return TextFeatures(tokens=[], terms=frozenset(self._terms))
+
+    def emotion(self) -> EmotionResult:
+        """Emotion analysis of the whole text; finishes the analysis."""
+        self.finish()
+        lexicon_score = LexiconScore(
+            scores={emotion: self._totals[emotion] for emotion in self.lexicon.emotions if emotion in self._totals},
+            keywords=list(self._keywords),
+            occurrences=self._occurrences
+        )
+        head = "".join(self._head)
+        context = self.analyzer._extract_enhanced_context(head, self._features()) if head else ""
+        return self.analyzer.emotion_from_score(lexicon_score, context)
+
+    def theme(self) -> ThemeResult:
+        """Theme analysis of the whole text; finishes the analysis."""
+        self.finish()
+        if not self.characters:
+            return self.analyzer.analyze_theme("")
+        return self.analyzer.theme_from_features(self._features())
+
+
+def analyze_text_stream(chunks: Iterable[Union[str, bytes]],
+                        analyzer: Optional[object] = None) -> StreamingTextAnalyzer:
+    """Feed every chunk to a new StreamingTextAnalyzer and finish it."""
+    stream = StreamingTextAnalyzer(analyzer or emotion_analyzer)
+    for chunk in chunks:
+        stream.feed(chunk)
+    stream.finish()
+    return stream
@@ -0,0 +1,67 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_count() -> int:
+    """Number of analysis worker processes, from ANALYSIS_WORKERS or the core count."""
+    return settings.ANALYSIS_WORKERS if settings.ANALYSIS_WORKERS > 0 else (os.cpu_count() or 1)
+
+
+def warm_up() -> None:
+    """
+    Build the compiled rule tables, lexicons and sound catalog in the parent
+    process, so forked workers share those pages instead of each building
+    their own copy.
+    Also run at server startup, so the first request doesn't pay for it.
+    """
+    from .soundscape import _get_context_matcher, _get_scene_matcher, get_ruleset_version
+    from .emotion_analysis import _get_narrative_matcher, _get_trigger_matcher, get_compiled_lexicons
+    from .literal_prefilter import get_prefilter
+    from .scoring_backend import get_scoring_backend
+    from .sound_catalog import get_sound_catalog
+
+    _get_scene_matcher()
+    _get_context_matcher()
+    _get_narrative_matcher()
+    _get_trigger_matcher()
+    get_compiled_lexicons()
+    get_prefilter()
+    get_ruleset_version()
+    get_scoring_backend()
+    get_sound_catalog()
+
+
+def get_worker_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool used for CPU-bound text analysis."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            warm_up()
+            _pool = ProcessPoolExecutor(max_workers=get_worker_count())
+        return _pool
+
+
+def start_worker_pool() -> None:
+    """
+    Warm up and start the worker processes at server startup, while the
+    server has no other threads yet, so that workers are never forked from
+    a thread-busy parent.
+    """
+    # Workers are only forked once the pool is first given work
+    get_worker_pool().submit(int).result()
+
+
+def shutdown_worker_pool() -> None:
+    """Stop the worker processes; a new pool is started on next use."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+# The app connects at import time; the engine tests never touch the database
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_PARAGRAPHS = [
+    "The storm broke over the old castle at midnight. Thunder rolled across the hills and rain "
+    "hammered the windows while the wind howled through the broken shutters. Somewhere below, a "
+    "door creaked open and slow footsteps echoed on the stone stairs. She held her breath, heart "
+    "pounding, as a wolf howled in the dark forest beyond the walls.",
+    "Morning came softly. Birds sang in the garden, the river murmured past the mill, and the old "
+    "bell of the village church rang seven times. He smiled, happy and at peace, and turned the "
+    "pages of the book his grandmother had left him by the warm crackling fire.",
+    "Swords clashed in the courtyard as the knights charged. Horses galloped through the gate, "
+    "armor rang against armor, and the battle cry of the army rose over the screams. Blood ran "
+    "between the cobblestones; terror and fury filled every face.",
+    "Deep in the cave the water dripped, each drop echoing in the dark tunnel. A ghost drifted "
+    "between the pillars, whispering a spell of shadow, and the ancient magic of the crypt woke "
+    "with a cold and terrible glow. Something was watching him. He was afraid, so afraid.",
+    "The carriage wheels rattled along the muddy road while the coachman cursed the rain. Inside, "
+    "Mary laughed and told a story of the ball, of music and dancing and the handsome stranger "
+    "who had kissed her hand in the moonlit garden.",
+]
+
+
+@pytest.fixture
+def sample_text() -> str:
+    """A few paragraphs that hit scene rules, trigger patterns and every emotion lexicon."""
+    return "\n\n".join(SAMPLE_PARAGRAPHS * 3)
+
+
+@pytest.fixture
+def tricky_texts() -> list:
+    """Case variants, plurals, punctuation and the non-ASCII characters re.IGNORECASE equates with ASCII letters."""
+    return [
+        "WIND! Wind, wind; the Winds howled. Storm-winds and STORMS.",
+        "Footsteps—footstep… FOOTSTEPS? The door's hinges; doors creaked.",
+        "ſword and KNIGHTK; the İron gate, a dragın's den.",
+        "windows windowsill unwind rewind thunderbolt thunder's",
+        "",
+    ]
+
+
+@pytest.fixture
+def sound_catalog(tmp_path, monkeypatch):
+    """A catalog with three sound files in every trigger folder, installed as the shared catalog."""
+    from app.services import sound_catalog as sound_catalog_module
+    from app.services.emotion_analysis import TRIGGER_PATTERNS
+
+    base_path = tmp_path / "sounds"
+    for data in TRIGGER_PATTERNS.values():
+        folder = base_path / data["sound_folder"]
+        folder.mkdir(parents=True, exist_ok=True)
+        for name in ("a", "b", "c"):
+            (folder / f"{name}.mp3").write_bytes(b"")
+    catalog = sound_catalog_module.SoundCatalog(str(base_path))
+    catalog.refresh()
+    monkeypatch.setattr(sound_catalog_module, "_catalog", catalog)
+    return catalog
@@ -0,0 +1,130 @@
+import asyncio
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.api.endpoints import analytics
+from app.services import batch_analysis
+from app.services.batch_analysis import analyze_text_items, stream_batch_analysis
+from app.services.scoring_backend import LexiconBackend
+
+CREDENTIALS = HTTPAuthorizationCredentials(scheme="Bearer", credentials="token")
+
+
+class FailingBackend(LexiconBackend):
+    """Scores like the lexicon backend, but fails any batch holding a "BOOM" text."""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+
+    def extract_features(self, texts):
+        self.batch_sizes.append(len(texts))
+        if any("BOOM" in text for text in texts):
+            raise ValueError("cannot score BOOM")
+        return super().extract_features(texts)
+
+
+class BrokenPool:
+    """A worker pool whose processes have died."""
+
+    def submit(self, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # Threads instead of processes, so the backend can be swapped in tests
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(batch_analysis, "get_worker_pool", lambda: pool)
+    monkeypatch.setattr(batch_analysis, "get_worker_count", lambda: 2)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def paragraphs(sample_text):
+    return sample_text.split("\n\n")[:5]
+
+
+def read_lines(lines):
+    return [json.loads(line) for line in lines]
+
+
+def test_results_stream_in_input_order_across_chunks(paragraphs, pool, monkeypatch):
+    monkeypatch.setattr(batch_analysis, "_CHUNK_SIZE", 3)
+    texts = [paragraphs[i % len(paragraphs)] + f" Line {i}." for i in range(17)]
+    lines = list(stream_batch_analysis(texts))
+
+    assert all(line.endswith("\n") and line.count("\n") == 1 for line in lines)
+    records = read_lines(lines)
+    assert [record["index"] for record in records] == list(range(len(texts)))
+    expected = analyze_text_items(texts)
+    assert [{key: value for key, value in record.items() if key != "index"} for record in records] == expected
+
+
+def test_only_requested_analyses_are_returned(paragraphs, pool):
+    records = read_lines(stream_batch_analysis(paragraphs, ("theme",)))
+    assert all(set(record) == {"index", "theme"} for record in records)
+
+
+def test_failing_text_gets_an_error_and_the_rest_are_retried(paragraphs, pool, monkeypatch):
+    backend = FailingBackend()
+    monkeypatch.setattr(batch_analysis, "get_scoring_backend", lambda: backend)
+    texts = paragraphs[:2] + ["BOOM"] + paragraphs[2:]
+
+    records = read_lines(stream_batch_analysis(texts))
+
+    assert records[2] == {"index": 2, "error": "cannot score BOOM"}
+    # The chunk failed as a whole, then every text was scored on its own
+    assert backend.batch_sizes == [len(texts)] + [1] * len(texts)
+    expected = analyze_text_items(paragraphs)
+    good = [record for record in records if "error" not in record]
+    assert [record["index"] for record in good] == [0, 1, 3, 4, 5]
+    assert [{key: value for key, value in record.items() if key != "index"} for record in good] == expected
+
+
+def test_broken_pool_fails_every_text_and_is_replaced(paragraphs, monkeypatch):
+    shutdowns = []
+    monkeypatch.setattr(batch_analysis, "get_worker_pool", lambda: BrokenPool())
+    monkeypatch.setattr(batch_analysis, "get_worker_count", lambda: 1)
+    monkeypatch.setattr(batch_analysis, "shutdown_worker_pool", lambda: shutdowns.append(None))
+    monkeypatch.setattr(batch_analysis, "_CHUNK_SIZE", 2)
+
+    records = read_lines(stream_batch_analysis(paragraphs))
+
+    assert [record["index"] for record in records] == list(range(len(paragraphs)))
+    assert all(record["error"].startswith("Worker pool stopped") for record in records)
+    assert shutdowns == [None]
+
+
+def test_endpoint_streams_ndjson(paragraphs, pool):
+    request = analytics.BatchAnalysisRequest(texts=paragraphs[:3], analyses=["emotion"])
+    response = analytics.analyze_text_batch(request, CREDENTIALS)
+    assert response.media_type == "application/x-ndjson"
+
+    async def drain():
+        return [chunk async for chunk in response.body_iterator]
+
+    records = read_lines(asyncio.run(drain()))
+    assert [record["index"] for record in records] == [0, 1, 2]
+    assert all(set(record) == {"index", "emotion"} for record in records)
+
+
+def test_endpoint_rejects_too_many_texts(monkeypatch):
+    monkeypatch.setattr(analytics.settings, "BATCH_ANALYSIS_MAX_TEXTS", 2)
+    request = analytics.BatchAnalysisRequest(texts=["a", "b", "c"])
+    with pytest.raises(HTTPException) as error:
+        analytics.analyze_text_batch(request, CREDENTIALS)
+    assert error.value.status_code == 400
+
+    request = analytics.BatchAnalysisRequest(texts=["a", "b"], analyses=["mood"])
+    with pytest.raises(HTTPException) as error:
+        analytics.analyze_text_batch(request, CREDENTIALS)
+    assert error.value.status_code == 400
@@ -0,0 +1,103 @@
+import pytest
+
+from app.services.soundscape import (
+    SOUNDSCAPE_FIELDS,
+    TimelineTables,
+    _build_soundscape,
+    _sections_for_fields,
+    analyze_page_text,
+    compact_soundscape
+)
+
+
+def _soundscapes(text, fields=SOUNDSCAPE_FIELDS, page_id=1):
+    """The standard soundscape of a page and its compact form."""
+    analysis = analyze_page_text(text, _sections_for_fields(fields, compact=True))
+    standard = _build_soundscape(1, 1, 1, analysis, fields, page_id)
+    tables = TimelineTables()
+    compact = compact_soundscape(standard, tables, len(analysis["word_offsets"]))
+    return standard, compact, tables.to_dict()
+
+
+def _expanded_triggers(timeline, tables):
+    return [
+        {
+            "position": char_position,
+            "word_position": word_position,
+            "length": length,
+            "sound": tables["sounds"][sound_id],
+            "pattern_name": tables["patterns"][pattern_id]
+        }
+        for char_position, word_position, length, sound_id, pattern_id in zip(
+            timeline["char_positions"], timeline["word_positions"], timeline["char_lengths"],
+            timeline["sound_ids"], timeline["pattern_ids"]
+        )
+    ]
+
+
+def test_timeline_reconstructs_triggers(sample_text):
+    standard, compact, tables = _soundscapes(sample_text)
+    assert standard["triggered_sounds"]
+    assert _expanded_triggers(compact["timeline"], tables) == [
+        {
+            "position": trigger["position"],
+            "word_position": trigger["word_position"],
+            "length": len(trigger["word"]),
+            "sound": trigger["sound"],
+            "pattern_name": trigger["pattern_name"]
+        }
+        for trigger in standard["triggered_sounds"]
+    ]
+    # The matched word is recoverable from the page text (triggers report it lowercased)
+    for trigger, original in zip(_expanded_triggers(compact["timeline"], tables), standard["triggered_sounds"]):
+        assert sample_text[trigger["position"]:trigger["position"] + trigger["length"]].lower() == original["word"]
+
+
+def test_timeline_from_trigger_positions_only(sample_text):
+    fields = ("trigger_positions", "mood")
+    standard, compact, tables = _soundscapes(sample_text, fields)
+    expected = sorted(
+        (trigger["character_position"], trigger["word_position"], trigger["sound"], trigger["pattern_name"])
+        for triggers in standard["trigger_positions"].values()
+        for trigger in triggers
+    )
+    assert [
+        (trigger["position"], trigger["word_position"], trigger["sound"], trigger["pattern_name"])
+        for trigger in _expanded_triggers(compact["timeline"], tables)
+    ] == expected
+    assert compact["mood"] == standard["mood"]
+
+
+def test_timeline_reconstructs_scene_positions(sample_text):
+    standard, compact, tables = _soundscapes(sample_text)
+    timeline = compact["timeline"]
+    scenes = {}
+    for position, scene_type_id in zip(timeline["scene_char_positions"], timeline["scene_type_ids"]):
+        scenes.setdefault(tables["scene_types"][scene_type_id], []).append(position)
+    assert scenes == {
+        scene_type: sorted(positions)
+        for scene_type, positions in standard["scene_keyword_positions"].items()
+        if positions
+    }
+
+
+def test_other_fields_are_unchanged(sample_text):
+    standard, compact, _ = _soundscapes(sample_text)
+    for field in ("triggered_sounds", "trigger_positions", "scene_keyword_positions"):
+        assert field not in compact
+    assert {field: value for field, value in compact.items() if field != "timeline"} == {
+        field: value for field, value in standard.items()
+        if field not in ("triggered_sounds", "trigger_positions", "scene_keyword_positions")
+    }
+
+
+@pytest.mark.parametrize("text", ["", "A quiet, ordinary sentence with nothing in it."])
+def test_word_count_without_triggers(text):
+    _, compact, _ = _soundscapes(text, ("triggered_sounds",))
+    assert compact["timeline"]["word_count"] == len(text.split())
+    assert compact["timeline"]["char_positions"] == []
+
+
+def test_word_count(sample_text):
+    _, compact, _ = _soundscapes(sample_text)
+    assert compact["timeline"]["word_count"] == len(sample_text.split())
@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.book import Book, Chapter, Page
+from app.services import emotion_arc
+from app.services.soundscape import ContentHashExpression, compute_content_hash
+
+CALM = "Birds sang in the garden. He smiled, happy and at peace, by the warm fire."
+FEAR = "She was terrified. Fear and dread filled the dark crypt; she screamed in horror."
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'arcs.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def book(db):
+    book = Book(title="Test")
+    db.add(book)
+    db.flush()
+    for chapter_number in (1, 2):
+        chapter = Chapter(book_id=book.id, chapter_number=chapter_number)
+        db.add(chapter)
+        db.flush()
+        for page_number in (1, 2, 3):
+            db.add(Page(chapter_id=chapter.id, book_id=book.id, page_number=page_number, content=CALM))
+    db.commit()
+    return book
+
+
+@pytest.fixture
+def rebuilt(monkeypatch):
+    """Scopes whose arc is rolled up again rather than read from the cache."""
+    scopes = []
+    save = emotion_arc._save_arc
+    monkeypatch.setattr(emotion_arc, "_save_arc", lambda scope, *args: (scopes.append(scope), save(scope, *args)))
+    return scopes
+
+
+def _page(db, book, chapter_number, page_number):
+    return (
+        db.query(Page).join(Chapter, Chapter.id == Page.chapter_id)
+        .filter(Page.book_id == book.id, Chapter.chapter_number == chapter_number, Page.page_number == page_number)
+        .one()
+    )
+
+
+def test_sql_content_hash_equals_python_hash(db, book):
+    page = _page(db, book, 1, 1)
+    for content in ["", None, CALM, "Café — naïve ſtorm, İstanbul 🌩"]:
+        page.content = content
+        db.commit()
+        stored = db.query(ContentHashExpression(Page.content)).filter(Page.id == page.id).scalar()
+        assert stored == compute_content_hash(content)
+
+
+def test_unchanged_book_is_served_from_the_cache(db, book, rebuilt):
+    first = emotion_arc.get_book_emotional_arc(book.id, db)
+    assert sorted(rebuilt) == sorted(["chapter:1", "chapter:2", f"book:{book.id}"])
+    rebuilt.clear()
+    db.expire_all()
+    assert emotion_arc.get_book_emotional_arc(book.id, db) == first
+    assert rebuilt == []
+
+
+def test_edited_page_rebuilds_its_chapter_and_the_book(db, book, rebuilt):
+    first = emotion_arc.get_book_emotional_arc(book.id, db)
+    chapter_ids = {chapter.chapter_number: chapter.id for chapter in db.query(Chapter)}
+    rebuilt.clear()
+
+    # Only the page changes; its stored page analysis is left stale
+    _page(db, book, 2, 2).content = FEAR
+    db.commit()
+
+    arc = emotion_arc.get_book_emotional_arc(book.id, db)
+    assert rebuilt == [f"chapter:{chapter_ids[2]}", f"book:{book.id}"]
+    assert arc["page_emotions"] != first["page_emotions"]
+    assert arc["page_emotions"][4] == "fear"
+    assert arc["page_emotions"][:3] == first["page_emotions"][:3]
+
+    rebuilt.clear()
+    assert emotion_arc.get_chapter_emotional_arc(book.id, 2, db)["page_emotions"][1] == "fear"
+    assert rebuilt == []
+
+
+def test_page_edited_outside_the_app_rebuilds_its_chapter(db, book, rebuilt):
+    emotion_arc.get_chapter_emotional_arc(book.id, 1, db)
+    rebuilt.clear()
+
+    page = _page(db, book, 1, 3)
+    db.execute(text("UPDATE page SET content = :content WHERE id = :id"), {"content": FEAR, "id": page.id})
+    db.commit()
+    db.expire_all()
+
+    arc = emotion_arc.get_chapter_emotional_arc(book.id, 1, db)
+    assert len(rebuilt) == 1
+    assert arc["page_emotions"][2] == "fear"
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from app.services.emotion_analysis import emotion_analyzer
+from app.services.emotion_heatmap import FULL_INTENSITY_WEIGHT, build_emotion_heatmap
+from app.services.lexicon import tokenize
+
+
+def reference_intensities(pages, bucket_tokens):
+    """The heatmap computed token by token, without bincount."""
+    lexicon = emotion_analyzer.emotion_lexicon
+    tokens = [token for text in pages for token in tokenize(text)]
+    flags = lexicon.modifier_flags(tokens)
+    buckets = -(-len(tokens) // bucket_tokens)
+    totals = [[0.0] * buckets for _ in lexicon.emotions]
+    for index, token in enumerate(tokens):
+        for emotion, weight in lexicon.keyword_weights.get(token, ()):
+            row = lexicon.emotions.index(emotion)
+            totals[row][index // bucket_tokens] += lexicon.adjust_weight(tokens, flags, index, weight)
+    return [[min(total / FULL_INTENSITY_WEIGHT, 1.0) for total in row] for row in totals]
+
+
+@pytest.fixture
+def pages(sample_text):
+    return sample_text.split("\n\n")
+
+
+@pytest.mark.parametrize("bucket_tokens", [1, 7, 50, 100, 1000])
+def test_matches_per_token_loop(pages, bucket_tokens):
+    heatmap = build_emotion_heatmap(pages, bucket_tokens)
+    expected = reference_intensities(pages, bucket_tokens)
+
+    assert heatmap.intensities.shape == (len(expected), len(expected[0]))
+    assert np.allclose(heatmap.intensities, expected)
+    assert heatmap.emotions == list(emotion_analyzer.emotion_lexicon.emotions)
+
+
+def test_bucket_boundaries(pages):
+    total = sum(len(tokenize(text)) for text in pages)
+    # A bucket exactly as long as the book, and one token shorter
+    assert build_emotion_heatmap(pages, total).intensities.shape[1] == 1
+    assert build_emotion_heatmap(pages, total - 1).intensities.shape[1] == 2
+
+    heatmap = build_emotion_heatmap(pages, 10)
+    assert heatmap.total_tokens == total
+    assert heatmap.intensities.shape[1] == -(-total // 10)
+    assert heatmap.page_offsets == [sum(len(tokenize(text)) for text in pages[:i]) for i in range(len(pages))]
+
+
+def test_modifiers_reach_across_pages():
+    # The intensifier ends one page, the keyword starts the next
+    split = build_emotion_heatmap(["She was very", "afraid"], 1)
+    joined = build_emotion_heatmap(["She was very afraid"], 1)
+    assert np.array_equal(split.intensities, joined.intensities)
+    assert split.page_offsets == [0, 3]
+
+
+def test_book_smaller_than_one_bucket():
+    text = "He was happy, so very happy, joyful and delighted, full of joy and glee and love."
+    heatmap = build_emotion_heatmap([text])
+    assert heatmap.intensities.shape == (len(heatmap.emotions), 1)
+    assert np.allclose(heatmap.intensities, reference_intensities([text], 100))
+    # Intensity saturates at 1
+    assert heatmap.intensities.max() == 1.0
+
+
+@pytest.mark.parametrize("pages", [[], [""], [None, "   "]])
+def test_empty_book(pages):
+    heatmap = build_emotion_heatmap(pages)
+    assert heatmap.total_tokens == 0
+    assert heatmap.intensities.shape == (len(heatmap.emotions), 0)
+    assert heatmap.to_dict()["buckets"] == 0
+
+
+def test_bucket_size_must_be_positive():
+    with pytest.raises(ValueError):
+        build_emotion_heatmap(["text"], 0)
@@ -0,0 +1,62 @@
+import pytest
+
+from app.services import lexicon as lexicon_module
+from app.services.emotion_analysis import emotion_analyzer
+from app.services.lexicon import LexiconScore, tokenize
+
+
+@pytest.fixture(params=["numpy", "lists"])
+def prefix_sums(request, monkeypatch):
+    if request.param == "lists":
+        monkeypatch.setattr(lexicon_module, "np", None)
+    elif lexicon_module.np is None:
+        pytest.skip("NumPy is not installed")
+    return request.param
+
+
+def _reference_score(tokens, low, high):
+    """Score tokens[low:high] from hits computed with the whole text as modifier context."""
+    lexicon = emotion_analyzer.emotion_lexicon
+    totals, keywords, occurrences = {}, {}, set()
+    for index, keyword, emotion, weight in lexicon.keyword_hits(tokens):
+        if low <= index < high:
+            occurrences.add(index)
+            keywords[keyword] = None
+            totals[emotion] = totals.get(emotion, 0.0) + weight
+    return LexiconScore(
+        scores={emotion: totals[emotion] for emotion in lexicon.emotions if emotion in totals},
+        keywords=list(keywords),
+        occurrences=len(occurrences)
+    )
+
+
+def _assert_scores_equal(actual, expected):
+    assert actual.keywords == expected.keywords
+    assert actual.occurrences == expected.occurrences
+    assert actual.scores.keys() == expected.scores.keys()
+    for emotion, score in expected.scores.items():
+        assert actual.scores[emotion] == pytest.approx(score)
+
+
+def test_whole_text_window_equals_lexicon_score(sample_text, prefix_sums):
+    lexicon = emotion_analyzer.emotion_lexicon
+    profile = lexicon.profile(sample_text.lower())
+    _assert_scores_equal(profile.window_score(0, len(sample_text)), lexicon.score(tokenize(sample_text)))
+
+
+def test_window_scores_equal_summed_hits(sample_text, prefix_sums):
+    text = sample_text.lower()
+    profile = emotion_analyzer.emotion_lexicon.profile(text)
+    tokens = tokenize(text)
+    for segment_length in (50, 100, 300):
+        spans = emotion_analyzer._segment_spans(text, segment_length)
+        for (start, end), score in zip(spans, profile.window_scores(spans)):
+            _assert_scores_equal(score, _reference_score(tokens, *profile.token_range(start, end)))
+
+
+def test_progressions_share_one_profile(sample_text):
+    progressions = emotion_analyzer.analyze_emotional_progressions(sample_text, (100, 250))
+    for segment_length, progression in progressions.items():
+        single = emotion_analyzer.analyze_emotional_progression(sample_text, segment_length)
+        assert progression.segments == single.segments
+        assert progression.arc_metrics == single.arc_metrics
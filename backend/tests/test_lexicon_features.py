@@ -0,0 +1,61 @@
+from collections import defaultdict
+
+from app.services.emotion_analysis import emotion_analyzer
+from app.services.streaming_analysis import analyze_text_stream
+
+
+def substring_theme(text):
+    """analyze_theme as a keyword-by-keyword substring scan of the text."""
+    text = text.lower()
+    theme_scores = defaultdict(float)
+    for theme_type, keywords in emotion_analyzer.theme_keywords.items():
+        for keyword in keywords:
+            if keyword in text:
+                theme_scores[theme_type.value] += 1.0
+    setting_elements = [
+        f"{setting_type}:{keyword}"
+        for setting_type, keywords in emotion_analyzer.setting_keywords.items()
+        for keyword in keywords
+        if keyword in text
+    ]
+    atmosphere_scores = defaultdict(int)
+    for atmosphere, keywords in emotion_analyzer.atmosphere_indicators.items():
+        for keyword in keywords:
+            if keyword in text:
+                atmosphere_scores[atmosphere] += 1
+    atmosphere = max(atmosphere_scores.items(), key=lambda x: x[1])[0] if atmosphere_scores else "neutral"
+    return dict(theme_scores), setting_elements, atmosphere
+
+
+def test_terms_match_as_substrings():
+    features = emotion_analyzer.extract_features("The Heroic wizards cast a magical spell in the STORMY night.")
+    # Longer words contain the keyword, as with the substring scan
+    for term in ("hero", "wizard", "magic", "magical", "spell", "storm", "night"):
+        assert features.has(term), term
+    assert not features.has("dragon")
+
+    # Phrases are matched as written, across any word boundary inside them
+    assert emotion_analyzer.extract_features("It was kind of sad.").has("kind of")
+    assert not emotion_analyzer.extract_features("It was kind. Of course.").has("kind of")
+
+
+def test_theme_matches_substring_scan(sample_text, tricky_texts):
+    texts = sample_text.split("\n\n") + tricky_texts + [
+        sample_text.upper(),
+        "A hopeful hero, heroes and heroic deeds; the wizardry of a stormy sky.",
+        "Brightly lit rooms; the darkened hallway of the old farmhouse.",
+    ]
+    for text in texts:
+        if not text:
+            continue
+        theme = emotion_analyzer.analyze_theme(text)
+        assert (theme.theme_scores, theme.setting_elements, theme.atmosphere) == substring_theme(text), text
+
+
+def test_stream_finds_terms_split_across_chunks():
+    text = "The wind howled through the dark forest; she was kind of afraid of the magical storm."
+    whole = emotion_analyzer.analyze_theme(text)
+    for size in (1, 2, 3, 7):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        stream = analyze_text_stream(chunks)
+        assert stream.theme() == whole
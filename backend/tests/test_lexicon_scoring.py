@@ -0,0 +1,38 @@
+import pytest
+
+from app.services.emotion_analysis import emotion_analyzer
+from app.services.lexicon import tokenize
+
+
+def score(text):
+    return emotion_analyzer.emotion_lexicon.score(tokenize(text))
+
+
+def test_every_occurrence_of_a_whole_word_counts():
+    result = score("Afraid, so afraid. She made a cake.")
+    assert result.scores == {"fear": pytest.approx(1.6)}
+    assert result.keywords == ["afraid"]
+    assert result.occurrences == 2
+    # "mad" is not found inside "made"
+    assert "anger" not in result.scores
+
+
+@pytest.mark.parametrize("text, factor", [
+    ("She was very afraid", 1.3),
+    ("She was slightly afraid", 0.7),
+    ("She was not afraid", 0.5),
+    ("She was kind of afraid", 0.7),
+    ("Suddenly she was afraid", 1.2),
+    ("Gradually she was afraid", 1.0),
+    ("Gradually, suddenly, she was afraid", 1.2),
+    ("very " + "calm " * 8 + "afraid", 1.0),
+])
+def test_modifiers_in_window(text, factor):
+    assert score(text).scores["fear"] == pytest.approx(0.8 * factor)
+
+
+def test_keyword_that_is_also_a_modifier_counts_itself():
+    # "suddenly" is a surprise keyword and a temporal cue; as in the original
+    # character-window scan, the cue applies to the keyword itself
+    assert score("Suddenly.").scores == {"surprise": pytest.approx(0.5 * 1.2)}
+    assert score("Very suddenly.").scores == {"surprise": pytest.approx(0.5 * 1.3 * 1.2)}
@@ -0,0 +1,41 @@
+import re
+
+from app.services.emotion_analysis import _get_trigger_matcher
+from app.services.literal_prefilter import AhoCorasick, LiteralPrefilter, get_prefilter
+from app.services.pattern_engine import extract_required_literals
+from app.services.soundscape import _get_context_matcher, _get_scene_matcher
+
+
+def test_automaton_finds_exactly_the_substrings():
+    keywords = ["he", "she", "his", "hers", "wind", "window", "in", "dow"]
+    automaton = AhoCorasick(keywords)
+    for text in ["ushers", "the window rattled in the wind", "", "hhhhe", "xyz"]:
+        assert automaton.find(text) == {keyword for keyword in keywords if keyword in text}
+
+
+def test_required_literals():
+    assert extract_required_literals(r"\bold\s+(castle|tower)s?\b") == [("old",), ("castle", "tower")]
+    assert extract_required_literals(r"\b(wind|breeze)\b") == [("wind", "breeze")]
+    assert extract_required_literals(r"wind|rain") == []
+    # A character class requires none of its members
+    assert extract_required_literals(r"[xyz]+") == []
+    assert extract_required_literals(r"\b[^]a]old\b") == [("old",)]
+
+
+def test_prefilter_never_drops_a_matching_pattern(sample_text):
+    # Build every matcher so all rule tables are registered
+    matchers = [_get_scene_matcher(), _get_context_matcher(), _get_trigger_matcher()]
+    prefilter = get_prefilter()
+    texts = [sample_text, sample_text.upper(), "Nothing happens here.", "ſtorm over the İsland"]
+    for text in texts:
+        candidates = prefilter.candidates(text)
+        for matcher in matchers:
+            for rule in matcher.rules:
+                if re.search(rule.pattern, text, re.IGNORECASE):
+                    assert rule.pattern in candidates, rule.pattern
+
+
+def test_prefilter_skips_patterns_whose_words_are_absent():
+    prefilter = LiteralPrefilter([r"\bold\s+castle\b", r"\b(wind|breeze)\b", r"[xyz]+"])
+    assert prefilter.candidates("a gentle breeze") == {r"\b(wind|breeze)\b", r"[xyz]+"}
+    assert prefilter.candidates("the OLD CASTLE") == {r"\bold\s+castle\b", r"[xyz]+"}
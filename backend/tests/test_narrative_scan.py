@@ -0,0 +1,75 @@
+import re
+
+import pytest
+
+from app.services.emotion_analysis import NARRATIVE_PATTERNS, emotion_analyzer, scan_narrative
+
+NARRATIVE_TEXTS = [
+    "Once upon a time, LONG AGO, in the beginning there was a village. At first the man was calm; "
+    "then, SUDDENLY, a problem arose. At Last the turning point came: a BREAKTHROUGH, a realization. "
+    "Consequently, as a result, they learned to reconcile and found Peace and Harmony.",
+    "Introducing the Characters: a Boy called Tom, known as the fox, referred to as a rival. "
+    "He will overcome, deal with and handle the danger; the threat of battle, the peril of the hazard.",
+    "She began, started, established and presented; development progressed and moved forward, "
+    "complications escalated, then it resolved, concluded, ended, finished.",
+    # Characters IGNORECASE equates with ASCII letters, and word boundaries next to non-ASCII letters
+    "ſuddenly the ſettlement's İnside was Kalm; café-begin naïve-start Ünderstand œbstacle",
+    "winter→spring, ‘dark’ «light» — QUIET/loud; the Castle's hall; 1990s decade; day-by-day",
+]
+
+
+@pytest.fixture
+def texts(sample_text, tricky_texts):
+    return [sample_text, *tricky_texts, *NARRATIVE_TEXTS, sample_text.upper()]
+
+
+def _reference_scan(text_lower):
+    """Every narrative pattern run separately with re.finditer, as before the single-pass scan."""
+    return {
+        section: {
+            category: [match for pattern in patterns for match in re.finditer(pattern, text_lower, re.IGNORECASE)]
+            for category, patterns in categories.items()
+        }
+        for section, categories in NARRATIVE_PATTERNS.items()
+    }
+
+
+def _spans(scan):
+    return {
+        section: {
+            category: [(match.start(), match.end(), match.group()) for match in matches]
+            for category, matches in categories.items()
+        }
+        for section, categories in scan.items()
+    }
+
+
+def test_scan_equals_per_pattern_finditer(texts):
+    for text in texts:
+        assert _spans(scan_narrative(text.lower())) == _spans(_reference_scan(text.lower()))
+
+
+def test_narrative_structure_equals_per_pattern_analysis(texts):
+    analyzer = emotion_analyzer
+    for text in texts:
+        if not text:
+            continue
+        matches = _reference_scan(text.lower())
+        story_elements = analyzer._identify_story_elements(text, matches)
+        plot_progression = analyzer._analyze_plot_progression(text, matches)
+        narrative_pacing = analyzer._analyze_narrative_pacing(text, matches)
+        result = analyzer.analyze_narrative_structure(text)
+        assert result.story_elements == story_elements
+        assert result.character_development == analyzer._analyze_character_development(text, matches)
+        assert result.plot_progression == plot_progression
+        assert result.narrative_pacing == narrative_pacing
+        assert result.conflict_resolution == analyzer._analyze_conflict_resolution(text, matches)
+        assert result.setting_details == analyzer._analyze_setting_details(text, matches)
+        assert result.overall_structure == analyzer._classify_narrative_structure(
+            story_elements, plot_progression, narrative_pacing
+        )
+
+
+def test_narrative_texts_exercise_every_section():
+    scan = scan_narrative(" ".join(NARRATIVE_TEXTS).lower())
+    assert all(any(matches for matches in categories.values()) for categories in scan.values())
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.analysis import PageAnalysisRecord
+from app.models.book import Book, Chapter, Page
+from app.services import soundscape
+
+
+@pytest.fixture
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'store.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def pages(make_session):
+    db = make_session()
+    book = Book(title="Test")
+    db.add(book)
+    db.flush()
+    chapter = Chapter(book_id=book.id, chapter_number=1)
+    db.add(chapter)
+    db.flush()
+    for number in range(1, 5):
+        db.add(Page(chapter_id=chapter.id, book_id=book.id, page_number=number,
+                    content=f"The wind howled {number} times at the old door."))
+    db.commit()
+    yield db, db.query(Page).order_by(Page.page_number).all()
+    db.close()
+
+
+def test_stored_analyses_are_served_without_recomputing(pages, monkeypatch):
+    db, page_list = pages
+    first = soundscape.get_page_analyses(page_list, db, ("summary",))
+
+    calls = []
+    monkeypatch.setattr(soundscape, "analyze_page_text", lambda *args: calls.append(args))
+    assert soundscape.get_page_analyses(page_list, db, ("summary",)) == first
+    assert calls == []
+
+
+def test_a_concurrently_stored_page_does_not_discard_the_batch(pages, make_session, monkeypatch):
+    db, page_list = pages
+    analyze = soundscape.analyze_page_text
+    calls = []
+
+    def racing_analyze(text, sections=None):
+        # While the batch is computing, another request stores page 3
+        calls.append(text)
+        if len(calls) == 2:
+            other = make_session()
+            soundscape.get_page_analyses([other.get(Page, page_list[2].id)], other, sections)
+            other.close()
+        return analyze(text, sections)
+
+    monkeypatch.setattr(soundscape, "analyze_page_text", racing_analyze)
+    analyses = soundscape.get_page_analyses(page_list, db, ("summary",))
+
+    assert set(analyses) == {page.id for page in page_list}
+    assert db.query(PageAnalysisRecord).count() == len(page_list)
@@ -0,0 +1,40 @@
+import pytest
+
+from app.services.emotion_analysis import _get_trigger_matcher
+from app.services.pattern_engine import extract_lead_words, fold_case
+from app.services.soundscape import _get_context_matcher, _get_scene_matcher
+
+
+@pytest.fixture(params=["scene", "context", "trigger"])
+def matcher(request):
+    """A compiled rule table, and whether it is matched against case-folded text."""
+    if request.param == "trigger":
+        # Trigger patterns run without IGNORECASE on case-folded text
+        return _get_trigger_matcher(), True
+    return (_get_scene_matcher() if request.param == "scene" else _get_context_matcher()), False
+
+
+def _spans(matches):
+    return [(match.start(), match.end(), match.group()) for match in matches]
+
+
+def test_scan_equals_finditer_per_pattern(matcher, sample_text, tricky_texts):
+    rules, folded = matcher
+    for text in [sample_text, *tricky_texts]:
+        if folded:
+            text = fold_case(text.lower())
+        for rule, matches in zip(rules.rules, rules.scan(text)):
+            assert _spans(matches) == _spans(rule.regex.finditer(text)), rule.pattern
+
+
+def test_lead_words():
+    assert extract_lead_words(r"\b(leaves?|trees)\b") == [("leave", False), ("trees", True)]
+    assert extract_lead_words(r"\bintroduc\w*\b") == [("introduc", False)]
+    assert extract_lead_words(r"\bold\s+castle\b") == [("old", True)]
+    assert extract_lead_words(r"\bKnight\b") == [("knight", True)]
+
+
+def test_unanchored_patterns_have_no_lead_words():
+    assert extract_lead_words(r"(wind|rain)") is None
+    assert extract_lead_words(r"\b\w+ing\b") is None
+    assert extract_lead_words(r"\b(?=wind)wind\b") is None
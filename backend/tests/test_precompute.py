@@ -0,0 +1,174 @@
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.analysis import PageAnalysisRecord
+from app.models.book import Book, Chapter, Page
+from app.services import precompute, soundscape
+from app.services.precompute import PrecomputeJob, get_book_precompute_status, schedule_book_precompute
+
+
+class BrokenPool:
+    """A worker pool whose processes have died."""
+
+    def submit(self, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+
+@pytest.fixture
+def make_session(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'precompute.db'}")
+    Base.metadata.create_all(engine)
+    make_session = sessionmaker(bind=engine)
+    monkeypatch.setattr(precompute, "SessionLocal", make_session)
+    monkeypatch.setattr(precompute, "_jobs", {})
+    yield make_session
+    engine.dispose()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # Threads instead of processes, so the analysis can be observed
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(precompute, "get_worker_pool", lambda: pool)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def analyzed(monkeypatch):
+    """(content, sections) of every page analysis run."""
+    calls = []
+    analyze = soundscape.analyze_page_text
+
+    def recording_analyze(text, sections=None):
+        calls.append((text, sections))
+        return analyze(text, sections)
+
+    monkeypatch.setattr(precompute, "analyze_page_text", recording_analyze)
+    return calls
+
+
+@pytest.fixture
+def book(make_session, sample_text):
+    db = make_session()
+    book = Book(title="Test")
+    db.add(book)
+    db.flush()
+    chapter = Chapter(book_id=book.id, chapter_number=1)
+    db.add(chapter)
+    db.flush()
+    for number, content in enumerate(sample_text.split("\n\n")[:5], 1):
+        db.add(Page(chapter_id=chapter.id, book_id=book.id, page_number=number, content=content))
+    db.commit()
+    book_id = book.id
+    db.close()
+    return book_id
+
+
+def _run(book_id):
+    job = PrecomputeJob(book_id=book_id)
+    precompute._run_book_precompute(job)
+    return job
+
+
+def _stored(make_session):
+    db = make_session()
+    records = {record.page_id: json.loads(record.analysis) for record in db.query(PageAnalysisRecord)}
+    db.close()
+    return records
+
+
+def test_scheduled_book_is_fully_analyzed(make_session, pool, book):
+    job = schedule_book_precompute(book)
+    precompute._dispatcher.submit(lambda: None).result()  # jobs run one at a time, in order
+
+    assert (job.status, job.total_pages, job.analyzed_pages, job.failed_pages) == ("completed", 5, 5, 0)
+    records = _stored(make_session)
+    assert len(records) == 5
+    assert all(set(analysis) == set(soundscape.ANALYSIS_SECTIONS) for analysis in records.values())
+
+
+def test_scheduling_a_queued_book_again_returns_its_job(make_session, pool, book):
+    release = threading.Event()
+    precompute._dispatcher.submit(release.wait)
+    try:
+        job = schedule_book_precompute(book)
+        assert job.status == "queued"
+        assert schedule_book_precompute(book) is job
+    finally:
+        release.set()
+    precompute._dispatcher.submit(lambda: None).result()
+    assert job.status == "completed"
+
+
+def test_current_pages_are_skipped(make_session, pool, book, analyzed):
+    _run(book)
+    analyzed.clear()
+    job = _run(book)
+    assert analyzed == []
+    assert (job.status, job.analyzed_pages) == ("completed", 5)
+
+
+def test_edited_page_is_analyzed_again(make_session, pool, book, analyzed):
+    _run(book)
+    analyzed.clear()
+    db = make_session()
+    page = db.query(Page).filter(Page.page_number == 2).one()
+    page.content = "The wolf howled in the dark forest."
+    db.commit()
+    db.close()
+
+    _run(book)
+    assert analyzed == [("The wolf howled in the dark forest.", None)]
+
+
+def test_missing_sections_are_merged_into_a_partial_analysis(make_session, pool, book, analyzed):
+    db = make_session()
+    page = db.query(Page).filter(Page.page_number == 1).one()
+    partial = soundscape.get_page_analyses([page], db, ("summary",))[page.id]
+    page_id = page.id
+    db.close()
+
+    job = _run(book)
+    assert job.status == "completed"
+    sections = {text: requested for text, requested in analyzed}
+    assert sections[page.content] == tuple(section for section in soundscape.ANALYSIS_SECTIONS if section != "summary")
+    stored = _stored(make_session)[page_id]
+    assert set(stored) == set(soundscape.ANALYSIS_SECTIONS)
+    assert stored["summary"] == partial["summary"]
+
+
+def test_broken_worker_pool_fails_the_job_and_is_replaced(make_session, pool, book, monkeypatch):
+    shutdowns = []
+    monkeypatch.setattr(precompute, "shutdown_worker_pool", lambda: shutdowns.append(None))
+    monkeypatch.setattr(precompute, "get_worker_pool", lambda: BrokenPool())
+    job = _run(book)
+    assert job.status == "failed"
+    assert job.error.startswith("Worker pool stopped")
+    assert shutdowns == [None]
+
+    # The next run gets a new pool
+    monkeypatch.setattr(precompute, "get_worker_pool", lambda: pool)
+    assert _run(book).status == "completed"
+
+
+def test_status_counts_only_pages_analyzed_from_their_current_content(make_session, pool, book):
+    _run(book)
+    db = make_session()
+    status = get_book_precompute_status(book, db)
+    assert (status["status"], status["analyzed_pages"], status["total_pages"]) == ("completed", 5, 5)
+
+    db.query(Page).filter(Page.page_number == 3).one().content = "Rewritten page."
+    db.commit()
+    status = get_book_precompute_status(book, db)
+    assert (status["status"], status["analyzed_pages"], status["progress"]) == ("not_started", 4, 0.8)
+    db.close()
@@ -0,0 +1,143 @@
+import asyncio
+import json
+from bisect import bisect_left
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import soundscape as soundscape_api
+from app.db.session import Base
+from app.models.book import Book, Chapter, Page
+from app.services import scene_stream
+from app.services.emotion_analysis import compute_word_offsets
+from app.services.scene_stream import _buffer_events, stream_scene_events
+from app.services.soundscape import SOUNDSCAPE_FIELDS, _build_soundscape, analyze_page_text
+
+
+def _whole_text_events(text):
+    """The events of one scan over the whole text, as stream_scene_events reports them."""
+    word_offsets = compute_word_offsets(text)
+    return [
+        (kind, event_type, start, end,
+         word_offset if word_offset is not None else bisect_left(word_offsets, start), matched)
+        for start, end, kind, event_type, matched, word_offset, _ in _buffer_events(text)
+    ]
+
+
+def _streamed(chunks, **kwargs):
+    return [
+        (event.kind, event.type, event.start, event.end, event.word_position, event.text)
+        for event in stream_scene_events(chunks, **kwargs)
+    ]
+
+
+def _split(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+def test_streamed_events_equal_whole_text_scan(sample_text):
+    expected = _whole_text_events(sample_text)
+    assert expected
+    for size in (97, 400, 1500, len(sample_text)):
+        assert _streamed(_split(sample_text, size), separator="") == expected
+
+
+def test_pages_are_joined_with_the_separator(sample_text):
+    pages = sample_text.split("\n\n")
+    assert _streamed(pages, separator="\n\n") == _whole_text_events(sample_text)
+
+
+def test_chunk_index_is_the_page_the_event_starts_in(sample_text):
+    pages = sample_text.split("\n\n")
+    starts = []
+    offset = 0
+    for page in pages:
+        starts.append(offset)
+        offset += len(page) + 1
+    for event in stream_scene_events(pages):
+        assert starts[event.chunk_index] <= event.start
+        assert event.chunk_index == len(starts) - 1 or event.start < starts[event.chunk_index + 1]
+
+
+def test_text_without_whitespace_is_not_carried_whole():
+    # Every chunk would otherwise be rescanned together with all text before it
+    text = "wind,rain,door," * 2000
+    chunks = _split(text, 1000)
+    events = _streamed(chunks, separator="", overlap=64)
+    assert len(events) == len(_whole_text_events(text))
+    assert [event[2] for event in events] == sorted(event[2] for event in events)
+
+
+def test_text_without_whitespace_is_cut_at_the_lookahead(monkeypatch):
+    scanned = []
+    buffer_events = scene_stream._buffer_events
+    monkeypatch.setattr(scene_stream, "_buffer_events", lambda buffer: (scanned.append(len(buffer)),
+                                                                        buffer_events(buffer))[1])
+    list(stream_scene_events(_split("x" * 20000, 1000), separator="", overlap=64))
+    assert max(scanned) <= 1000 + 64
+
+
+def _trigger_sounds(events):
+    return [(event.chunk_index, event.start, event.data["sound"]) for event in events if event.kind == "trigger"]
+
+
+def test_trigger_sounds_are_deterministic(sample_text, sound_catalog):
+    pages = sample_text.split("\n\n")
+    first = _trigger_sounds(stream_scene_events(pages, chunk_ids=range(100, 100 + len(pages))))
+    assert first
+    assert len({sound for _, _, sound in first}) > 1
+    assert _trigger_sounds(stream_scene_events(pages, chunk_ids=range(100, 100 + len(pages)))) == first
+
+
+def test_trigger_sounds_match_the_page_soundscape(sample_text, sound_catalog):
+    pages = sample_text.split("\n\n")
+    page_ids = list(range(100, 100 + len(pages)))
+    streamed = {
+        (page_ids[event.chunk_index], event.start - sum(len(page) + 1 for page in pages[:event.chunk_index])):
+            event.data["sound"]
+        for event in stream_scene_events(pages, chunk_ids=page_ids)
+        if event.kind == "trigger"
+    }
+    expected = {}
+    for page_id, page in zip(page_ids, pages):
+        soundscape = _build_soundscape(1, 1, 1, analyze_page_text(page), SOUNDSCAPE_FIELDS, page_id)
+        for trigger in soundscape["triggered_sounds"]:
+            expected[(page_id, trigger["position"])] = trigger["sound"]
+    assert streamed == expected
+
+
+def _body(response):
+    async def read():
+        return "".join([chunk async for chunk in response.body_iterator])
+    return asyncio.run(read())
+
+
+def test_chapter_events_route(tmp_path, sample_text, sound_catalog):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stream.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    book = Book(title="Test")
+    db.add(book)
+    db.flush()
+    chapter = Chapter(book_id=book.id, chapter_number=1)
+    db.add(chapter)
+    db.flush()
+    pages = sample_text.split("\n\n")
+    for number, content in enumerate(pages, 1):
+        db.add(Page(chapter_id=chapter.id, book_id=book.id, page_number=number, content=content))
+    db.commit()
+    page_ids = [page.id for page in db.query(Page).order_by(Page.page_number)]
+
+    response = soundscape_api.get_chapter_events(book.id, 1, db)
+    assert response.media_type == "application/x-ndjson"
+    assert [json.loads(line) for line in _body(response).splitlines()] == [
+        json.loads(json.dumps(event.__dict__))
+        for event in stream_scene_events(pages, chunk_ids=page_ids)
+    ]
+    with pytest.raises(HTTPException) as error:
+        soundscape_api.get_chapter_events(book.id, 2, db)
+    assert error.value.status_code == 404
+    db.close()
+    engine.dispose()
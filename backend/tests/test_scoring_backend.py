@@ -0,0 +1,172 @@
+import zlib
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import scoring_backend
+from app.services.emotion_analysis import EmotionType, ThemeType, emotion_analyzer
+from app.services.linear_model import HashedNgramVectorizer, LinearModel
+from app.services.scoring_backend import LexiconBackend, LinearModelBackend
+
+TRAINING = {
+    "joy": ["happy smiling children laughed in the sun", "joyful music and dancing at the happy feast"],
+    "fear": ["terrified of the dark crypt and the ghost", "dread and horror in the shadow of the tomb"],
+}
+THEMES = {
+    "romance": ["he kissed her hand in the moonlit garden", "love letters and a wedding at dawn"],
+    "horror": ["the ghost screamed in the crypt", "blood on the tomb and a corpse in the dark"],
+}
+
+
+def _train(examples, **options):
+    texts = [text for label_texts in examples.values() for text in label_texts]
+    labels = [label for label, label_texts in examples.items() for _ in label_texts]
+    return LinearModel.train(texts, labels, n_features=512, epochs=50, **options)
+
+
+@pytest.fixture(scope="module")
+def emotion_model():
+    return _train(TRAINING)
+
+
+@pytest.fixture(scope="module")
+def theme_model():
+    return _train(THEMES)
+
+
+def test_vectorizer_hashes_log_scaled_normalized_ngrams():
+    vectorizer = HashedNgramVectorizer(n_features=64, ngram_max=2)
+    assert vectorizer.feature_indices("Wind wind") == [
+        zlib.crc32(b"wind") % 64, zlib.crc32(b"wind") % 64, zlib.crc32(b"wind wind") % 64
+    ]
+
+    row = np.zeros(64)
+    row[zlib.crc32(b"wind") % 64] += np.log1p(2)
+    row[zlib.crc32(b"wind wind") % 64] += np.log1p(1)
+    matrix = vectorizer.transform(["Wind wind", ""])
+    assert matrix.shape == (2, 64)
+    assert np.allclose(matrix[0], row / np.linalg.norm(row))
+    assert not matrix[1].any()
+
+
+def test_chained_hashes_equal_hashes_of_the_joined_ngrams(sample_text):
+    vectorizer = HashedNgramVectorizer(n_features=1000, ngram_max=3)
+    tokens = sample_text.lower().split()[:200] + ["café", "naïve"]
+    expected = [
+        zlib.crc32(" ".join(tokens[start:start + n]).encode("utf-8")) % 1000
+        for n in (1, 2, 3)
+        for start in range(len(tokens) - n + 1)
+    ]
+    assert vectorizer.token_indices(tokens) == expected
+
+
+def test_predictions_do_not_depend_on_the_batch_size(emotion_model, sample_text):
+    texts = sample_text.split("\n\n") + ["", "happy"]
+    probabilities = emotion_model.predict_proba(texts)
+    assert probabilities.shape == (len(texts), 2)
+    assert np.allclose(probabilities.sum(axis=1), 1.0)
+    assert np.allclose(emotion_model.predict_proba(texts, batch_size=1), probabilities)
+    tokens = [emotion_analyzer.extract_features(text).tokens for text in texts]
+    assert np.array_equal(emotion_model.predict_proba_tokens(tokens), probabilities)
+
+
+def test_training_separates_the_classes(emotion_model):
+    probabilities = emotion_model.predict_proba(["a happy feast", "terrified of the ghost"])
+    assert [emotion_model.classes[index] for index in probabilities.argmax(axis=1)] == ["joy", "fear"]
+
+
+def test_training_is_reproducible():
+    assert np.array_equal(_train(TRAINING).weights, _train(TRAINING).weights)
+
+
+def test_save_and_load(emotion_model, tmp_path, sample_text):
+    path = tmp_path / "emotion.npz"
+    emotion_model.save(str(path))
+    loaded = LinearModel.load(str(path))
+    assert loaded.classes == emotion_model.classes
+    assert loaded.vectorizer.ngram_max == emotion_model.vectorizer.ngram_max
+    assert np.array_equal(loaded.predict_proba([sample_text]), emotion_model.predict_proba([sample_text]))
+
+
+def test_mismatched_weights_are_rejected():
+    with pytest.raises(ValueError):
+        LinearModel(["joy", "fear"], np.zeros((16, 3)), np.zeros(3))
+
+
+def test_unknown_model_labels_are_rejected():
+    model = LinearModel(["joy", "glee"], np.zeros((16, 2)), np.zeros(2))
+    with pytest.raises(ValueError):
+        LinearModelBackend(emotion_model=model)
+
+
+def test_model_results_keep_the_lexicon_fields(emotion_model, theme_model, sample_text):
+    texts = sample_text.split("\n\n")[:5] + [""]
+    backend = LinearModelBackend(emotion_model, theme_model)
+    lexicon = LexiconBackend()
+    probabilities = emotion_model.predict_proba(texts)
+
+    for text, result, expected, row in zip(texts, backend.analyze_emotions(texts), lexicon.analyze_emotions(texts),
+                                           probabilities):
+        if not text:
+            assert result == expected
+            continue
+        top, runner_up = row.argsort()[::-1]
+        assert result == replace(
+            expected,
+            primary_emotion=EmotionType(emotion_model.classes[top]),
+            emotion_scores={label: float(score) for label, score in zip(emotion_model.classes, row)},
+            intensity=float(row[top]),
+            confidence=float(row[top] - row[runner_up])
+        )
+
+    for text, result, expected in zip(texts, backend.analyze_themes(texts), lexicon.analyze_themes(texts)):
+        if not text:
+            assert result == expected
+            continue
+        assert result.primary_theme in (ThemeType.ROMANCE, ThemeType.HORROR)
+        assert result.setting_elements == expected.setting_elements
+        assert result.atmosphere == expected.atmosphere
+
+
+def test_shared_features_give_the_same_results(emotion_model, theme_model, sample_text):
+    texts = sample_text.split("\n\n")[:5]
+    backend = LinearModelBackend(emotion_model, theme_model)
+    features = backend.extract_features(texts)
+    assert backend.analyze_emotions(texts, features) == backend.analyze_emotions(texts)
+    assert backend.analyze_themes(texts, features) == backend.analyze_themes(texts)
+
+
+def test_model_scoring_skips_the_weighted_lexicon_pass(emotion_model, sample_text, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("weighted lexicon scoring should not run")
+
+    monkeypatch.setattr(emotion_analyzer.emotion_lexicon, "keyword_hits", fail)
+    LinearModelBackend(emotion_model).analyze_emotions([sample_text])
+
+
+def test_linear_backend_without_models_falls_back_to_the_lexicon(monkeypatch, sample_text):
+    monkeypatch.setattr(settings, "EMOTION_MODEL_PATH", "")
+    monkeypatch.setattr(settings, "THEME_MODEL_PATH", "")
+    backend = scoring_backend._create_backend("linear")
+    assert backend.emotion_model is None and backend.theme_model is None
+
+    texts = sample_text.split("\n\n")[:5]
+    assert backend.analyze_emotions(texts) == LexiconBackend().analyze_emotions(texts)
+    assert backend.analyze_themes(texts) == LexiconBackend().analyze_themes(texts)
+
+
+def test_linear_backend_loads_the_configured_models(emotion_model, tmp_path, monkeypatch):
+    path = tmp_path / "emotion.npz"
+    emotion_model.save(str(path))
+    monkeypatch.setattr(settings, "EMOTION_MODEL_PATH", str(path))
+    monkeypatch.setattr(settings, "THEME_MODEL_PATH", "")
+    backend = scoring_backend._create_backend("linear")
+    assert backend.emotion_model.classes == emotion_model.classes
+    assert backend.theme_model is None
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        scoring_backend._create_backend("bogus")
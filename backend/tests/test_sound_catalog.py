@@ -0,0 +1,137 @@
+import os
+import time
+import wave
+
+import pytest
+
+from app.services import sound_catalog
+from app.services.sound_catalog import SoundCatalog
+
+
+def _write_wav(path, seconds=1.5, rate=8000):
+    with wave.open(str(path), "wb") as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(rate)
+        audio.writeframes(b"\x00\x00" * int(seconds * rate))
+
+
+def _listing(base_path):
+    """Folder -> sorted sound paths, walking the disk as the catalog used to on every request."""
+    listing = {}
+    for directory, _, filenames in os.walk(base_path):
+        folder = os.path.relpath(directory, base_path).replace(os.sep, "/")
+        folder = "" if folder == "." else folder
+        listing[folder] = [
+            f"{folder}/{name}" if folder else name
+            for name in sorted(filenames)
+            if name.lower().endswith((".mp3", ".wav", ".ogg"))
+        ]
+    return listing
+
+
+@pytest.fixture
+def sounds(tmp_path):
+    wind = tmp_path / "triggers" / "wind"
+    wind.mkdir(parents=True)
+    _write_wav(wind / "wind_b.wav")
+    _write_wav(wind / "wind_a.wav", seconds=0.5)
+    (wind / "notes.txt").write_text("not a sound")
+    ambience = tmp_path / "ambience"
+    ambience.mkdir()
+    _write_wav(ambience / "cabin.wav")
+    return tmp_path
+
+
+def test_files_match_directory_listing(sounds):
+    catalog = SoundCatalog(str(sounds))
+    assert catalog.refresh()
+    listing = _listing(sounds)
+    assert {folder: [sound.path for sound in files] for folder, files in catalog.folders.items()} == listing
+    assert [sound.path for sound in catalog.files("/triggers/wind/")] == listing["triggers/wind"]
+    assert catalog.files("missing") == ()
+
+
+def test_wav_duration(sounds):
+    catalog = SoundCatalog(str(sounds))
+    catalog.refresh()
+    assert [sound.duration for sound in catalog.files("triggers/wind")] == [0.5, 1.5]
+
+
+def test_refresh_picks_up_new_files(sounds):
+    catalog = SoundCatalog(str(sounds))
+    catalog.refresh()
+    version = catalog.version
+    assert not catalog.refresh()
+    assert catalog.version == version
+
+    _write_wav(sounds / "triggers" / "wind" / "wind_c.wav")
+    os.utime(sounds / "triggers" / "wind", (0, 0))
+    assert catalog.refresh()
+    assert catalog.version != version
+    assert {folder: [sound.path for sound in files] for folder, files in catalog.folders.items()} == _listing(sounds)
+
+
+def test_choose_is_deterministic(sounds):
+    catalog = SoundCatalog(str(sounds))
+    catalog.refresh()
+    paths = [sound.path for sound in catalog.files("triggers/wind")]
+    choices = [catalog.choose("triggers/wind", str(seed)) for seed in range(50)]
+    assert set(choices) == set(paths)
+    assert choices == [catalog.choose("triggers/wind", str(seed)) for seed in range(50)]
+    assert catalog.choose("triggers/fire", "1") is None
+
+
+def test_has_sound(sounds):
+    catalog = SoundCatalog(str(sounds))
+    catalog.refresh()
+    assert catalog.has_sound("ambience/cabin")
+    assert catalog.has_sound("ambience/cabin.wav")
+    assert not catalog.has_sound("ambience/cabin.mp3")
+    assert not catalog.has_sound("ambience/forest")
+
+
+def test_refresh_picks_up_a_file_replaced_in_place(sounds):
+    catalog = SoundCatalog(str(sounds))
+    catalog.refresh()
+    version = catalog.version
+    folder = sounds / "triggers" / "wind"
+    folder_stat = os.stat(folder)
+
+    # Rewriting an existing file leaves the folder's mtime alone
+    _write_wav(folder / "wind_a.wav", seconds=2.5)
+    os.utime(folder / "wind_a.wav", (1, 1))
+    os.utime(folder, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns))
+    assert catalog.refresh()
+    assert catalog.version != version
+    assert [sound.duration for sound in catalog.files("triggers/wind")] == [2.5, 1.5]
+
+
+def test_catalog_is_served_without_touching_the_disk(sounds, monkeypatch):
+    catalog = SoundCatalog(str(sounds))
+    catalog.refresh()
+    monkeypatch.setattr(sound_catalog, "_catalog", catalog)
+
+    def walk(*args):
+        raise AssertionError("the request thread walked the sounds folder")
+
+    monkeypatch.setattr(os, "walk", walk)
+    assert sound_catalog.get_sound_catalog() is catalog
+
+
+def test_refresher_thread_keeps_the_catalog_current(sounds, monkeypatch):
+    catalog = SoundCatalog(str(sounds))
+    catalog.refresh()
+    monkeypatch.setattr(sound_catalog, "_catalog", catalog)
+    monkeypatch.setattr(sound_catalog.settings, "SOUND_CATALOG_REFRESH_SECONDS", 0.01)
+
+    sound_catalog.start_catalog_refresher()
+    try:
+        _write_wav(sounds / "ambience" / "forest.wav")
+        deadline = time.monotonic() + 5
+        while not catalog.has_sound("ambience/forest") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert catalog.has_sound("ambience/forest")
+    finally:
+        sound_catalog.stop_catalog_refresher()
+    assert sound_catalog._refresher is None
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app.api import soundscape as soundscape_api
+from app.db.session import Base
+from app.models.book import Book, Chapter, Page
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": headers})
+
+
+@pytest.fixture
+def db(tmp_path, sample_text, sound_catalog):
+    engine = create_engine(f"sqlite:///{tmp_path / 'etag.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    book = Book(title="Test")
+    db.add(book)
+    db.flush()
+    chapter = Chapter(book_id=book.id, chapter_number=1)
+    db.add(chapter)
+    db.flush()
+    for number, text in enumerate(sample_text.split("\n\n")[:3], start=1):
+        db.add(Page(chapter_id=chapter.id, book_id=book.id, page_number=number, content=text))
+    db.commit()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def get_page(db, if_none_match=None, response_format="standard"):
+    return soundscape_api.get_soundscape(1, 1, 1, make_request(if_none_match), fields=None, profile="full",
+                                         response_format=response_format, db=db)
+
+
+def get_pages(db, if_none_match=None):
+    return soundscape_api.get_soundscapes(1, 1, make_request(if_none_match), start=None, end=None, fields=None,
+                                          profile="full", response_format="compact", db=db)
+
+
+@pytest.mark.parametrize("fetch", [get_page, get_pages])
+def test_repeat_requests_share_body_and_etag(db, fetch):
+    first = fetch(db)
+    # The second request is served from the analysis store
+    second = fetch(db)
+
+    assert first.status_code == second.status_code == 200
+    assert first.body == second.body
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+
+@pytest.mark.parametrize("fetch", [get_page, get_pages])
+def test_matching_if_none_match_returns_304(db, fetch):
+    etag = fetch(db).headers["etag"]
+
+    cached = fetch(db, etag)
+    assert cached.status_code == 304
+    assert cached.body == b""
+    assert cached.headers["etag"] == etag
+
+    assert fetch(db, f'"stale", {etag}').status_code == 304
+    assert fetch(db, '"stale"').status_code == 200
+
+
+def test_etag_changes_with_the_response(db):
+    standard = get_page(db)
+    assert get_page(db, response_format="compact").headers["etag"] != standard.headers["etag"]
+
+    page = db.query(Page).filter(Page.page_number == 1).one()
+    page.content = "A quiet morning. Nothing happened at all."
+    db.commit()
+    edited = get_page(db, standard.headers["etag"])
+    assert edited.status_code == 200
+    assert edited.headers["etag"] != standard.headers["etag"]
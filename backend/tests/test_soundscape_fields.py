@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.analysis import PageAnalysisRecord
+from app.models.book import Book, Chapter, Page
+from app.services import soundscape
+from app.services.soundscape import (
+    SOUNDSCAPE_FIELDS, _sections_for_fields, analyze_page_text, get_ambient_soundscape, resolve_soundscape_fields
+)
+
+PAGE_KEYS = {"book_id", "chapter_id", "page_id"}
+
+
+@pytest.fixture
+def db(tmp_path, sample_text):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fields.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    book = Book(title="Test")
+    db.add(book)
+    db.flush()
+    chapter = Chapter(book_id=book.id, chapter_number=1)
+    db.add(chapter)
+    db.flush()
+    db.add(Page(chapter_id=chapter.id, book_id=book.id, page_number=1, content=sample_text))
+    db.commit()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    """Record which expensive PageAnalysis stages run."""
+    calls = []
+
+    def spy(name, function):
+        def wrapper(*args, **kwargs):
+            calls.append(name)
+            return function(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(soundscape, "_detect_scenes", spy("scenes", soundscape._detect_scenes))
+    monkeypatch.setattr(soundscape, "find_trigger_words", spy("triggers", soundscape.find_trigger_words))
+    monkeypatch.setattr(soundscape, "_build_mood_analysis", spy("mood", soundscape._build_mood_analysis))
+    monkeypatch.setattr(soundscape.emotion_analyzer, "analyze_emotional_progression",
+                        spy("progression", soundscape.emotion_analyzer.analyze_emotional_progression))
+    monkeypatch.setattr(soundscape.emotion_analyzer, "analyze_emotion",
+                        spy("emotion", soundscape.emotion_analyzer.analyze_emotion))
+    return calls
+
+
+def test_lite_profile_needs_scenes_and_triggers_only():
+    fields = resolve_soundscape_fields(None, "lite")
+    assert _sections_for_fields(fields) == ("triggered_sounds", "trigger_positions", "detected_scenes")
+    assert _sections_for_fields(fields, compact=True)[-1] == "word_offsets"
+    assert _sections_for_fields(("summary",)) == ("summary",)
+
+
+def test_unrequested_sections_are_not_computed(sample_text, stages):
+    analysis = analyze_page_text(sample_text, ("triggered_sounds",))
+    assert list(analysis) == ["triggered_sounds"]
+    assert stages == ["triggers"]
+
+    stages.clear()
+    analyze_page_text(sample_text, _sections_for_fields(resolve_soundscape_fields(None, "lite")))
+    assert sorted(stages) == ["scenes", "triggers"]
+
+
+@pytest.mark.parametrize("fields, profile", [
+    (None, "lite"),
+    (["mood", "summary"], "full"),
+    (["triggered_sounds"], "full"),
+])
+def test_response_holds_only_the_projected_fields(db, sound_catalog, stages, fields, profile):
+    selected = resolve_soundscape_fields(fields, profile)
+    result = get_ambient_soundscape(1, 1, 1, db, fields=selected)
+
+    assert set(result) == PAGE_KEYS | set(selected)
+    assert "mood" not in stages and "progression" not in stages and "emotion" not in stages
+    stored = json.loads(db.query(PageAnalysisRecord).one().analysis)
+    assert set(stored) == set(_sections_for_fields(selected))
+
+
+def test_projected_fields_match_the_full_response(db, sound_catalog):
+    full = get_ambient_soundscape(1, 1, 1, db)
+    assert set(full) == PAGE_KEYS | set(SOUNDSCAPE_FIELDS)
+
+    lite = get_ambient_soundscape(1, 1, 1, db, fields=resolve_soundscape_fields(None, "lite"))
+    assert lite == {key: full[key] for key in lite}
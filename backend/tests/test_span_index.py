@@ -0,0 +1,17 @@
+import random
+
+from app.services.pattern_engine import SpanIndex
+
+
+def test_span_index_matches_linear_scan():
+    rng = random.Random(0)
+    index, spans = SpanIndex(), []
+    for _ in range(2000):
+        start = rng.randrange(5000)
+        end = start + rng.randrange(1, 40)
+        expected = any(start < used_end and end > used_start for used_start, used_end in spans)
+        assert index.overlaps(start, end) == expected
+        if not expected:
+            index.add(start, end)
+            spans.append((start, end))
+    assert len(index) == len(spans)
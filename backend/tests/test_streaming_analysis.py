@@ -0,0 +1,45 @@
+import pytest
+
+from app.services.emotion_analysis import emotion_analyzer
+from app.services.streaming_analysis import StreamingTextAnalyzer, analyze_text_stream
+
+
+def _split(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 1000, 100000])
+def test_streamed_results_equal_whole_text(sample_text, size):
+    stream = analyze_text_stream(_split(sample_text, size))
+    assert stream.emotion() == emotion_analyzer.analyze_emotion(sample_text)
+    assert stream.theme() == emotion_analyzer.analyze_theme(sample_text)
+
+
+@pytest.mark.parametrize("size", [1, 5, 333])
+def test_utf8_bytes_split_mid_character(size):
+    text = "Café noir, naïve fear — the ghost's terror grew. Señor smiled, happy and joyful. " * 20
+    stream = analyze_text_stream(_split(text.encode("utf-8"), size))
+    assert stream.emotion() == emotion_analyzer.analyze_emotion(text)
+    assert stream.theme() == emotion_analyzer.analyze_theme(text)
+
+
+def test_empty_stream():
+    stream = analyze_text_stream([])
+    assert stream.emotion() == emotion_analyzer.analyze_emotion("")
+    assert stream.theme() == emotion_analyzer.analyze_theme("")
+
+
+def test_feeding_after_finish_fails():
+    stream = StreamingTextAnalyzer()
+    stream.feed("The wind howled.")
+    stream.finish()
+    with pytest.raises(ValueError):
+        stream.feed("More text.")
+
+
+def test_memory_is_bounded_by_the_modifier_window(sample_text):
+    stream = StreamingTextAnalyzer()
+    for chunk in _split(sample_text * 20, 500):
+        stream.feed(chunk)
+    assert len(stream._tokens) < 200
+    assert stream.token_count > 10000
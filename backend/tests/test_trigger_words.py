@@ -0,0 +1,39 @@
+import re
+
+from app.services.emotion_analysis import TRIGGER_PATTERNS, _get_word_context, find_trigger_words
+
+
+def _reference_trigger_words(text):
+    """Trigger detection as it was before the single-scan matcher."""
+    text_lower = text.lower()
+    words = text.split()
+    seconds = len(words) / 200.0 * 60
+    used = []
+    triggers = []
+    for name, data in sorted(TRIGGER_PATTERNS.items(), key=lambda item: item[1]["priority"], reverse=True):
+        for pattern in data["patterns"]:
+            for match in re.finditer(pattern, text_lower, re.IGNORECASE):
+                start, end = match.start(), match.end()
+                if any(start < used_end and end > used_start for used_start, used_end in used):
+                    continue
+                triggers.append({
+                    "word": match.group(),
+                    "timing": start / len(text) * seconds,
+                    "position": start,
+                    "word_position": len(text[:start].split()),
+                    "word_count": len(words),
+                    "type": "regex_pattern",
+                    "pattern_name": name,
+                    "folder_path": data["sound_folder"],
+                    "context": _get_word_context(text, start, end)
+                })
+                used.append((start, end))
+    triggers.sort(key=lambda trigger: trigger["timing"])
+    return triggers
+
+
+def test_trigger_words_equal_reference(sample_text, tricky_texts):
+    for text in [sample_text, *tricky_texts]:
+        found = find_trigger_words(text, select_sounds=False)
+        assert all(trigger.pop("sound") is None for trigger in found)
+        assert found == _reference_trigger_words(text)